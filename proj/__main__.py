@@ -23,7 +23,12 @@ from .config_file import (
     resolve_test_target,
     ProjectConfig,
 )
-from .dtgen import run_dtgen
+from .dtgen import (
+    run_dtgen,
+    load_dtgen_manifest,
+    load_dtgen_render_cache,
+    watch_dtgen,
+)
 from .format import run_formatter
 from .lint import run_linter
 import logging
@@ -102,6 +107,7 @@ from .rm import (
 from .trees import (
     load_root_filesystem,
     load_filesystem_for_repo,
+    StatCachedFileTree,
 )
 from .parse_project import find_repo, parse_repo_path, parse_file_path
 from .utils import map_optional
@@ -217,6 +223,10 @@ def main_cmake(args: MainCmakeArgs) -> int:
             force=False,
             extension_config=config.extension_config,
             ifndef_base=config.ifndef_name,
+            staleness=config.dtgen_staleness,
+            manifest=load_dtgen_manifest(repo),
+            render_cache=load_dtgen_render_cache(repo),
+            jobs=multiprocessing.cpu_count(),
         )
 
     cmake_all(config=config, fast=args.fast, trace=args.trace)
@@ -260,6 +270,10 @@ def main_build(args: MainBuildArgs) -> int:
             force=False,
             extension_config=config.extension_config,
             ifndef_base=config.ifndef_name,
+            staleness=config.dtgen_staleness,
+            manifest=load_dtgen_manifest(repo),
+            render_cache=load_dtgen_render_cache(repo),
+            jobs=args.jobs,
         )
 
     build_targets(
@@ -328,6 +342,10 @@ def main_benchmark(args: MainBenchmarkArgs) -> int:
             force=False,
             extension_config=config.extension_config,
             ifndef_base=config.ifndef_name,
+            staleness=config.dtgen_staleness,
+            manifest=load_dtgen_manifest(repo),
+            render_cache=load_dtgen_render_cache(repo),
+            jobs=args.jobs,
         )
 
     build_targets(
@@ -577,6 +595,10 @@ def main_test(args: MainTestArgs) -> int:
             force=False,
             extension_config=config.extension_config,
             ifndef_base=config.ifndef_name,
+            staleness=config.dtgen_staleness,
+            manifest=load_dtgen_manifest(repo),
+            render_cache=load_dtgen_render_cache(repo),
+            jobs=args.jobs,
         )
 
     build_targets(
@@ -710,7 +732,7 @@ def main_move(args: MainMoveArgs) -> int:
     dst_repo_rel = parse_repo_path(args.dst.absolute(), root_path_tree)
     assert dst_repo_rel is not None
 
-    repo_file_tree = load_filesystem_for_repo(config.repo)
+    repo_file_tree = StatCachedFileTree(load_filesystem_for_repo(config.repo))
 
     assert args.src.is_file()
     perform_file_group_move_with_include_and_ifndef_update( 
@@ -741,7 +763,7 @@ def main_rm(args: MainRmArgs) -> int:
     target_repo_rel = parse_repo_path(args.target.absolute(), root_path_tree)
     assert target_repo_rel is not None
 
-    repo_file_tree = load_filesystem_for_repo(config.repo)
+    repo_file_tree = StatCachedFileTree(load_filesystem_for_repo(config.repo))
 
     assert args.target.is_file()
     rm_file_group( 
@@ -763,7 +785,7 @@ def main_find_include(args: MainFindIncludeArgs) -> int:
     config = get_config(args.path)
 
     repo = config.repo
-    repo_file_tree = load_filesystem_for_repo(repo)
+    repo_file_tree = load_filesystem_for_repo(repo, backend=config.tree_backend)
 
     include_spec = parse_include_spec(args.include)
     found: Set[File] = find_occurrences_of_include(repo_file_tree, include_spec, config.extension_config)
@@ -799,7 +821,7 @@ def main_lint(args: MainLintArgs) -> int:
             assert file.is_file()
         files = list(args.files)
 
-    repo_tree = fs.restrict_to_subdir(repo.path)
+    repo_tree = load_filesystem_for_repo(repo, backend=config.tree_backend)
     run_linter(
         repo=config.repo,
         repo_path_tree=repo_tree,
@@ -845,6 +867,8 @@ class MainDtgenArgs:
     path: Path
     files: Sequence[Path]
     force: bool
+    jobs: int
+    watch: bool
     verbosity: int
 
 
@@ -853,6 +877,18 @@ def main_dtgen(args: MainDtgenArgs) -> int:
     repo = find_repo(args.path, fs)
     assert repo is not None
     config = load_repo_config(repo, fs)
+    if args.watch:
+        assert len(args.files) == 0, "--watch always watches the whole repo"
+        watch_dtgen(
+            repo=repo,
+            force=args.force,
+            extension_config=config.extension_config,
+            ifndef_base=config.ifndef_name,
+            staleness=config.dtgen_staleness,
+            jobs=args.jobs,
+        )
+        return STATUS_OK
+
     if len(args.files) == 0:
         files = None
     else:
@@ -866,12 +902,16 @@ def main_dtgen(args: MainDtgenArgs) -> int:
 
     run_dtgen(
         repo=repo,
-        repo_file_tree=fs.restrict_to_subdir(repo.path),
+        repo_file_tree=load_filesystem_for_repo(repo, backend=config.tree_backend),
         force=args.force,
         extension_config=config.extension_config,
         ifndef_base=config.ifndef_name,
+        staleness=config.dtgen_staleness,
+        manifest=load_dtgen_manifest(repo),
+        render_cache=load_dtgen_render_cache(repo),
         files=files,
         delete_outdated=True,
+        jobs=args.jobs,
     )
     return STATUS_OK
 
@@ -1038,6 +1078,10 @@ def make_parser() -> argparse.ArgumentParser:
     dtgen_p.add_argument(
         "--force", action="store_true", help="Disable incremental toml->c++ generation"
     )
+    dtgen_p.add_argument("--jobs", "-j", type=int, default=multiprocessing.cpu_count())
+    dtgen_p.add_argument(
+        "--watch", action="store_true", help="Keep running and regenerate specs as they change"
+    )
     dtgen_p.add_argument("files", nargs="*", type=Path)
     add_verbosity_args(dtgen_p)
 
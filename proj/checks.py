@@ -18,6 +18,7 @@ from .format import (
 )
 from .dtgen import (
     run_dtgen,
+    load_dtgen_render_cache,
 )
 from .cmake import (
     cmake_all,
@@ -40,6 +41,7 @@ from .layout import (
     scan_repo_for_files,
     UnrecognizedFile,
     IncompleteGroup,
+    OrphanedDtgenOutput,
 )
 from .trees import (
     PathTree,
@@ -50,6 +52,7 @@ from .trees import (
 from .paths import (
     File,
     RoleInGroup,
+    GENERATED_HEADER_INFIXES,
     RepoRelPath,
 )
 from .ifndef import (
@@ -61,7 +64,7 @@ from .unparse_project import (
 )
 from .includes import (
     get_include_path,
-    get_generated_include_path,
+    get_generated_role_include_path,
     find_includes_in_cpp_file_contents,
     get_include_path_for_file,
 )
@@ -94,6 +97,10 @@ def run_layout_check(
             repo_rel_path: RepoRelPath = get_repo_rel_path(error.path, extension_config=extension_config)
             _l.warn('Unrecognized file at %s', repo_rel_path.path)
             failed = True
+        elif isinstance(error, OrphanedDtgenOutput):
+            # not a failure, as the next dtgen run removes these on its own
+            orphan_path = get_repo_rel_path(error.file, extension_config)
+            _l.warn('Generated file %s has no corresponding .dtg.toml', orphan_path.path)
     if failed:
         fail_with_error("Layout check failed.")
 
@@ -108,28 +115,36 @@ def run_include_check(
                 case RoleInGroup.PUBLIC_HEADER:
                     valid_include_paths.add(get_include_path(file.group, header_extension=extension_config.header_extension))
                 case RoleInGroup.DTGEN_TOML:
-                    valid_include_paths.add(get_generated_include_path(file.group, header_extension=extension_config.header_extension))
+                    for role in GENERATED_HEADER_INFIXES:
+                        valid_include_paths.add(get_generated_role_include_path(file.group, role, header_extension=extension_config.header_extension))
     
+    files = [
+        file for file in scan_repo_for_files(repo_path_tree, extension_config)
+        if isinstance(file, File)
+    ]
+    all_contents = repo_path_tree.get_many_file_contents(
+        get_repo_rel_path(file, extension_config).path
+        for file in files
+        if file.role != RoleInGroup.DTGEN_TOML
+    )
+
     failed = False
-    for file in scan_repo_for_files(repo_path_tree, extension_config):
-        if isinstance(file, File):
-            match file.role:
-                case RoleInGroup.DTGEN_TOML:
-                    valid_include_paths.add(get_include_path(file.group, header_extension=extension_config.header_extension))
-                case _:
-                    contents = repo_path_tree.get_file_contents(
-                        get_repo_rel_path(file, extension_config).path 
-                    )
-                    includes = find_includes_in_cpp_file_contents(
-                        contents,
-                        header_extension=extension_config.header_extension, 
-                    )
-                    for include in includes:
-                        if isinstance(include, File):
-                            include_path = get_include_path_for_file(include, header_extension=extension_config.header_extension)
-                            if include_path not in valid_include_paths:
-                                _l.warning('Found invalid include in %s: %s does not exist', file, include)
-                                failed = True
+    for file in files:
+        match file.role:
+            case RoleInGroup.DTGEN_TOML:
+                valid_include_paths.add(get_include_path(file.group, header_extension=extension_config.header_extension))
+            case _:
+                _, contents = next(all_contents)
+                includes = find_includes_in_cpp_file_contents(
+                    contents,
+                    header_extension=extension_config.header_extension, 
+                )
+                for include in includes:
+                    if isinstance(include, File):
+                        include_path = get_include_path_for_file(include, header_extension=extension_config.header_extension)
+                        if include_path not in valid_include_paths:
+                            _l.warning('Found invalid include in %s: %s does not exist', file, include)
+                            failed = True
     if failed:
         fail_with_error("Include check failed.")
           
@@ -164,7 +179,7 @@ def run_formatter_check(
 
 
 def run_check(config: ProjectConfig, check: Check, verbosity: int) -> None:
-    repo_file_tree = load_filesystem_for_repo(config.repo)
+    repo_file_tree = load_filesystem_for_repo(config.repo, backend=config.tree_backend)
 
     if check == Check.FORMAT:
         run_formatter_check(config)
@@ -221,6 +236,9 @@ def run_cpu_ci(config: ProjectConfig, verbosity: int) -> None:
         force=True,
         extension_config=config.extension_config,
         ifndef_base=config.ifndef_name,
+        staleness=config.dtgen_staleness,
+        jobs=multiprocessing.cpu_count(),
+        render_cache=load_dtgen_render_cache(config.repo),
     )
     _l.info("Running cmake...")
     cmake_all(config, fast=False, trace=False)
@@ -259,6 +277,9 @@ def run_gpu_ci(config: ProjectConfig, verbosity: int) -> None:
         force=True,
         extension_config=config.extension_config,
         ifndef_base=config.ifndef_name,
+        staleness=config.dtgen_staleness,
+        jobs=multiprocessing.cpu_count(),
+        render_cache=load_dtgen_render_cache(config.repo),
     )
     _l.info("Running cmake")
     cmake_all(config, fast=False, trace=False)
@@ -49,7 +49,10 @@ from enum import (
 from .paths import (
     Repo,
 )
-from .trees import FileTree
+from .trees import (
+    FileTree,
+    TreeBackend,
+)
 
 _l = logging.getLogger(__name__)
 
@@ -63,6 +66,11 @@ class ExtensionConfig:
         assert self.src_extension.startswith('.')
 
 
+class DtgenStaleness(StrEnum):
+    MTIME = "mtime"
+    CONTENT_HASH = "hash"
+
+
 @dataclass(frozen=True, order=True)
 class LibConfig:
     has_cpu_only_test_suite: bool
@@ -107,6 +115,8 @@ class ProjectConfig:
     _test_header_path: Optional[Path] = None
     _cuda_launch_cmd: Optional[Tuple[str, ...]] = None
     _layout_ignore_paths: Optional[Tuple[Path, ...]] = None
+    _tree_backend: Optional[TreeBackend] = None
+    _dtgen_staleness: Optional[DtgenStaleness] = None
 
     @property
     def repo(self) -> Repo:
@@ -404,6 +414,20 @@ class ProjectConfig:
         else:
             return self._layout_ignore_paths
 
+    @property
+    def tree_backend(self) -> TreeBackend:
+        if self._tree_backend is None:
+            return TreeBackend.FILESYSTEM
+        else:
+            return self._tree_backend
+
+    @property
+    def dtgen_staleness(self) -> DtgenStaleness:
+        if self._dtgen_staleness is None:
+            return DtgenStaleness.MTIME
+        else:
+            return self._dtgen_staleness
+
 def load_repo_config(repo: Repo, file_tree: FileTree) -> ProjectConfig:
     contents = file_tree.get_file_contents(repo.path / ".proj.toml")
     raw = toml.loads(contents)
@@ -554,6 +578,8 @@ class ConfigKey(StrEnum):
     TEST_HEADER_PATH = "test_header_path"
     CUDA_LAUNCH_CMD = "cuda_launch_cmd"
     LAYOUT_IGNORE_PATHS = "layout_ignore_paths"
+    TREE_BACKEND = "tree_backend"
+    DTGEN_STALENESS = "dtgen_staleness"
 
 def load_parsed_config(repo: Repo, raw: object) -> ProjectConfig:
     _l.debug("Loading parsed config: %s", raw)
@@ -587,6 +613,12 @@ def load_parsed_config(repo: Repo, raw: object) -> ProjectConfig:
         _test_header_path=load_path(raw.get(ConfigKey.TEST_HEADER_PATH)),
         _cuda_launch_cmd=load_str_tuple(raw.get(ConfigKey.CUDA_LAUNCH_CMD)),
         _layout_ignore_paths=load_path_tuple(raw.get(ConfigKey.LAYOUT_IGNORE_PATHS)),
+        _tree_backend=map_optional(
+            raw.get(ConfigKey.TREE_BACKEND), lambda x: TreeBackend(require_str(x))
+        ),
+        _dtgen_staleness=map_optional(
+            raw.get(ConfigKey.DTGEN_STALENESS), lambda x: DtgenStaleness(require_str(x))
+        ),
     )
 
 
@@ -3,31 +3,13 @@ from .trees import (
     MutableTracedFileTreeByWrapping,
     MaskedPathTree,
     MaskedFileTree,
-    EmulatedFileTree,
     FileTree,
     PathTree,
-    EmulatedPathTree,
     MutableTracedPathTreeByWrapping,
+    OverlayFileTree,
+    OverlayPathTree,
 )
 
-def file_tree_to_emulated(tree: FileTree) -> EmulatedFileTree:
-    return EmulatedFileTree.from_lists(
-        files=[
-            (f, tree.get_file_contents(f))
-            for f in tree.files()
-        ],
-        dirs=[
-            d for d in tree.dirs()    
-        ],
-    )
-
-def path_tree_to_emulated(tree: PathTree) -> EmulatedPathTree:
-    return EmulatedPathTree.from_lists(
-        files=[f for f in tree.files()],
-        dirs=[d for d in tree.dirs()],
-    )
-
-
 def load_repo_path_tree_for_dry_run(repo_path_tree: PathTree) -> MutableTracedPathTreeByWrapping:
     mask = AllowMask.from_iter([
         "lib/",
@@ -40,7 +22,7 @@ def load_repo_path_tree_for_dry_run(repo_path_tree: PathTree) -> MutableTracedPa
     )
 
     return MutableTracedPathTreeByWrapping(
-        path_tree_to_emulated(masked_path_tree),
+        OverlayPathTree(masked_path_tree),
     )
 
 
@@ -61,6 +43,6 @@ def load_repo_tree_for_dry_run(repo_file_tree: FileTree) -> MutableTracedFileTre
     )
 
     return MutableTracedFileTreeByWrapping(
-        file_tree_to_emulated(masked_file_tree),
+        OverlayFileTree(masked_file_tree),
     )
 
@@ -1,3 +1,8 @@
 from .project import (
     run_dtgen as run_dtgen,
+    load_dtgen_manifest as load_dtgen_manifest,
+    load_dtgen_render_cache as load_dtgen_render_cache,
+)
+from .watch import (
+    watch_dtgen as watch_dtgen,
 )
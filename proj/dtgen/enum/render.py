@@ -11,6 +11,7 @@ from proj.dtgen.render_utils import (
     commad,
     parens,
     render_doxygen_docstring,
+    sline,
 )
 from contextlib import contextmanager
 from typing import (
@@ -48,7 +49,7 @@ def source_includes_for_feature(feature: Feature) -> Sequence[IncludeSpec]:
 
 
 def infer_header_includes(spec: EnumSpec) -> Sequence[IncludeSpec]:
-    result = []
+    result = [IncludeSpec(path=PurePath("string_view"), system=True)]
     for feature in spec.features:
         for include in header_includes_for_feature(feature):
             if include not in result:
@@ -57,7 +58,13 @@ def infer_header_includes(spec: EnumSpec) -> Sequence[IncludeSpec]:
 
 
 def infer_source_includes(spec: EnumSpec) -> Sequence[IncludeSpec]:
-    result = []
+    result = [
+        IncludeSpec(path=PurePath("algorithm"), system=True),
+        IncludeSpec(path=PurePath("array"), system=True),
+        IncludeSpec(path=PurePath("utility"), system=True),
+        IncludeSpec(path=PurePath("stdexcept"), system=True),
+        IncludeSpec(path=PurePath("sstream"), system=True),
+    ]
     for feature in spec.features:
         for include in source_includes_for_feature(feature):
             if include not in result:
@@ -98,6 +105,49 @@ def render_fmt_impl(spec: EnumSpec, f: TextIO) -> None:
             f.write("return s << fmt::to_string(x);")
 
 
+def render_from_string_decl(name: str, f: TextIO) -> None:
+    f.write(f"bool try_from_string(std::string_view, {name} &);\n")
+    f.write(f"void from_string(std::string_view, {name} &);\n")
+
+
+def get_string_table_name(spec: EnumSpec) -> str:
+    return f"{spec.name}_string_table"
+
+
+def render_from_string_impl(spec: EnumSpec, f: TextIO) -> None:
+    # sorted in the same (unsigned, bytewise) order std::string_view compares
+    # in, so that lookups can binary search without allocating
+    entries = sorted(spec.values, key=lambda value: value.json_key.encode("utf8"))
+    table = get_string_table_name(spec)
+    entry_type = f"std::pair<std::string_view, {spec.name}>"
+    with render_namespace_block(spec.namespace, f):
+        with sline(f):
+            f.write(f"static constexpr std::array<{entry_type}, {len(entries)}> {table} = ")
+            with braces(f):
+                with braces(f):
+                    for value in commad(entries, f):
+                        f.write(f'{{"{value.json_key}", {spec.name}::{value.name}}}')
+        f.write(f"bool try_from_string(std::string_view s, {spec.name} &x)")
+        with braces(f):
+            with sline(f):
+                f.write(
+                    f"auto it = std::lower_bound({table}.begin(), {table}.end(), s, "
+                    f"[]({entry_type} const &entry, std::string_view key) {{ return entry.first < key; }})"
+                )
+            f.write(f"if (it == {table}.end() || it->first != s)")
+            with braces(f):
+                f.write("return false;\n")
+            f.write("x = it->second;\n")
+            f.write("return true;\n")
+        f.write(f"void from_string(std::string_view s, {spec.name} &x)")
+        with braces(f):
+            f.write("if (!try_from_string(s, x))")
+            with braces(f):
+                f.write("std::ostringstream oss;\n")
+                f.write(f'oss << "Unknown {spec.name} value " << s;\n')
+                f.write("throw std::runtime_error(oss.str());\n")
+
+
 def render_json_decl(name: str, f: TextIO) -> None:
     f.write(f"void to_json(::nlohmann::json &, {name});\n")
     f.write(f"void from_json(::nlohmann::json const &, {name} &);\n")
@@ -121,16 +171,7 @@ def render_json_impl(spec: EnumSpec, f: TextIO) -> None:
                 f.write("throw std::runtime_error(oss.str());\n")
         f.write(f"void from_json(::nlohmann::json const &j, {spec.name} &x)")
         with braces(f):
-            f.write("std::string as_str = j.get<std::string>();\n")
-            for value in spec.values:
-                f.write(f'if (as_str == "{value.json_key}")')
-                with braces(f):
-                    f.write(f"x = {spec.name}::{value.name};\n")
-                f.write("else ")
-            with braces(f):
-                f.write("std::ostringstream oss;\n")
-                f.write(f'oss << "Unknown {spec.name} value " << as_str;\n')
-                f.write("throw std::runtime_error(oss.str());\n")
+            f.write("from_string(j.get_ref<std::string const &>(), x);\n")
 
 
 def render_rapidcheck_decl(spec: EnumSpec, f: TextIO) -> None:
@@ -173,6 +214,14 @@ def render_hash_impl(spec: EnumSpec, f: TextIO) -> None:
             f.write("return std::hash<int>{}(static_cast<int>(x));\n")
 
 
+def render_fwd_header(spec: EnumSpec, f: TextIO) -> None:
+    with render_namespace_block(spec.namespace, f):
+        # scoped enums default to an int underlying type, so they can be
+        # declared without repeating it
+        with sline(f):
+            f.write(f"enum class {spec.name}")
+
+
 def render_header(spec: EnumSpec, f: TextIO) -> None:
     render_includes(infer_header_includes(spec), f)
     f.write("\n")
@@ -185,6 +234,7 @@ def render_header(spec: EnumSpec, f: TextIO) -> None:
                 if value.docstring is not None:
                     f.write("\n\n" + render_doxygen_docstring(value.docstring))
                 f.write(value.name)
+        render_from_string_decl(spec.name, f)
         if Feature.FMT in spec.features:
             render_fmt_decl(spec.name, f)
         if Feature.JSON in spec.features:
@@ -199,6 +249,8 @@ def render_source(spec: EnumSpec, f: TextIO) -> None:
     render_includes(infer_source_includes(spec), f)
     f.write("\n")
 
+    render_from_string_impl(spec, f)
+
     if Feature.HASH in spec.features:
         render_hash_impl(spec, f)
     if Feature.FMT in spec.features:
@@ -207,3 +259,28 @@ def render_source(spec: EnumSpec, f: TextIO) -> None:
         render_json_impl(spec, f)
     if Feature.RAPIDCHECK in spec.features:
         render_rapidcheck_impl(spec, f)
+
+
+def render_feature_header(spec: EnumSpec, feature: Feature, f: TextIO) -> None:
+    assert feature in spec.split_features
+    render_includes(header_includes_for_feature(feature), f)
+    f.write("\n")
+
+    if feature == Feature.JSON:
+        with render_namespace_block(spec.namespace, f):
+            render_json_decl(spec.name, f)
+    else:
+        assert feature == Feature.RAPIDCHECK
+        render_rapidcheck_decl(spec, f)
+
+
+def render_feature_source(spec: EnumSpec, feature: Feature, f: TextIO) -> None:
+    assert feature in spec.split_features
+    render_includes(source_includes_for_feature(feature), f)
+    f.write("\n")
+
+    if feature == Feature.JSON:
+        render_json_impl(spec, f)
+    else:
+        assert feature == Feature.RAPIDCHECK
+        render_rapidcheck_impl(spec, f)
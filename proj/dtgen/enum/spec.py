@@ -10,6 +10,7 @@ from enum import Enum, auto
 from pathlib import Path
 import proj.toml as toml
 from proj.json import Json
+import proj.dtgen.render_utils as render_utils
 
 
 class Feature(Enum):
@@ -50,6 +51,7 @@ class EnumSpec:
     values: Sequence[ValueSpec]
     features: FrozenSet[Feature]
     docstring: Optional[str]
+    split_features: FrozenSet[Feature] = frozenset()
 
     def json(self) -> Json:
         return {
@@ -61,6 +63,10 @@ class EnumSpec:
                 for feature in sorted(self.features, key=lambda f: f.name)
             ],
             "docstring": self.docstring,
+            "split_features": [
+                feature.json()
+                for feature in sorted(self.split_features, key=lambda f: f.name)
+            ],
         }
 
 
@@ -77,6 +83,14 @@ def parse_feature(raw: str) -> Feature:
         raise ValueError(f"Unknown feature: {raw}")
 
 
+def parse_split_features(
+    raw: Sequence[str], features: FrozenSet[Feature]
+) -> FrozenSet[Feature]:
+    return render_utils.parse_split_features(
+        raw, features, parse_feature, {Feature.JSON, Feature.RAPIDCHECK}
+    )
+
+
 def parse_value_spec(raw: Mapping[str, Any]) -> ValueSpec:
     return ValueSpec(
         name=raw["name"],
@@ -86,12 +100,14 @@ def parse_value_spec(raw: Mapping[str, Any]) -> ValueSpec:
 
 
 def parse_enum_spec(raw: Mapping[str, Any]) -> EnumSpec:
+    features = frozenset([parse_feature(feature) for feature in raw["features"]])
     return EnumSpec(
         namespace=raw.get("namespace", None),
         name=raw["name"],
         values=[parse_value_spec(value) for value in raw["values"]],
-        features=frozenset([parse_feature(feature) for feature in raw["features"]]),
+        features=features,
         docstring=raw.get("docstring", None),
+        split_features=parse_split_features(raw.get("split_features", ()), features),
     )
 
 
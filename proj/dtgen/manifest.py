@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from pathlib import PurePath, Path
+from typing import (
+    AbstractSet,
+    Dict,
+    Mapping,
+    Optional,
+)
+from proj.trees import FileTreeWithMtime
+import json
+import logging
+import os
+import tempfile
+import time
+
+_l = logging.getLogger(__name__)
+
+DTGEN_MANIFEST_VERSION = 2
+
+# outputs written this recently may still change within the same mtime tick,
+# so (as for the tree index) they are not recorded until a later run
+RACY_WINDOW_S = 2.0
+
+@dataclass(frozen=True)
+class DtgenOutputRecord:
+    mtime: float
+    size: int
+    content_hash: str
+
+@dataclass(frozen=True)
+class DtgenManifestEntry:
+    spec_mtime: float
+    spec_size: int
+    spec_hash: str
+    generator_version: int
+    outputs: Mapping[PurePath, DtgenOutputRecord]
+    output_dirs: Mapping[PurePath, float]
+
+    @staticmethod
+    def from_json(j: object) -> 'DtgenManifestEntry':
+        assert isinstance(j, list)
+        assert len(j) == 6
+        spec_mtime, spec_size, spec_hash, generator_version, outputs, output_dirs = j
+        assert isinstance(spec_mtime, (int, float))
+        assert isinstance(spec_size, int)
+        assert isinstance(spec_hash, str)
+        assert isinstance(generator_version, int)
+        assert isinstance(outputs, dict)
+        assert isinstance(output_dirs, dict)
+        return DtgenManifestEntry(
+            spec_mtime=spec_mtime,
+            spec_size=spec_size,
+            spec_hash=spec_hash,
+            generator_version=generator_version,
+            outputs={
+                PurePath(out): DtgenOutputRecord(mtime=out_mtime, size=out_size, content_hash=out_hash)
+                for out, (out_mtime, out_size, out_hash) in outputs.items()
+            },
+            output_dirs={PurePath(d): dir_mtime for d, dir_mtime in output_dirs.items()},
+        )
+
+    def to_json(self) -> object:
+        return [
+            self.spec_mtime,
+            self.spec_size,
+            self.spec_hash,
+            self.generator_version,
+            {str(out): [r.mtime, r.size, r.content_hash] for out, r in sorted(self.outputs.items())},
+            {str(d): dir_mtime for d, dir_mtime in sorted(self.output_dirs.items())},
+        ]
+
+    def is_up_to_date(self, file_tree: FileTreeWithMtime, spec_path: PurePath, generator_version: int) -> bool:
+        if self.generator_version != generator_version:
+            return False
+        # specs are edited in place, which leaves their directory's mtime alone
+        if file_tree.get_mtime(spec_path) != self.spec_mtime or file_tree.get_size(spec_path) != self.spec_size:
+            return False
+        # outputs are only ever replaced (by dtgen's atomic writes or a git
+        # checkout), which bumps the directory mtime, so while every output
+        # directory is unchanged the outputs need not be stat'ed one by one
+        if all(
+            file_tree.has_dir(d) and file_tree.get_mtime(d) == dir_mtime
+            for d, dir_mtime in self.output_dirs.items()
+        ):
+            return True
+        return all(
+            file_tree.has_file(out)
+            and file_tree.get_mtime(out) == record.mtime
+            and file_tree.get_size(out) == record.size
+            for out, record in self.outputs.items()
+        )
+
+    def is_racy(self) -> bool:
+        now = time.time()
+        return any(
+            now - mtime < RACY_WINDOW_S
+            for mtime in [
+                self.spec_mtime,
+                *(r.mtime for r in self.outputs.values()),
+                *self.output_dirs.values(),
+            ]
+        )
+
+class DtgenManifest:
+    _path: Path
+    _entries: Dict[PurePath, DtgenManifestEntry]
+    _is_dirty: bool
+
+    def __init__(self, path: Path, entries: Dict[PurePath, DtgenManifestEntry]) -> None:
+        self._path = path
+        self._entries = entries
+        self._is_dirty = False
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @staticmethod
+    def load(path: Path) -> 'DtgenManifest':
+        try:
+            with path.open('r') as f:
+                j = json.load(f)
+            assert isinstance(j, dict)
+            if j.get('version') != DTGEN_MANIFEST_VERSION:
+                _l.debug(f'Ignoring dtgen manifest {path} with unknown version {j.get("version")}')
+                return DtgenManifest(path, {})
+            specs = j['specs']
+            assert isinstance(specs, dict)
+            return DtgenManifest(path, {
+                PurePath(spec): DtgenManifestEntry.from_json(entry) for spec, entry in specs.items()
+            })
+        except FileNotFoundError:
+            return DtgenManifest(path, {})
+        except (OSError, ValueError, TypeError, AssertionError) as e:
+            _l.debug(f'Ignoring unreadable dtgen manifest {path}: {e}')
+            return DtgenManifest(path, {})
+
+    def lookup(self, spec_path: PurePath) -> Optional[DtgenManifestEntry]:
+        return self._entries.get(spec_path)
+
+    def record(self, spec_path: PurePath, entry: DtgenManifestEntry) -> None:
+        if self._entries.get(spec_path) == entry:
+            return
+        self._is_dirty = True
+        if entry.is_racy():
+            self._entries.pop(spec_path, None)
+        else:
+            self._entries[spec_path] = entry
+
+    def retain(self, spec_paths: AbstractSet[PurePath]) -> None:
+        for spec_path in [p for p in self._entries if p not in spec_paths]:
+            del self._entries[spec_path]
+            self._is_dirty = True
+
+    def save(self) -> None:
+        if not self._is_dirty:
+            return
+        j = {
+            'version': DTGEN_MANIFEST_VERSION,
+            'specs': {str(spec): entry.to_json() for spec, entry in sorted(self._entries.items())},
+        }
+        tmp_path: Optional[str] = None
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self._path.parent, delete=False) as f:
+                tmp_path = f.name
+                json.dump(j, f, separators=(',', ':'))
+            os.replace(tmp_path, self._path)
+            self._is_dirty = False
+        except OSError as e:
+            _l.debug(f'Failed to write dtgen manifest {self._path}: {e}')
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
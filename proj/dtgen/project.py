@@ -1,4 +1,5 @@
 from proj.config_file import (
+    DtgenStaleness,
     ExtensionConfig,
 )
 from typing import (
@@ -7,6 +8,10 @@ from typing import (
     Optional,
     Union,
     List,
+    Iterator,
+    Tuple,
+    Dict,
+    Mapping,
 )
 from pathlib import (
     Path,
@@ -15,82 +20,123 @@ from pathlib import (
 from .struct.render import (
     render_header as render_struct_header,
     render_source as render_struct_source,
+    render_fwd_header as render_struct_fwd_header,
+    render_feature_header as render_struct_feature_header,
+    render_feature_source as render_struct_feature_source,
 )
 from .struct.spec import (
     StructSpec,
+    Feature as StructFeature,
     parse_struct_spec,
 )
 from .enum.render import (
     render_header as render_enum_header,
     render_source as render_enum_source,
+    render_fwd_header as render_enum_fwd_header,
+    render_feature_header as render_enum_feature_header,
+    render_feature_source as render_enum_feature_source,
 )
 from .enum.spec import (
     EnumSpec,
+    Feature as EnumFeature,
     parse_enum_spec,
 )
 from .variant.spec import (
     VariantSpec,
+    Feature as VariantFeature,
     parse_variant_spec,
 )
 from .variant.render import (
     render_header as render_variant_header,
     render_source as render_variant_source,
+    render_fwd_header as render_variant_fwd_header,
+    render_feature_header as render_variant_feature_header,
+    render_feature_source as render_variant_feature_source,
 )
-from proj.hash import get_file_hash
 from .. import json as json
 from ..json import (
     Json,
 )
 import logging
-from .find_outdated import find_outdated
+from .manifest import (
+    DtgenManifest,
+    DtgenManifestEntry,
+    DtgenOutputRecord,
+)
+from .render_cache import (
+    DtgenRenderCache,
+    get_shared_cache_dir,
+)
+import proj.dtgen.render_utils as render_utils
 from proj.paths import (
     FileGroup,
     File,
     Repo,
     RepoRelPath,
+    RoleInGroup,
 )
 from proj.trees import (
     PathTree,
     FileTree,
     FileTreeWithMtime,
     MutableFileTreeWithMtime,
+    StatCachedFileTree,
+    WriteIfChangedFileTree,
 )
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import functools
+import itertools
+import hashlib
 import io
 import tomllib
 from ..unparse_project import (
     get_repo_rel_path,
 )
-from ..parse_project import (
-    parse_file_path,
+from ..layout import (
+    DtgenFiles,
+    scan_repo_for_dtgen_files,
 )
 from proj.includes import (
     get_generated_include_path,
+    get_generated_role_include_path,
 )
 from proj.ifndef import get_correct_ifndef_for_path
+import proj.ifndef
+import proj.includes
 
 _l = logging.getLogger(__name__)
 
+# bump whenever a change to the renderers changes generated output, so that
+# hash-based staleness checks regenerate files from older versions
+DTGEN_VERSION = 4
 
-def find_dtgen_spec_in_repo(path_tree: PathTree, extension_config: ExtensionConfig) -> List[File]:
+# the proj-data block always sits right after the three-line disclaimer
+METADATA_PREFIX_SIZE = 4096
+
+# the companion (header, source) roles for each feature listed in a spec's
+# split_features, keyed by feature name as each spec type has its own Feature
+SPLIT_FEATURE_ROLES: Mapping[str, Tuple[RoleInGroup, RoleInGroup]] = {
+    'JSON': (RoleInGroup.GENERATED_JSON_HEADER, RoleInGroup.GENERATED_JSON_SOURCE),
+    'RAPIDCHECK': (RoleInGroup.GENERATED_RAPIDCHECK_HEADER, RoleInGroup.GENERATED_RAPIDCHECK_SOURCE),
+}
+
+
+def is_dtgen_blacklisted(p: PurePath) -> bool:
     blacklist = [
         PurePath("triton"),
         PurePath("deps"),
         PurePath("build"),
     ]
+    return p in blacklist
 
-    def is_blacklisted(p: PurePath) -> bool:
-        for blacklisted in blacklist:
-            if found.is_relative_to(blacklisted):
-                return True
-        return False
 
-    result = []
-    for found in path_tree.with_extension(".dtg.toml"):
-        if not is_blacklisted(found):
-            parsed = parse_file_path(RepoRelPath(found), extension_config)
-            assert parsed is not None, found
-            result.append(parsed)
-    return result
+def scan_dtgen_files_in_repo(path_tree: PathTree, extension_config: ExtensionConfig) -> DtgenFiles:
+    return scan_repo_for_dtgen_files(path_tree, extension_config, prune=is_dtgen_blacklisted)
+
+
+def find_dtgen_spec_in_repo(path_tree: PathTree, extension_config: ExtensionConfig) -> List[File]:
+    return list(scan_dtgen_files_in_repo(path_tree, extension_config).specs)
 
 
 def render_disclaimer(spec_path: RepoRelPath, f: TextIO) -> None:
@@ -100,7 +146,7 @@ def render_disclaimer(spec_path: RepoRelPath, f: TextIO) -> None:
 
 
 def render_proj_metadata(spec_path: PurePath, spec_hash: bytes, f: TextIO) -> None:
-    proj_metadata = {"generated_from": spec_hash.hex()}
+    proj_metadata: Json = {"generated_from": spec_hash.hex(), "generator_version": DTGEN_VERSION}
     f.write("/* proj-data\n")
     f.write(json.dumps(proj_metadata, sort_keys=True, indent=2))
     f.write("\n*/\n")
@@ -136,6 +182,11 @@ def load_proj_metadata(p: Path) -> Optional[Json]:
     return found
 
 
+def load_proj_metadata_from_tree(file_tree: FileTree, p: PurePath) -> Optional[Json]:
+    with io.StringIO(file_tree.get_file_head(p, METADATA_PREFIX_SIZE)) as f:
+        return _load_proj_metadata(f)
+
+
 def get_existing_hash(p: Path) -> Optional[bytes]:
     if not p.is_file():
         return None
@@ -199,49 +250,41 @@ def generate_header_contents(
         f.write(f"#endif // {ifndef}\n")
         return f.getvalue()
  
-def generate_header(
-    file_tree: MutableFileTreeWithMtime,
+def generate_fwd_header_contents(
     spec: Union[StructSpec, EnumSpec, VariantSpec],
     file_group: FileGroup,
-    force: bool,
+    spec_hash: bytes,
     extension_config: ExtensionConfig,
-    ifndef_base: str,
-) -> Optional[PurePath]:
-
+    ifndef_base: str
+) -> str:
     spec_repo_rel = get_repo_rel_path(
         file_group.dtgen_toml,
         extension_config=extension_config,
     )
 
     out_repo_rel = get_repo_rel_path(
-        file_group.generated_header,
+        file_group.generated_fwd_header,
         extension_config=extension_config,
     )
 
-    if not (force or needs_generate_to_path(
-            file_tree=file_tree,
-            spec_path=spec_repo_rel.path, 
-            out=out_repo_rel.path)):
-        _l.debug(
-            f"No generation needed for {spec_repo_rel.path} -> {out_repo_rel.path}"
-        )
-        return None
-
-    _l.info(f"Regenerating {spec_repo_rel.path} -> {out_repo_rel.path}")
-
-    spec_hash = get_file_hash(file_tree, spec_repo_rel.path)
-    assert spec_hash is not None
-
-    file_tree.mkdir(out_repo_rel.path.parent, exist_ok=True, parents=True)
-    contents = generate_header_contents(
-        spec=spec,
-        file_group=file_group,
-        spec_hash=spec_hash,
-        extension_config=extension_config,
-        ifndef_base=ifndef_base,
-    )
-    file_tree.set_file_contents(out_repo_rel.path, contents, exist_ok=True)
-    return out_repo_rel.path
+    with io.StringIO() as f:
+        render_disclaimer(spec_path=spec_repo_rel, f=f)
+        render_proj_metadata(spec_path=spec_repo_rel.path, spec_hash=spec_hash, f=f)
+        ifndef = get_correct_ifndef_for_path(ifndef_base, out_repo_rel)
+        f.write("\n")
+        f.write(f"#ifndef {ifndef}\n")
+        f.write(f"#define {ifndef}\n")
+        f.write("\n")
+        if isinstance(spec, StructSpec):
+            render_struct_fwd_header(spec, f)
+        elif isinstance(spec, VariantSpec):
+            render_variant_fwd_header(spec, f)
+        else:
+            assert isinstance(spec, EnumSpec)
+            render_enum_fwd_header(spec, f)
+        f.write("\n")
+        f.write(f"#endif // {ifndef}\n")
+        return f.getvalue()
 
 def generate_source_contents(
     spec: Union[StructSpec, EnumSpec, VariantSpec],
@@ -271,13 +314,16 @@ def generate_source_contents(
             render_enum_source(spec, f)
         return f.getvalue()
 
-def generate_source(
-    file_tree: MutableFileTreeWithMtime,
+def generate_feature_header_contents(
     spec: Union[StructSpec, EnumSpec, VariantSpec],
+    feature_name: str,
     file_group: FileGroup,
-    force: bool,
+    spec_hash: bytes,
     extension_config: ExtensionConfig,
-) -> Optional[PurePath]:
+    ifndef_base: str
+) -> str:
+    header_role, _ = SPLIT_FEATURE_ROLES[feature_name]
+    include_path = get_generated_include_path(file_group, extension_config.header_extension)
 
     spec_repo_rel = get_repo_rel_path(
         file_group.dtgen_toml,
@@ -285,34 +331,63 @@ def generate_source(
     )
 
     out_repo_rel = get_repo_rel_path(
-        file_group.generated_source,
+        File(file_group, header_role),
         extension_config=extension_config,
     )
 
-    if not (force or needs_generate_to_path(file_tree, spec_path=spec_repo_rel.path, out=out_repo_rel.path)):
-        _l.debug(
-            f"No generation needed for {spec_repo_rel.path} -> {out_repo_rel.path}"
-        )
-        return None
+    with io.StringIO() as f:
+        render_disclaimer(spec_path=spec_repo_rel, f=f)
+        render_proj_metadata(spec_path=spec_repo_rel.path, spec_hash=spec_hash, f=f)
+        ifndef = get_correct_ifndef_for_path(ifndef_base, out_repo_rel)
+        f.write("\n")
+        f.write(f"#ifndef {ifndef}\n")
+        f.write(f"#define {ifndef}\n")
+        f.write("\n")
+        f.write(f'#include "{include_path}"\n')
+        if isinstance(spec, StructSpec):
+            render_struct_feature_header(spec, StructFeature[feature_name], f)
+        elif isinstance(spec, VariantSpec):
+            render_variant_feature_header(spec, VariantFeature[feature_name], f)
+        else:
+            assert isinstance(spec, EnumSpec)
+            render_enum_feature_header(spec, EnumFeature[feature_name], f)
+        f.write("\n")
+        f.write(f"#endif // {ifndef}\n")
+        return f.getvalue()
 
-    _l.info(f"Regenerating {spec_repo_rel.path} -> {out_repo_rel.path}")
-    
-    spec_hash = get_file_hash(file_tree, spec_repo_rel.path)
-    assert spec_hash is not None
+def generate_feature_source_contents(
+    spec: Union[StructSpec, EnumSpec, VariantSpec],
+    feature_name: str,
+    file_group: FileGroup,
+    spec_hash: bytes,
+    extension_config: ExtensionConfig,
+) -> str:
+    header_role, _ = SPLIT_FEATURE_ROLES[feature_name]
+    include_path = get_generated_role_include_path(file_group, header_role, extension_config.header_extension)
 
-    file_tree.mkdir(out_repo_rel.path.parent, exist_ok=True, parents=True)
-    contents = generate_source_contents(
-        spec=spec, 
-        file_group=file_group,
-        spec_hash=spec_hash,
+    spec_repo_rel = get_repo_rel_path(
+        file_group.dtgen_toml,
         extension_config=extension_config,
     )
-    file_tree.set_file_contents(out_repo_rel.path, contents, exist_ok=True)
-    return out_repo_rel.path
 
-def load_spec_file(p: PurePath, repo_file_tree: FileTree) -> Union[StructSpec, EnumSpec, VariantSpec]:
+    with io.StringIO() as f:
+        render_disclaimer(spec_path=spec_repo_rel, f=f)
+        render_proj_metadata(spec_path=spec_repo_rel.path, spec_hash=spec_hash, f=f)
+        f.write("\n")
+        f.write(f'#include "{include_path}"\n')
+        f.write("\n")
+        if isinstance(spec, StructSpec):
+            render_struct_feature_source(spec, StructFeature[feature_name], f)
+        elif isinstance(spec, VariantSpec):
+            render_variant_feature_source(spec, VariantFeature[feature_name], f)
+        else:
+            assert isinstance(spec, EnumSpec)
+            render_enum_feature_source(spec, EnumFeature[feature_name], f)
+        return f.getvalue()
+
+def parse_spec_contents(p: PurePath, contents: str) -> Union[StructSpec, EnumSpec, VariantSpec]:
     try:
-        raw = tomllib.loads(repo_file_tree.get_file_contents(p))
+        raw = tomllib.loads(contents)
     except tomllib.TOMLDecodeError as e:
         raise RuntimeError(f"Failed to load spec {p}") from e
 
@@ -330,46 +405,382 @@ def load_spec_file(p: PurePath, repo_file_tree: FileTree) -> Union[StructSpec, E
     except KeyError as e:
         raise RuntimeError(f"Failed to parse spec {p}") from e
 
-def generate_files(
-    file_group: FileGroup, 
-    force: bool, 
-    extension_config: ExtensionConfig, 
-    ifndef_base: str,
-    file_tree: MutableFileTreeWithMtime,
-) -> List[PurePath]:
-    spec_path = get_repo_rel_path(file_group.dtgen_toml, extension_config)
+def load_spec_file(p: PurePath, repo_file_tree: FileTree) -> Union[StructSpec, EnumSpec, VariantSpec]:
+    return parse_spec_contents(p, repo_file_tree.get_file_contents(p))
+
+@dataclass(frozen=True)
+class DtgenRenderTask:
+    file_group: FileGroup
+    spec_path: PurePath
+    spec_contents: str
+    header_path: Optional[PurePath]
+    source_path: Optional[PurePath]
+    extension_config: ExtensionConfig
+    ifndef_base: str
+    fwd_header_path: Optional[PurePath] = None
+    render_companions: bool = False
+
+@dataclass(frozen=True)
+class DtgenRenderResult:
+    header_contents: Optional[str]
+    source_contents: Optional[str]
+    fwd_header_contents: Optional[str] = None
+    companion_contents: Mapping[PurePath, str] = field(default_factory=dict)
+
+def get_dtgen_outputs(file_group: FileGroup) -> List[File]:
+    return [
+        file_group.generated_header,
+        file_group.generated_fwd_header,
+        file_group.generated_source,
+    ]
 
-    spec = load_spec_file(spec_path.path, file_tree)
+def get_split_companion_outputs(file_group: FileGroup, spec_path: PurePath, spec_contents: str) -> Optional[List[File]]:
+    # returns None if the spec cannot be parsed, in which case rendering it
+    # reports the error. Most specs split nothing, so they skip the parse
+    if 'split_features' not in spec_contents:
+        return []
+    try:
+        spec = parse_spec_contents(spec_path, spec_contents)
+    except (RuntimeError, ValueError):
+        return None
+    return [
+        File(file_group, role)
+        for feature in sorted(spec.split_features, key=lambda f: f.name)
+        for role in SPLIT_FEATURE_ROLES[feature.name]
+    ]
 
-    generated = []
+def get_dtgen_companion_outputs(file_group: FileGroup) -> List[File]:
+    return [
+        File(file_group, role)
+        for roles in SPLIT_FEATURE_ROLES.values()
+        for role in roles
+    ]
 
-    _l.debug('Generating header file for %s', file_group)
-    header_path = generate_header(
-        file_tree, 
-        spec=spec, 
-        file_group=file_group, 
-        force=force, 
-        extension_config=extension_config, 
-        ifndef_base=ifndef_base,
-    )
+def iter_dtgen_result_outputs(task: DtgenRenderTask, result: DtgenRenderResult) -> Iterator[Tuple[PurePath, str]]:
+    for out, contents in [
+        (task.header_path, result.header_contents),
+        (task.fwd_header_path, result.fwd_header_contents),
+        (task.source_path, result.source_contents),
+    ]:
+        if out is not None:
+            assert contents is not None
+            yield (out, contents)
+    yield from result.companion_contents.items()
+
+def needs_generate_by_hash(file_tree: FileTree, spec_hash: bytes, out: PurePath) -> bool:
+    if not file_tree.has_file(out):
+        _l.debug('File %s does not exist, so generation is needed', out)
+        return True
+
+    metadata = load_proj_metadata_from_tree(file_tree, out)
+    if not isinstance(metadata, dict):
+        _l.debug('File %s has no proj metadata, so generation is needed', out)
+        return True
+
+    _l.debug(f"Spec hash: {spec_hash.hex()!r} vs Out metadata {metadata!r}")
+    return metadata.get("generated_from") != spec_hash.hex() \
+        or metadata.get("generator_version") != DTGEN_VERSION
+
+def plan_dtgen_task(
+    file_group: FileGroup,
+    force: bool,
+    extension_config: ExtensionConfig,
+    ifndef_base: str,
+    file_tree: FileTreeWithMtime,
+    staleness: DtgenStaleness = DtgenStaleness.MTIME,
+) -> Optional[DtgenRenderTask]:
+    spec_path = get_repo_rel_path(file_group.dtgen_toml, extension_config).path
+    # needed up front to know which companion outputs the spec has
+    spec_contents = file_tree.get_file_contents(spec_path)
+    spec_hash = hashlib.md5(spec_contents.encode('utf8')).digest()
+
+    def is_stale(out: PurePath) -> bool:
+        if staleness == DtgenStaleness.MTIME and not needs_generate_to_path(file_tree, spec_path=spec_path, out=out):
+            return False
+        # a spec newer than its output may only have been touched (or its
+        # unchanged output skipped by write-if-changed), so the spec hash
+        # embedded in the output decides whether it really changed
+        return needs_generate_by_hash(file_tree, spec_hash=spec_hash, out=out)
+
+    def needs_generate(out: PurePath) -> bool:
+        if not (force or is_stale(out)):
+            _l.debug(f"No generation needed for {spec_path} -> {out}")
+            return False
+        _l.info(f"Regenerating {spec_path} -> {out}")
+        return True
+
+    header_path = get_repo_rel_path(file_group.generated_header, extension_config).path
+    fwd_header_path = get_repo_rel_path(file_group.generated_fwd_header, extension_config).path
+    source_path = get_repo_rel_path(file_group.generated_source, extension_config).path
+    header_out = header_path if needs_generate(header_path) else None
+    fwd_header_out = fwd_header_path if needs_generate(fwd_header_path) else None
+    source_out = source_path if needs_generate(source_path) else None
 
-    if header_path is not None:
-        generated.append(header_path)
+    companions = get_split_companion_outputs(file_group, spec_path, spec_contents)
+    if companions is None:
+        render_companions = True
+    else:
+        # evaluated for every companion (rather than short-circuiting) so
+        # that each stale one is logged. A stale header also means the spec
+        # changed, so companions of features no longer split get removed
+        stale_companions = [
+            needs_generate(get_repo_rel_path(companion, extension_config).path)
+            for companion in companions
+        ]
+        render_companions = header_out is not None or any(stale_companions)
+
+    if header_out is None and fwd_header_out is None and source_out is None and not render_companions:
+        return None
 
-    _l.debug('Generating source file for %s', file_group)
-    source_path = generate_source(
-        file_tree,
-        spec=spec,
+    return DtgenRenderTask(
         file_group=file_group,
-        force=force,
+        spec_path=spec_path,
+        spec_contents=spec_contents,
+        header_path=header_out,
+        source_path=source_out,
         extension_config=extension_config,
+        ifndef_base=ifndef_base,
+        fwd_header_path=fwd_header_out,
+        render_companions=render_companions,
     )
 
-    if source_path is not None:
-        generated.append(source_path)
+def render_dtgen_task(task: DtgenRenderTask) -> DtgenRenderResult:
+    spec = parse_spec_contents(task.spec_path, task.spec_contents)
+    # split features are rendered into their companion files instead
+    unsplit_spec = render_utils.without_split_features(spec)
+    spec_hash = hashlib.md5(task.spec_contents.encode('utf8')).digest()
+
+    header_contents: Optional[str] = None
+    if task.header_path is not None:
+        header_contents = generate_header_contents(
+            spec=unsplit_spec,
+            file_group=task.file_group,
+            spec_hash=spec_hash,
+            extension_config=task.extension_config,
+            ifndef_base=task.ifndef_base,
+        )
 
+    fwd_header_contents: Optional[str] = None
+    if task.fwd_header_path is not None:
+        fwd_header_contents = generate_fwd_header_contents(
+            spec=unsplit_spec,
+            file_group=task.file_group,
+            spec_hash=spec_hash,
+            extension_config=task.extension_config,
+            ifndef_base=task.ifndef_base,
+        )
+
+    source_contents: Optional[str] = None
+    if task.source_path is not None:
+        source_contents = generate_source_contents(
+            spec=unsplit_spec,
+            file_group=task.file_group,
+            spec_hash=spec_hash,
+            extension_config=task.extension_config,
+        )
+
+    companion_contents: Dict[PurePath, str] = {}
+    if task.render_companions:
+        for feature in sorted(spec.split_features, key=lambda f: f.name):
+            header_role, source_role = SPLIT_FEATURE_ROLES[feature.name]
+            companion_header_path = get_repo_rel_path(File(task.file_group, header_role), task.extension_config).path
+            companion_contents[companion_header_path] = generate_feature_header_contents(
+                spec=spec,
+                feature_name=feature.name,
+                file_group=task.file_group,
+                spec_hash=spec_hash,
+                extension_config=task.extension_config,
+                ifndef_base=task.ifndef_base,
+            )
+            companion_source_path = get_repo_rel_path(File(task.file_group, source_role), task.extension_config).path
+            companion_contents[companion_source_path] = generate_feature_source_contents(
+                spec=spec,
+                feature_name=feature.name,
+                file_group=task.file_group,
+                spec_hash=spec_hash,
+                extension_config=task.extension_config,
+            )
+
+    return DtgenRenderResult(
+        header_contents=header_contents,
+        source_contents=source_contents,
+        fwd_header_contents=fwd_header_contents,
+        companion_contents=companion_contents,
+    )
+
+def write_dtgen_result(
+    task: DtgenRenderTask,
+    result: DtgenRenderResult,
+    file_tree: MutableFileTreeWithMtime,
+) -> List[PurePath]:
+    generated = []
+    for out, contents in iter_dtgen_result_outputs(task, result):
+        file_tree.mkdir(out.parent, exist_ok=True, parents=True)
+        file_tree.set_file_contents(out, contents, exist_ok=True)
+        generated.append(out)
+
+    if task.render_companions:
+        # companions of features that are no longer split
+        for companion in get_dtgen_companion_outputs(task.file_group):
+            companion_path = get_repo_rel_path(companion, task.extension_config).path
+            if companion_path not in result.companion_contents and file_tree.has_file(companion_path):
+                _l.info(f"Removing out-of-date file at {companion_path}")
+                file_tree.rm_file(companion_path)
     return generated
 
+def render_dtgen_tasks(
+    tasks: Sequence[DtgenRenderTask],
+    jobs: int,
+) -> Iterator[Tuple[DtgenRenderTask, Union[DtgenRenderResult, Exception]]]:
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            try:
+                yield (task, render_dtgen_task(task))
+            except Exception as e:
+                yield (task, e)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        futures = [pool.submit(render_dtgen_task, task) for task in tasks]
+        for task, future in zip(tasks, futures):
+            try:
+                yield (task, future.result())
+            except Exception as e:
+                yield (task, e)
+
+@functools.cache
+def get_dtgen_renderer_hash() -> str:
+    # DTGEN_VERSION only changes on releases, so also fold in the renderer
+    # sources to keep the render cache correct for in-development changes
+    h = hashlib.blake2b(str(DTGEN_VERSION).encode('utf8'), digest_size=16)
+    package_dir = Path(__file__).parent
+    sources = sorted(package_dir.rglob('*.py')) + [
+        Path(proj.ifndef.__file__),
+        Path(proj.includes.__file__),
+    ]
+    for source in sources:
+        h.update(source.name.encode('utf8'))
+        h.update(source.read_bytes())
+    return h.hexdigest()
+
+
+def get_dtgen_render_cache_key(task: DtgenRenderTask, out: PurePath) -> str:
+    key: Json = [
+        get_dtgen_renderer_hash(),
+        str(task.spec_path),
+        str(out),
+        task.extension_config.header_extension,
+        task.extension_config.src_extension,
+        task.ifndef_base,
+        task.spec_contents,
+    ]
+    return hashlib.blake2b(json.dumps(key).encode('utf8'), digest_size=20).hexdigest()
+
+
+def load_dtgen_render_cache(repo: Repo) -> DtgenRenderCache:
+    return DtgenRenderCache(get_shared_cache_dir(Path(repo.path)))
+
+
+def lookup_cached_render(render_cache: DtgenRenderCache, task: DtgenRenderTask) -> Optional[DtgenRenderResult]:
+    found: Dict[PurePath, str] = {}
+    for out in [task.header_path, task.fwd_header_path, task.source_path]:
+        if out is None:
+            continue
+        contents = render_cache.get(get_dtgen_render_cache_key(task, out))
+        if contents is None:
+            return None
+        found[out] = contents
+
+    companion_contents: Dict[PurePath, str] = {}
+    if task.render_companions:
+        raw_companions = render_cache.get(get_dtgen_render_cache_key(task, get_companions_cache_path(task.spec_path)))
+        if raw_companions is None:
+            return None
+        loaded = json.loads(raw_companions)
+        assert isinstance(loaded, dict)
+        companion_contents = {PurePath(p): contents for p, contents in loaded.items()}
+
+    def get_found(out: Optional[PurePath]) -> Optional[str]:
+        return found[out] if out is not None else None
+
+    return DtgenRenderResult(
+        header_contents=get_found(task.header_path),
+        source_contents=get_found(task.source_path),
+        fwd_header_contents=get_found(task.fwd_header_path),
+        companion_contents=companion_contents,
+    )
+
+
+def get_companions_cache_path(spec_path: PurePath) -> PurePath:
+    # which companions exist depends on the spec, so they are cached together
+    # under a single entry keyed on the spec
+    return spec_path.with_name(spec_path.name + '.companions')
+
+
+def store_cached_render(render_cache: DtgenRenderCache, task: DtgenRenderTask, result: DtgenRenderResult) -> None:
+    for out, contents in [
+        (task.header_path, result.header_contents),
+        (task.fwd_header_path, result.fwd_header_contents),
+        (task.source_path, result.source_contents),
+    ]:
+        if out is not None:
+            assert contents is not None
+            render_cache.put(get_dtgen_render_cache_key(task, out), contents)
+    if task.render_companions:
+        render_cache.put(
+            get_dtgen_render_cache_key(task, get_companions_cache_path(task.spec_path)),
+            json.dumps({str(p): contents for p, contents in sorted(result.companion_contents.items())}),
+        )
+
+
+def get_dtgen_manifest_path(repo: Repo) -> Path:
+    return Path(repo.path) / '.proj' / 'cache' / 'dtgen-manifest'
+
+
+def load_dtgen_manifest(repo: Repo) -> DtgenManifest:
+    return DtgenManifest.load(get_dtgen_manifest_path(repo))
+
+
+def make_dtgen_manifest_entry(
+    file_group: FileGroup,
+    extension_config: ExtensionConfig,
+    file_tree: FileTreeWithMtime,
+    known_contents: Mapping[PurePath, str],
+) -> Optional[DtgenManifestEntry]:
+    def get_contents(p: PurePath) -> str:
+        if p in known_contents:
+            return known_contents[p]
+        return file_tree.get_file_contents(p)
+
+    def get_hash(p: PurePath) -> str:
+        return hashlib.md5(get_contents(p).encode('utf8')).hexdigest()
+
+    spec_path = get_repo_rel_path(file_group.dtgen_toml, extension_config).path
+    outputs = [get_repo_rel_path(out, extension_config).path for out in get_dtgen_outputs(file_group)]
+    if not all(file_tree.has_file(out) for out in outputs):
+        return None
+    outputs.extend(
+        companion_path
+        for companion in get_dtgen_companion_outputs(file_group)
+        if file_tree.has_file(companion_path := get_repo_rel_path(companion, extension_config).path)
+    )
+
+    return DtgenManifestEntry(
+        spec_mtime=file_tree.get_mtime(spec_path),
+        spec_size=file_tree.get_size(spec_path),
+        spec_hash=get_hash(spec_path),
+        generator_version=DTGEN_VERSION,
+        outputs={
+            out: DtgenOutputRecord(
+                mtime=file_tree.get_mtime(out),
+                size=file_tree.get_size(out),
+                content_hash=get_hash(out),
+            )
+            for out in outputs
+        },
+        output_dirs={d: file_tree.get_mtime(d) for d in set(out.parent for out in outputs)},
+    )
+
 
 def run_dtgen(
     repo: Repo,
@@ -379,26 +790,121 @@ def run_dtgen(
     ifndef_base: str,
     files: Optional[Sequence[File]] = None,
     delete_outdated: bool = True,
+    write_if_changed: bool = True,
+    jobs: int = 1,
+    staleness: DtgenStaleness = DtgenStaleness.MTIME,
+    manifest: Optional[DtgenManifest] = None,
+    render_cache: Optional[DtgenRenderCache] = None,
 ) -> None:
+    write_tree: Optional[WriteIfChangedFileTree] = None
+    if write_if_changed:
+        write_tree = WriteIfChangedFileTree(repo_file_tree)
+        file_tree = StatCachedFileTree(write_tree)
+    else:
+        file_tree = StatCachedFileTree(repo_file_tree)
+
+    is_full_run = files is None
+    dtgen_files: Optional[DtgenFiles] = None
+    if is_full_run or delete_outdated:
+        dtgen_files = scan_dtgen_files_in_repo(file_tree, extension_config)
     if files is None:
-        files = list(find_dtgen_spec_in_repo(repo_file_tree, extension_config))
+        assert dtgen_files is not None
+        files = list(dtgen_files.specs)
 
     _l.info("Running dtgen on following files:")
     for f in files:
         _l.info(f"- {f}")
-    for spec_file in files:
-        for generated in generate_files(
+
+    def is_up_to_date_in_manifest(spec_file: File) -> bool:
+        if manifest is None or force:
+            return False
+        spec_path = get_repo_rel_path(spec_file.group.dtgen_toml, extension_config).path
+        entry = manifest.lookup(spec_path)
+        return entry is not None and entry.is_up_to_date(file_tree, spec_path, DTGEN_VERSION)
+
+    pending = [spec_file for spec_file in files if not is_up_to_date_in_manifest(spec_file)]
+    if manifest is not None:
+        _l.info("dtgen manifest: %d of %d specs up to date", len(files) - len(pending), len(files))
+
+    tasks = [
+        task for spec_file in pending
+        if (task := plan_dtgen_task(
             file_group=spec_file.group,
             force=force,
             extension_config=extension_config,
             ifndef_base=ifndef_base,
-            file_tree=repo_file_tree,
-        ):
-            _l.info("Generated %s", generated)
+            file_tree=file_tree,
+            staleness=staleness,
+        )) is not None
+    ]
 
-    for outdated in find_outdated(repo_file_tree, extension_config):
+    cached: List[Tuple[DtgenRenderTask, Union[DtgenRenderResult, Exception]]] = []
+    to_render: List[DtgenRenderTask] = []
+    for task in tasks:
+        cached_result = lookup_cached_render(render_cache, task) if render_cache is not None else None
+        if cached_result is not None:
+            cached.append((task, cached_result))
+        else:
+            to_render.append(task)
+    cached_specs = set(task.spec_path for task, _ in cached)
+    if render_cache is not None:
+        _l.info("dtgen render cache: %d hits, %d specs to render", len(cached), len(to_render))
+
+    failed: List[Tuple[PurePath, Exception]] = []
+    known_contents: Dict[PurePath, str] = {}
+    stored_renders = 0
+    for task, result in itertools.chain(cached, render_dtgen_tasks(to_render, jobs=jobs)):
+        if isinstance(result, Exception):
+            _l.error(f"Failed to generate {task.spec_path}: {result}")
+            failed.append((task.spec_path, result))
+            continue
+        if render_cache is not None and task.spec_path not in cached_specs:
+            store_cached_render(render_cache, task, result)
+            stored_renders += 1
+        for generated in write_dtgen_result(task, result, file_tree):
+            _l.info("Generated %s", generated)
+        known_contents[task.spec_path] = task.spec_contents
+        known_contents.update(iter_dtgen_result_outputs(task, result))
+
+    if manifest is not None:
+        failed_specs = set(p for p, _ in failed)
+        for spec_file in pending:
+            spec_path = get_repo_rel_path(spec_file.group.dtgen_toml, extension_config).path
+            if spec_path in failed_specs:
+                continue
+            entry = make_dtgen_manifest_entry(spec_file.group, extension_config, file_tree, known_contents)
+            if entry is not None:
+                manifest.record(spec_path, entry)
+        if is_full_run:
+            manifest.retain(set(
+                get_repo_rel_path(spec_file.group.dtgen_toml, extension_config).path for spec_file in files
+            ))
+        manifest.save()
+
+    # trimming stats every entry, so it is only worth it when the cache grew
+    if render_cache is not None and stored_renders > 0:
+        evicted = render_cache.trim()
+        _l.debug("dtgen render cache evicted %d entries", evicted)
+
+    # generating outputs never creates or resolves orphans, so the scan from
+    # before generation is still accurate here
+    for orphan in (dtgen_files.orphans if dtgen_files is not None else ()):
+        outdated = get_repo_rel_path(orphan, extension_config)
         if delete_outdated:
             _l.info(f"Removing out-of-date file at {outdated}")
-            repo_file_tree.rm_file(outdated.path)
+            file_tree.rm_file(outdated.path)
         else:
             _l.warning(f"Possible out-of-date file at {outdated}")
+
+    _l.debug("dtgen stat cache: %s", file_tree.counters)
+    if write_tree is not None:
+        _l.info(
+            "dtgen wrote %d files, skipped %d unchanged writes", 
+            write_tree.counters.written, 
+            write_tree.counters.skipped,
+        )
+
+    if len(failed) > 0:
+        raise RuntimeError(
+            f"dtgen failed for {len(failed)} spec(s): " + ", ".join(str(p) for p, _ in failed)
+        ) from failed[0][1]
@@ -0,0 +1,96 @@
+from pathlib import Path
+from typing import (
+    Optional,
+)
+from proj.trees.path_trees.git_index import find_git_dir
+import logging
+import os
+import tempfile
+
+_l = logging.getLogger(__name__)
+
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+def get_shared_cache_dir(repo_root: Path) -> Path:
+    # linked worktrees share the common git dir, so placing the cache there
+    # lets every worktree of the same repo reuse each other's renders
+    git_dir = find_git_dir(repo_root)
+    if git_dir is not None:
+        commondir = git_dir / 'commondir'
+        if commondir.is_file():
+            git_dir = (git_dir / commondir.read_text().strip()).resolve()
+        return git_dir / 'proj' / 'dtgen-render-cache'
+    return repo_root / '.proj' / 'cache' / 'dtgen-render-cache'
+
+class DtgenRenderCache:
+    _root: Path
+    _max_bytes: int
+    hits: int
+    misses: int
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_CACHE_BYTES) -> None:
+        self._root = root
+        self._max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _entry_path(self, key: str) -> Path:
+        return self._root / key[:2] / key[2:]
+
+    def get(self, key: str) -> Optional[str]:
+        entry_path = self._entry_path(key)
+        try:
+            with entry_path.open('r', newline='') as f:
+                contents = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            # bump the mtime so that eviction is least-recently-used rather
+            # than least-recently-written
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return contents
+
+    def put(self, key: str, contents: str) -> None:
+        entry_path = self._entry_path(key)
+        tmp_path: Optional[str] = None
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=entry_path.parent, delete=False, newline='') as f:
+                tmp_path = f.name
+                f.write(contents)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            _l.debug(f'Failed to write dtgen render cache entry {entry_path}: {e}')
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def trim(self) -> int:
+        entries = []
+        total_size = 0
+        for entry_path in self._root.glob('*/*'):
+            try:
+                st = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, entry_path))
+            total_size += st.st_size
+
+        evicted = 0
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self._max_bytes:
+                break
+            try:
+                entry_path.unlink()
+            except OSError:
+                continue
+            total_size -= size
+            evicted += 1
+        return evicted
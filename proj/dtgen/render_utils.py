@@ -1,11 +1,19 @@
 from contextlib import contextmanager
 from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
     Iterator,
+    Protocol,
     TextIO,
     Sequence,
     Optional,
     TypeVar,
 )
+import dataclasses
 from proj.includes import (
     IncludeSpec,
 )
@@ -146,6 +154,15 @@ def render_struct_block(
             yield
 
 
+def render_struct_fwd_decl(
+    name: str, template_params: Sequence[str], f: TextIO
+) -> None:
+    if len(template_params) > 0:
+        render_template_abs(template_params, f)
+    with sline(f):
+        f.write(f"struct {name}")
+
+
 def render_function_declaration(
     *,
     template_params: Sequence[str] = tuple(),
@@ -155,6 +172,7 @@ def render_function_declaration(
     name: str,
     args: Sequence[str],
     is_const: bool = False,
+    noexcept_spec: Optional[str] = None,
     f: TextIO,
 ) -> None:
     if len(template_params) > 0:
@@ -171,6 +189,8 @@ def render_function_declaration(
             f.write(arg)
     if is_const:
         f.write(" const")
+    if noexcept_spec is not None:
+        f.write(f" {noexcept_spec}")
     f.write(";\n")
 
 
@@ -182,6 +202,8 @@ def render_function_definition(
     name: str,
     args: Sequence[str],
     is_const: bool = False,
+    ref_qualifier: Optional[str] = None,
+    noexcept_spec: Optional[str] = None,
     initializer_list: Sequence[str] = tuple(),
     f: TextIO,
 ) -> Iterator[None]:
@@ -195,6 +217,10 @@ def render_function_definition(
             f.write(arg)
     if is_const:
         f.write(" const")
+    if ref_qualifier is not None:
+        f.write(f" {ref_qualifier}")
+    if noexcept_spec is not None:
+        f.write(f" {noexcept_spec}")
     initializer_list = list(initializer_list)
     if len(initializer_list) > 0:
         f.write(" : ")
@@ -205,6 +231,76 @@ def render_function_definition(
     f.write("\n")
 
 
+def render_cached_hash_member_decls(f: TextIO) -> None:
+    # copies share the cached value as they hash equal, while moved-from
+    # objects are reset as their contents are no longer known
+    f.write("""
+private:
+struct cached_hash_t {
+cached_hash_t() = default;
+cached_hash_t(cached_hash_t const &other) noexcept : value(other.value.load(std::memory_order_relaxed)) {}
+cached_hash_t(cached_hash_t &&other) noexcept : value(other.value.exchange(0, std::memory_order_relaxed)) {}
+cached_hash_t &operator=(cached_hash_t const &other) noexcept {
+this->value.store(other.value.load(std::memory_order_relaxed), std::memory_order_relaxed);
+return *this;
+}
+cached_hash_t &operator=(cached_hash_t &&other) noexcept {
+this->value.store(other.value.exchange(0, std::memory_order_relaxed), std::memory_order_relaxed);
+return *this;
+}
+mutable std::atomic<size_t> value{0};
+};
+cached_hash_t cached_hash;
+public:
+size_t get_hash() const;
+""")
+
+
+def render_reset_cached_hash(f: TextIO) -> None:
+    with sline(f):
+        f.write("this->cached_hash.value.store(0, std::memory_order_relaxed)")
+
+
+@contextmanager
+def render_cached_hash_getter_definition(
+    *, template_params: Sequence[str], typename: str, f: TextIO
+) -> Iterator[None]:
+    # the body assigns the freshly computed hash to `result`. 0 is reserved
+    # to mark the hash as not computed yet, so a computed 0 is stored as 1
+    with render_function_definition(
+        template_params=template_params,
+        return_type="size_t",
+        name=f"{typename}::get_hash",
+        args=[],
+        is_const=True,
+        f=f,
+    ):
+        with sline(f):
+            f.write("size_t result = this->cached_hash.value.load(std::memory_order_relaxed)")
+        f.write("if (result == 0) ")
+        with braces(f):
+            yield
+            f.write("if (result == 0) { result = 1; }\n")
+            with sline(f):
+                f.write("this->cached_hash.value.store(result, std::memory_order_relaxed)")
+        with sline(f):
+            f.write("return result")
+
+
+def render_cached_hash_short_circuit(op: str, f: TextIO) -> None:
+    # only compares hashes that were already computed, as computing them
+    # just for this comparison would cost more than comparing directly
+    assert op in ["==", "!="]
+    with sline(f):
+        f.write("size_t this_hash = this->cached_hash.value.load(std::memory_order_relaxed)")
+    with sline(f):
+        f.write("size_t other_hash = other.cached_hash.value.load(std::memory_order_relaxed)")
+    f.write("if (this_hash != 0 && other_hash != 0 && this_hash != other_hash) ")
+    with braces(f):
+        with sline(f):
+            f.write(f"return {'false' if op == '==' else 'true'}")
+
+
 def render_static_assert(cond: str, message: str, f: TextIO) -> None:
     f.write(f'static_assert({cond}, "{message}");')
 
@@ -231,3 +327,42 @@ def slined(ss: Sequence[T], f: TextIO) -> Iterator[T]:
 
 def lined(ss: Sequence[T], f: TextIO) -> Iterator[T]:
     return sepbyd(ss, "\n", f)
+
+
+FeatureT = TypeVar("FeatureT")
+
+
+# features whose declarations and definitions can be moved out of the main
+# header into companion files, so that only code that needs them pays for
+# compiling their (heavily templated) dependencies
+def parse_split_features(
+    raw: Sequence[str],
+    features: FrozenSet[FeatureT],
+    parse_feature: Callable[[str], FeatureT],
+    splittable: AbstractSet[FeatureT],
+) -> FrozenSet[FeatureT]:
+    split_features = frozenset([parse_feature(feature) for feature in raw])
+    if not split_features.issubset(splittable):
+        raise ValueError(f"Only json and rapidcheck can be split, found: {raw}")
+    if not split_features.issubset(features):
+        raise ValueError(f"Cannot split features that are not enabled: {raw}")
+    return split_features
+
+
+class SplittableSpec(Protocol):
+    __dataclass_fields__: ClassVar[Dict[str, Any]]
+
+    @property
+    def features(self) -> FrozenSet[Any]: ...
+
+    @property
+    def split_features(self) -> FrozenSet[Any]: ...
+
+
+SpecT = TypeVar("SpecT", bound=SplittableSpec)
+
+
+def without_split_features(spec: SpecT) -> SpecT:
+    return dataclasses.replace(
+        spec, features=spec.features - spec.split_features, split_features=frozenset()
+    )
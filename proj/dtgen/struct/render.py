@@ -44,6 +44,11 @@ def header_includes_for_feature(feature: Feature) -> Sequence[IncludeSpec]:
             IncludeSpec(path=PurePath("ostream"), system=True),
             IncludeSpec(path=PurePath("fmt/format.h"), system=True),
         ]
+    elif feature == Feature.CACHED_HASH:
+        return [
+            IncludeSpec(path=PurePath("atomic"), system=True),
+            IncludeSpec(path=PurePath("cstddef"), system=True),
+        ]
     else:
         return []
 
@@ -75,8 +80,12 @@ def infer_header_includes(spec: StructSpec) -> Sequence[IncludeSpec]:
             *header_includes_for_features(spec=spec),
         ]
     )
+    if len(spec.fields) > 0:
+        includes.add(IncludeSpec(path=PurePath("utility"), system=True))
     if any(field.indirect for field in spec.fields):
         includes.add(IncludeSpec(path=PurePath("memory"), system=True))
+    elif len(spec.fields) > 0:
+        includes.add(IncludeSpec(path=PurePath("type_traits"), system=True))
     return list(includes)
 
 
@@ -113,7 +122,8 @@ def render_field_decls(spec: StructSpec, f: TextIO) -> None:
             f.write("private:\n")
             f.write(f"std::shared_ptr<{field.type_}> {field.name}_ptr;\n")
             f.write("public:\n")
-            f.write(f"{field.type_} const &{get_field_accessor(field)} const;\n")
+            f.write(f"{field.type_} const &{get_field_accessor(field)} const & noexcept;\n")
+            f.write(f"{field.type_} {get_field_accessor(field)} &&;\n")
         else:
             f.write(f"{field.type_} {field.name};\n")
 
@@ -151,6 +161,24 @@ def render_struct_impl_scope(
     f.write("::")
 
 
+def get_constructor_args(spec: StructSpec) -> Sequence[str]:
+    # taken by value so that callers can move large fields in rather than
+    # always paying for a copy
+    return [f"{field.type_} {field.name}" for field in spec.fields]
+
+
+def get_constructor_noexcept_spec(spec: StructSpec) -> Optional[str]:
+    # indirect fields allocate, so only fully direct structs can be noexcept
+    if any(field.indirect for field in spec.fields):
+        return None
+    return "noexcept({})".format(
+        " && ".join(
+            f"std::is_nothrow_move_constructible_v<{field.type_}>"
+            for field in spec.fields
+        )
+    )
+
+
 def render_constructor_decl(spec: StructSpec, f: TextIO) -> None:
     render_utils.render_function_declaration(
         template_params=[],
@@ -158,8 +186,9 @@ def render_constructor_decl(spec: StructSpec, f: TextIO) -> None:
         is_explicit=True,
         return_type=None,
         name=spec.name,
-        args=[f"{field.type_} const &{field.name}" for field in spec.fields],
+        args=get_constructor_args(spec),
         is_const=False,
+        noexcept_spec=get_constructor_noexcept_spec(spec),
         f=f,
     )
 
@@ -184,12 +213,13 @@ def render_constructor_impl(spec: StructSpec, f: TextIO) -> None:
         template_params=spec.template_params,
         return_type=None,
         name=f"{get_typename(spec=spec, qualified=False)}::{spec.name}",
-        args=[f"{field.type_} const &{field.name}" for field in spec.fields],
+        args=get_constructor_args(spec),
         is_const=False,
+        noexcept_spec=get_constructor_noexcept_spec(spec),
         initializer_list=[
-            f"{field.name}({field.name})"
+            f"{field.name}(std::move({field.name}))"
             if not field.indirect
-            else f"{field.name}_ptr(std::make_shared<{field.type_}>({field.name}))"
+            else f"{field.name}_ptr(std::make_shared<{field.type_}>(std::move({field.name})))"
             for field in spec.fields
         ],
         f=f,
@@ -206,8 +236,24 @@ def render_field_accessor_impls(spec: StructSpec, f: TextIO) -> None:
                 name=f"{get_typename(spec=spec, qualified=False)}::get_{field.name}",
                 args=[],
                 is_const=True,
+                ref_qualifier="&",
+                noexcept_spec="noexcept",
+                f=f,
+            ):
+                f.write(f"return *this->{field.name}_ptr;\n")
+            # the value can only be moved out of a temporary if no copy of
+            # the struct still shares it
+            with render_utils.render_function_definition(
+                template_params=spec.template_params,
+                return_type=field.type_,
+                name=f"{get_typename(spec=spec, qualified=False)}::get_{field.name}",
+                args=[],
+                ref_qualifier="&&",
                 f=f,
             ):
+                f.write(f"if (this->{field.name}_ptr.use_count() == 1) ")
+                with braces(f):
+                    f.write(f"return std::move(*this->{field.name}_ptr);\n")
                 f.write(f"return *this->{field.name}_ptr;\n")
 
 
@@ -231,6 +277,8 @@ def render_binop_impl(spec: StructSpec, op: str, f: TextIO) -> None:
                 f.write(get_field_accessor(field))
 
     with braces(f):
+        # no cached hash short-circuit here: struct fields are public and
+        # mutable, so a stored hash can be stale
         with nlblock(f):
             f.write("return ")
             render_tie("this->")
@@ -276,13 +324,29 @@ def render_hash_impl(spec: StructSpec, f: TextIO) -> None:
             f.write(" const &x")
         f.write("const")
         with braces(f):
-            f.write("size_t result = 0;\n")
-            for field in spec.fields:
-                f.write(
-                    f"result ^= std::hash<{field.type_}>{{}}(x.{get_field_accessor(field)}) + 0x9e3779b9 + (result << 6) + (result >> 2);"
-                )
-                # f.write(f'hash_combine(result, x.{field.name});\n')
-            f.write("return result;\n")
+            if Feature.CACHED_HASH in spec.features:
+                f.write("return x.get_hash();\n")
+            else:
+                f.write("size_t result = 0;\n")
+                render_hash_combine(spec, "x.", f)
+                f.write("return result;\n")
+
+
+def render_hash_combine(spec: StructSpec, prefix: str, f: TextIO) -> None:
+    for field in spec.fields:
+        f.write(
+            f"result ^= std::hash<{field.type_}>{{}}({prefix}{get_field_accessor(field)}) + 0x9e3779b9 + (result << 6) + (result >> 2);"
+        )
+        # f.write(f'hash_combine(result, x.{field.name});\n')
+
+
+def render_cached_hash_getter_impl(spec: StructSpec, f: TextIO) -> None:
+    with render_utils.render_cached_hash_getter_definition(
+        template_params=spec.template_params,
+        typename=get_typename(spec=spec, qualified=False),
+        f=f,
+    ):
+        render_hash_combine(spec, "this->", f)
 
 
 def render_json_decl(spec: StructSpec, f: TextIO) -> None:
@@ -499,6 +563,13 @@ def render_fwd_decls(spec: StructSpec, f: TextIO) -> None:
                 f.write(fwd_decl)
 
 
+def render_fwd_header(spec: StructSpec, f: TextIO) -> None:
+    with render_namespace_block(spec.namespace, f):
+        render_utils.render_struct_fwd_decl(
+            name=spec.name, template_params=spec.template_params, f=f
+        )
+
+
 def render_decls(spec: StructSpec, f: TextIO) -> None:
     # render_includes(infer_includes(spec), f)
     with render_namespace_block(spec.namespace, f):
@@ -516,6 +587,8 @@ def render_decls(spec: StructSpec, f: TextIO) -> None:
                 render_ord_function_decls(spec, f)
             f.write("\n")
             render_field_decls(spec, f)
+            if Feature.CACHED_HASH in spec.features:
+                render_utils.render_cached_hash_member_decls(f)
 
 
 def render_impls(spec: StructSpec, f: TextIO) -> None:
@@ -528,6 +601,8 @@ def render_impls(spec: StructSpec, f: TextIO) -> None:
             render_eq_function_impls(spec, f)
         if Feature.ORD in spec.features:
             render_ord_function_impls(spec, f)
+        if Feature.CACHED_HASH in spec.features:
+            render_cached_hash_getter_impl(spec, f)
     if Feature.HASH in spec.features:
         f.write("\n")
         render_hash_impl(spec, f)
@@ -591,6 +666,46 @@ def render_source(spec: StructSpec, f: TextIO) -> None:
         render_impls(spec, f)
 
 
+def render_feature_decls(spec: StructSpec, feature: Feature, f: TextIO) -> None:
+    if feature == Feature.JSON:
+        render_json_decl(spec, f)
+    else:
+        assert feature == Feature.RAPIDCHECK
+        render_rapidcheck_decl(spec, f)
+
+
+def render_feature_impls(spec: StructSpec, feature: Feature, f: TextIO) -> None:
+    if feature == Feature.JSON:
+        render_json_impl(spec, f)
+    else:
+        assert feature == Feature.RAPIDCHECK
+        render_rapidcheck_impl(spec, f)
+
+
+def render_feature_header(spec: StructSpec, feature: Feature, f: TextIO) -> None:
+    assert feature in spec.split_features
+    render_includes(header_includes_for_feature(feature), f)
+    if len(spec.template_params) > 0:
+        render_includes(impl_includes_for_feature(feature), f)
+
+    f.write("\n")
+
+    render_feature_decls(spec, feature, f)
+
+    if len(spec.template_params) > 0:
+        f.write("\n")
+        render_feature_impls(spec, feature, f)
+
+
+def render_feature_source(spec: StructSpec, feature: Feature, f: TextIO) -> None:
+    assert feature in spec.split_features
+    if len(spec.template_params) == 0:
+        render_includes(impl_includes_for_feature(feature), f)
+        f.write("\n")
+
+        render_feature_impls(spec, feature, f)
+
+
 # @contextmanager
 # def configure_output(p: Optional[Path]) -> Iterator[TextIO]:
 #     if p is None:
@@ -12,6 +12,7 @@ from proj.includes import (
     parse_include_spec,
 )
 from proj.json import Json
+import proj.dtgen.render_utils as render_utils
 
 
 class Feature(Enum):
@@ -21,6 +22,7 @@ class Feature(Enum):
     HASH = auto()
     FMT = auto()
     RAPIDCHECK = auto()
+    CACHED_HASH = auto()
     # SERIALIZE = auto()
 
     def json(self) -> Json:
@@ -64,6 +66,7 @@ class StructSpec:
     fields: Sequence[FieldSpec]
     features: FrozenSet[Feature]
     docstring: Optional[str]
+    split_features: FrozenSet[Feature] = frozenset()
 
     def json(self) -> Json:
         return {
@@ -80,6 +83,10 @@ class StructSpec:
                 for feature in sorted(self.features, key=lambda f: f.name)
             ],
             "docstring": self.docstring,
+            "split_features": [
+                feature.json()
+                for feature in sorted(self.split_features, key=lambda f: f.name)
+            ],
         }
 
 
@@ -96,12 +103,31 @@ def parse_feature(raw: str) -> Feature:
         return Feature.RAPIDCHECK
     elif raw == "fmt":
         return Feature.FMT
+    elif raw == "cached_hash":
+        return Feature.CACHED_HASH
     # elif raw == 'serialize':
     #     return Feature.SERIALIZE
     else:
         raise ValueError(f"Unknown feature: {raw}")
 
 
+def parse_features(raw: Sequence[str]) -> FrozenSet[Feature]:
+    features = frozenset([parse_feature(feature) for feature in raw])
+    # cached_hash only changes how the hash is computed, so it makes no
+    # sense on its own
+    if Feature.CACHED_HASH in features and Feature.HASH not in features:
+        raise ValueError("Feature cached_hash requires feature hash")
+    return features
+
+
+def parse_split_features(
+    raw: Sequence[str], features: FrozenSet[Feature]
+) -> FrozenSet[Feature]:
+    return render_utils.parse_split_features(
+        raw, features, parse_feature, {Feature.JSON, Feature.RAPIDCHECK}
+    )
+
+
 def parse_field_spec(raw: Mapping[str, Any]) -> FieldSpec:
     return FieldSpec(
         name=raw["name"],
@@ -113,6 +139,7 @@ def parse_field_spec(raw: Mapping[str, Any]) -> FieldSpec:
 
 
 def parse_struct_spec(raw: Mapping[str, Any]) -> StructSpec:
+    features = parse_features(raw["features"])
     return StructSpec(
         namespace=raw.get("namespace", None),
         includes=[parse_include_spec(include) for include in raw.get("includes", ())],
@@ -128,8 +155,9 @@ def parse_struct_spec(raw: Mapping[str, Any]) -> StructSpec:
         template_params=raw.get("template_params", ()),
         name=raw["name"],
         fields=[parse_field_spec(field) for field in raw["fields"]],
-        features=frozenset([parse_feature(feature) for feature in raw["features"]]),
+        features=features,
         docstring=raw.get("docstring", None),
+        split_features=parse_split_features(raw.get("split_features", ()), features),
     )
 
 
@@ -9,6 +9,7 @@ from typing import (
 from proj.dtgen.render_utils import (
     render_namespace_block,
     render_struct_block,
+    render_struct_fwd_decl,
     render_template_abs,
     render_function_definition,
     render_function_declaration,
@@ -51,6 +52,8 @@ def header_includes_for_feature(feature: Feature) -> Sequence[IncludeSpec]:
             IncludeSpec(path=PurePath("ostream"), system=True),
             IncludeSpec(path=PurePath("fmt/format.h"), system=True),
         ]
+    elif feature == Feature.CACHED_HASH:
+        return [IncludeSpec(path=PurePath("atomic"), system=True)]
     else:
         return []
 
@@ -299,6 +302,9 @@ def render_get_method(spec: VariantSpec, is_const: bool, f: TextIO) -> None:
             f.write(f"bool holds_expected = std::holds_alternative<{typevar}>(this->raw_variant)")
         with sline(f):
             f.write(f"ASSERT(holds_expected)")
+        if Feature.CACHED_HASH in spec.features and not is_const:
+            # the caller may modify the value through the returned reference
+            render_utils.render_reset_cached_hash(f)
         with sline(f):
             f.write(f"return std::get<{typevar}>(this->raw_variant)")
 
@@ -318,6 +324,8 @@ def render_binop_impl(spec: VariantSpec, op: str, f: TextIO) -> None:
         is_const=True,
         f=f,
     ):
+        if Feature.CACHED_HASH in spec.features and op in EQ_OPS:
+            render_utils.render_cached_hash_short_circuit(op, f)
         f.write(f"return this->raw_variant {op} other.raw_variant;")
 
 
@@ -368,13 +376,31 @@ def render_hash_impl(spec: VariantSpec, f: TextIO) -> None:
             f=f,
         ):
             with semicolon(f):
-                f.write("return ")
-                render_template_app(
-                    func="std::hash",
-                    params=[get_variant_type(spec=spec)],
-                    f=f,
-                )
-                f.write("{}(x.raw_variant)")
+                if Feature.CACHED_HASH in spec.features:
+                    f.write("return x.get_hash()")
+                else:
+                    f.write("return ")
+                    render_variant_hash(spec, "x.", f)
+
+
+def render_variant_hash(spec: VariantSpec, prefix: str, f: TextIO) -> None:
+    render_template_app(
+        func="std::hash",
+        params=[get_variant_type(spec=spec)],
+        f=f,
+    )
+    f.write(f"{{}}({prefix}raw_variant)")
+
+
+def render_cached_hash_getter_impl(spec: VariantSpec, f: TextIO) -> None:
+    with render_utils.render_cached_hash_getter_definition(
+        template_params=spec.template_params,
+        typename=get_typename(spec=spec, qualified=False),
+        f=f,
+    ):
+        with sline(f):
+            f.write("result = ")
+            render_variant_hash(spec, "this->", f)
 
 
 def render_json_decl(spec: VariantSpec, f: TextIO) -> None:
@@ -613,6 +639,9 @@ def render_decls(spec: VariantSpec, f: TextIO) -> None:
                 render_variant_type(spec=spec, f=f)
                 f.write(" raw_variant")
 
+            if Feature.CACHED_HASH in spec.features:
+                render_utils.render_cached_hash_member_decls(f)
+
     if Feature.HASH in spec.features:
         render_hash_decl(spec=spec, f=f)
 
@@ -648,6 +677,9 @@ def render_impls(spec: VariantSpec, f: TextIO) -> None:
         render_try_require_method_impls(spec=spec, f=f)
         render_is_method_impls(spec=spec, f=f)
 
+        if Feature.CACHED_HASH in spec.features:
+            render_cached_hash_getter_impl(spec=spec, f=f)
+
     if Feature.HASH in spec.features:
         render_hash_impl(spec=spec, f=f)
 
@@ -661,6 +693,13 @@ def render_impls(spec: VariantSpec, f: TextIO) -> None:
         render_fmt_impl(spec=spec, f=f)
 
 
+def render_fwd_header(spec: VariantSpec, f: TextIO) -> None:
+    with render_namespace_block(spec.namespace, f):
+        render_struct_fwd_decl(
+            name=spec.name, template_params=spec.template_params, f=f
+        )
+
+
 def render_header(spec: VariantSpec, f: TextIO) -> None:
     render_includes(infer_header_includes(spec), f)
     if len(spec.template_params) > 0:
@@ -682,3 +721,44 @@ def render_source(spec: VariantSpec, f: TextIO) -> None:
         f.write("\n")
 
         render_impls(spec, f)
+
+
+def render_feature_decls(spec: VariantSpec, feature: Feature, f: TextIO) -> None:
+    if feature == Feature.JSON:
+        render_json_decl(spec=spec, f=f)
+    else:
+        assert feature == Feature.RAPIDCHECK
+        render_rapidcheck_decl(spec=spec, f=f)
+
+
+def render_feature_impls(spec: VariantSpec, feature: Feature, f: TextIO) -> None:
+    if feature == Feature.JSON:
+        render_json_impl(spec=spec, f=f)
+    else:
+        assert feature == Feature.RAPIDCHECK
+        render_rapidcheck_impl(spec=spec, f=f)
+
+
+def render_feature_header(spec: VariantSpec, feature: Feature, f: TextIO) -> None:
+    assert feature in spec.split_features
+    render_includes(header_includes_for_feature(feature), f)
+    if len(spec.template_params) > 0:
+        render_includes(source_includes_for_feature(feature), f)
+
+    f.write("\n")
+
+    render_feature_decls(spec, feature, f)
+
+    if len(spec.template_params) > 0:
+        f.write("\n")
+        render_feature_impls(spec, feature, f)
+
+
+def render_feature_source(spec: VariantSpec, feature: Feature, f: TextIO) -> None:
+    assert feature in spec.split_features
+    if len(spec.template_params) == 0:
+        render_includes(source_includes_for_feature(feature), f)
+
+        f.write("\n")
+
+        render_feature_impls(spec, feature, f)
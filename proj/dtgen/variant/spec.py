@@ -14,6 +14,7 @@ from proj.includes import (
 import proj.toml as toml
 from pathlib import Path
 from proj.json import Json
+import proj.dtgen.render_utils as render_utils
 
 
 class Feature(Enum):
@@ -23,6 +24,7 @@ class Feature(Enum):
     JSON = auto()
     FMT = auto()
     RAPIDCHECK = auto()
+    CACHED_HASH = auto()
 
     def json(self) -> Json:
         return self.name
@@ -82,6 +84,7 @@ class VariantSpec:
     features: FrozenSet[Feature]
     explicit_constructors: bool
     docstring: Optional[str]
+    split_features: FrozenSet[Feature] = frozenset()
 
     def json(self) -> Json:
         return {
@@ -94,6 +97,7 @@ class VariantSpec:
             "features": [feature.json() for feature in self.features],
             "explicit_constructors": self.explicit_constructors,
             "docstring": self.docstring,
+            "split_features": [feature.json() for feature in self.split_features],
         }
 
 
@@ -110,10 +114,29 @@ def parse_feature(raw: str) -> Feature:
         return Feature.FMT
     elif raw == "rapidcheck":
         return Feature.RAPIDCHECK
+    elif raw == "cached_hash":
+        return Feature.CACHED_HASH
     else:
         raise ValueError(f"Unknown feature: {raw}")
 
 
+def parse_features(raw: Sequence[str]) -> FrozenSet[Feature]:
+    features = frozenset([parse_feature(feature) for feature in raw])
+    # cached_hash only changes how the hash is computed, so it makes no
+    # sense on its own
+    if Feature.CACHED_HASH in features and Feature.HASH not in features:
+        raise ValueError("Feature cached_hash requires feature hash")
+    return features
+
+
+def parse_split_features(
+    raw: Sequence[str], features: FrozenSet[Feature]
+) -> FrozenSet[Feature]:
+    return render_utils.parse_split_features(
+        raw, features, parse_feature, {Feature.JSON, Feature.RAPIDCHECK}
+    )
+
+
 def parse_value_spec(raw: Mapping[str, Any]) -> ValueSpec:
     return ValueSpec(
         type_=raw["type"],
@@ -125,6 +148,7 @@ def parse_value_spec(raw: Mapping[str, Any]) -> ValueSpec:
 
 
 def parse_variant_spec(raw: Mapping[str, Any]) -> VariantSpec:
+    features = parse_features(raw["features"])
     return VariantSpec(
         namespace=raw.get("namespace", None),
         includes=[parse_include_spec(include) for include in raw.get("includes", ())],
@@ -135,8 +159,9 @@ def parse_variant_spec(raw: Mapping[str, Any]) -> VariantSpec:
         template_params=raw.get("template_params", ()),
         name=raw["name"],
         values=[parse_value_spec(value) for value in raw["values"]],
-        features=frozenset([parse_feature(feature) for feature in raw["features"]]),
+        features=features,
         docstring=raw.get("docstring", None),
+        split_features=parse_split_features(raw.get("split_features", ()), features),
     )
 
 
@@ -0,0 +1,329 @@
+from pathlib import PurePath, Path
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+)
+from proj.config_file import (
+    DtgenStaleness,
+    ExtensionConfig,
+)
+from proj.paths import (
+    AbsolutePath,
+    File,
+    Repo,
+    RepoRelPath,
+    RoleInGroup,
+)
+from proj.trees import (
+    FilesystemFileTree,
+    MutableFileTreeWithMtime,
+    PrunePredicate,
+    load_filesystem_for_repo,
+)
+from ..parse_project import parse_file_path
+from .manifest import DtgenManifest
+from .render_cache import DtgenRenderCache
+from ..unparse_project import get_repo_rel_path
+from .project import (
+    get_dtgen_outputs,
+    get_dtgen_companion_outputs,
+    is_dtgen_blacklisted,
+    load_dtgen_manifest,
+    load_dtgen_render_cache,
+    run_dtgen,
+)
+import abc
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+_l = logging.getLogger(__name__)
+
+# editors often save in several steps (write a temp file, rename it over the
+# original, touch backup files), so events are collected for a short while
+# after the first one to handle each save as a single batch
+DEBOUNCE_S = 0.05
+DEFAULT_POLL_INTERVAL_S = 0.25
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+def is_watch_pruned(p: PurePath) -> bool:
+    return is_dtgen_blacklisted(p) or p.name.startswith('.')
+
+def _walk(root: Path, d: PurePath, prune: PrunePredicate) -> Iterator[os.DirEntry[str]]:
+    to_visit = [d]
+    while len(to_visit) > 0:
+        curr = to_visit.pop()
+        try:
+            entries = list(os.scandir(root / curr))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not prune(curr / entry.name):
+                    to_visit.append(curr / entry.name)
+            yield entry
+
+class SpecWatcher(abc.ABC):
+    # returns the repo-relative paths that changed, or None if changes may
+    # have been missed and the whole repo needs to be rescanned
+    @abc.abstractmethod
+    def wait_for_changes(self) -> Optional[Set[PurePath]]:
+        ...
+
+    def close(self) -> None:
+        pass
+
+class PollingSpecWatcher(SpecWatcher):
+    _root: Path
+    _prune: PrunePredicate
+    _interval: float
+    _mtimes: Dict[PurePath, float]
+
+    def __init__(self, root: Path, prune: PrunePredicate, interval: float = DEFAULT_POLL_INTERVAL_S) -> None:
+        self._root = root
+        self._prune = prune
+        self._interval = interval
+        self._mtimes = self._scan()
+
+    def _scan(self) -> Dict[PurePath, float]:
+        result = {}
+        for entry in _walk(self._root, PurePath('.'), self._prune):
+            if '.dtg.' in entry.name and entry.is_file(follow_symlinks=False):
+                try:
+                    result[PurePath(entry.path).relative_to(self._root)] = entry.stat().st_mtime
+                except OSError:
+                    continue
+        return result
+
+    def wait_for_changes(self) -> Optional[Set[PurePath]]:
+        while True:
+            time.sleep(self._interval)
+            mtimes = self._scan()
+            changed = set(
+                p for p in mtimes.keys() | self._mtimes.keys()
+                if mtimes.get(p) != self._mtimes.get(p)
+            )
+            self._mtimes = mtimes
+            if len(changed) > 0:
+                return changed
+
+class InotifySpecWatcher(SpecWatcher):
+    _root: Path
+    _prune: PrunePredicate
+    _fd: int
+    _watches: Dict[int, PurePath]
+
+    def __init__(self, root: Path, prune: PrunePredicate) -> None:
+        self._root = root
+        self._prune = prune
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._watches = {}
+        self._add_tree(PurePath('.'))
+
+    def _add_watch(self, d: PurePath) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(self._root / d), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            _l.debug(f'Failed to watch {d}: {os.strerror(errno)}')
+            return
+        self._watches[wd] = d
+
+    def _add_tree(self, d: PurePath) -> List[PurePath]:
+        # returns the files already present, as they may have been created
+        # before the watch on their directory was in place
+        self._add_watch(d)
+        files = []
+        for entry in _walk(self._root, d, self._prune):
+            p = PurePath(entry.path).relative_to(self._root)
+            if entry.is_dir(follow_symlinks=False):
+                if not self._prune(p):
+                    self._add_watch(p)
+            else:
+                files.append(p)
+        return files
+
+    def _read_events(self, changed: Set[PurePath]) -> bool:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return True
+
+        pos = 0
+        while pos < len(data):
+            wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + name_len].rstrip(b'\0'))
+            pos += name_len
+
+            if mask & _IN_Q_OVERFLOW:
+                return False
+            if mask & _IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            d = self._watches.get(wd)
+            if d is None:
+                continue
+            p = d / name
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and not self._prune(p):
+                    changed.update(self._add_tree(p))
+                elif mask & _IN_MOVED_FROM:
+                    # the files inside a directory moved away do not get
+                    # their own events
+                    return False
+            else:
+                changed.add(p)
+        return True
+
+    def wait_for_changes(self) -> Optional[Set[PurePath]]:
+        changed: Set[PurePath] = set()
+        timeout: Optional[float] = None
+        while True:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if len(readable) == 0:
+                if len(changed) > 0:
+                    return changed
+                timeout = None
+                continue
+            if not self._read_events(changed):
+                return None
+            changed = set(p for p in changed if '.dtg.' in p.name)
+            if len(changed) > 0:
+                timeout = DEBOUNCE_S
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+def make_spec_watcher(root: Path, prune: PrunePredicate = is_watch_pruned) -> SpecWatcher:
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifySpecWatcher(root, prune)
+        except (OSError, AttributeError) as e:
+            _l.warning(f'inotify is unavailable ({e}), falling back to polling')
+    return PollingSpecWatcher(root, prune)
+
+def apply_dtgen_changes(
+    repo: Repo,
+    repo_file_tree: MutableFileTreeWithMtime,
+    changed: Set[PurePath],
+    extension_config: ExtensionConfig,
+    ifndef_base: str,
+    jobs: int = 1,
+    staleness: DtgenStaleness = DtgenStaleness.MTIME,
+    manifest: Optional[DtgenManifest] = None,
+    render_cache: Optional[DtgenRenderCache] = None,
+) -> None:
+    to_generate: Dict[PurePath, File] = {}
+    for p in sorted(changed):
+        file = parse_file_path(RepoRelPath(p), extension_config)
+        if file is None:
+            continue
+        spec_path = get_repo_rel_path(file.group.dtgen_toml, extension_config).path
+        if repo_file_tree.has_file(spec_path):
+            # our own writes to outputs also show up as changes, so outputs
+            # are only regenerated if they went missing
+            if file.role == RoleInGroup.DTGEN_TOML or not repo_file_tree.has_file(p):
+                to_generate[spec_path] = file.group.dtgen_toml
+            continue
+
+        for out in [*get_dtgen_outputs(file.group), *get_dtgen_companion_outputs(file.group)]:
+            out_path = get_repo_rel_path(out, extension_config).path
+            if repo_file_tree.has_file(out_path):
+                _l.info(f"Removing out-of-date file at {out_path}")
+                repo_file_tree.rm_file(out_path)
+
+    if len(to_generate) == 0:
+        return
+
+    # the event already tells us the spec changed, which mtime-based
+    # staleness may miss for saves within the same mtime tick
+    run_dtgen(
+        repo=repo,
+        repo_file_tree=repo_file_tree,
+        force=True,
+        extension_config=extension_config,
+        ifndef_base=ifndef_base,
+        files=list(to_generate.values()),
+        delete_outdated=False,
+        jobs=jobs,
+        staleness=staleness,
+        manifest=manifest,
+        render_cache=render_cache,
+    )
+
+def watch_dtgen(
+    repo: Repo,
+    force: bool,
+    extension_config: ExtensionConfig,
+    ifndef_base: str,
+    jobs: int = 1,
+    staleness: DtgenStaleness = DtgenStaleness.MTIME,
+) -> None:
+    def run_full(force: bool) -> None:
+        run_dtgen(
+            repo=repo,
+            repo_file_tree=load_filesystem_for_repo(repo),
+            force=force,
+            extension_config=extension_config,
+            ifndef_base=ifndef_base,
+            jobs=jobs,
+            staleness=staleness,
+            manifest=load_dtgen_manifest(repo),
+            render_cache=load_dtgen_render_cache(repo),
+        )
+
+    root = Path(repo.path)
+    watcher = make_spec_watcher(root)
+    try:
+        run_full(force)
+        _l.info(f"Watching {root} for changes to dtgen specs")
+        while True:
+            changed = watcher.wait_for_changes()
+            try:
+                if changed is None:
+                    _l.info("Lost track of changes, rescanning the whole repo")
+                    run_full(False)
+                else:
+                    apply_dtgen_changes(
+                        repo=repo,
+                        repo_file_tree=FilesystemFileTree(AbsolutePath(root)),
+                        changed=changed,
+                        extension_config=extension_config,
+                        ifndef_base=ifndef_base,
+                        jobs=jobs,
+                        staleness=staleness,
+                        manifest=load_dtgen_manifest(repo),
+                        render_cache=load_dtgen_render_cache(repo),
+                    )
+            except RuntimeError as e:
+                # a half-written spec should not end the session
+                _l.error(str(e))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -1,4 +1,4 @@
-from pathlib import Path
+from pathlib import Path, PurePath
 import logging
 import subprocess
 from os import PathLike
@@ -8,31 +8,37 @@ from typing import (
     Iterator,
 )
 from .config_file import ProjectConfig
+from .paths import AbsolutePath
+from .trees import (
+    FilesystemPathTree,
+    TreeBackend,
+)
 
 _l = logging.getLogger(__name__)
 
 
 def find_files(config: ProjectConfig) -> Iterator[Path]:
-    patterns = [f"*{config.header_extension}", "*.cc", "*.cpp", "*.cu", "*.c", "*.decl"]
+    extensions = [config.header_extension, ".cc", ".cpp", ".cu", ".c", ".decl"]
     blacklist = [
-        config.base / "deps",
-        config.base / "build",
+        PurePath("deps"),
+        PurePath("build"),
     ]
 
-    def is_blacklisted(p: Path) -> bool:
-        for blacklisted in blacklist:
-            if p.is_relative_to(blacklisted):
-                return True
-        if p.name.endswith(".dtg.cc") or p.name.endswith(
-            ".dtg" + config.header_extension
-        ):
-            return True
-        return False
+    def is_blacklisted(p: PurePath) -> bool:
+        return p in blacklist
+
+    def is_generated(p: PurePath) -> bool:
+        return ".dtg." in p.name
 
-    for pattern in patterns:
-        for found in config.base.rglob(pattern):
-            if not is_blacklisted(found):
-                yield found
+    path_tree = FilesystemPathTree(AbsolutePath(config.base))
+    if config.tree_backend == TreeBackend.GIT_INDEX:
+        path_tree = path_tree.with_git_index()
+    else:
+        path_tree = path_tree.with_snapshot()
+    for extension in extensions:
+        for found in path_tree.with_extension(extension, prune=is_blacklisted):
+            if not is_generated(found):
+                yield config.base / found
 
 
 def _run_clang_format(
@@ -9,6 +9,7 @@ from .trees import MutableFileTree
 from .paths import (
     File,
     RoleInGroup,
+    GENERATED_HEADER_INFIXES,
 )
 from .config_file import ExtensionConfig
 from .unparse_project import get_repo_rel_path
@@ -37,7 +38,7 @@ def fix_ifndefs_in_file(
     extension_config: ExtensionConfig,
     must_exist: bool,
 ) -> None:
-    assert file.role in [RoleInGroup.PUBLIC_HEADER, RoleInGroup.GENERATED_HEADER]
+    assert file.role == RoleInGroup.PUBLIC_HEADER or file.role in GENERATED_HEADER_INFIXES
 
     repo_rel_file_path = get_repo_rel_path(file, extension_config)
 
@@ -53,6 +54,8 @@ def fix_ifndefs_in_file(
         contents=file_contents,
         ifndef=correct_ifndef,
     )
+    if updated_contents == file_contents:
+        return
     repo_path_tree.set_file_contents(
         repo_rel_file_path.path, 
         updated_contents,
@@ -4,6 +4,7 @@ from .paths import (
     Component,
     File,
     RoleInGroup,
+    GENERATED_HEADER_INFIXES,
 )
 from typing import (
     Optional,
@@ -59,22 +60,27 @@ def get_include_path(file_group: FileGroup, header_extension: str) -> PurePath:
         / (file_group.group_path.name + header_extension)
     )
 
-def get_generated_include_path(file_group: FileGroup, header_extension: str) -> PurePath:
+def get_generated_role_include_path(file_group: FileGroup, role: RoleInGroup, header_extension: str) -> PurePath:
     assert file_group.component is not None
     return (
         file_group.component.name 
         / file_group.group_path.parent 
-        / (file_group.group_path.name + '.dtg' + header_extension)
+        / (file_group.group_path.name + '.dtg' + GENERATED_HEADER_INFIXES[role] + header_extension)
     )
 
+def get_generated_include_path(file_group: FileGroup, header_extension: str) -> PurePath:
+    return get_generated_role_include_path(file_group, RoleInGroup.GENERATED_HEADER, header_extension)
+
+def get_generated_fwd_include_path(file_group: FileGroup, header_extension: str) -> PurePath:
+    return get_generated_role_include_path(file_group, RoleInGroup.GENERATED_FWD_HEADER, header_extension)
+
 def get_include_path_for_file(file: File, header_extension: str) -> PurePath:
-    match file.role:
-        case RoleInGroup.PUBLIC_HEADER:
-            return get_include_path(file.group, header_extension)
-        case RoleInGroup.GENERATED_HEADER:
-            return get_generated_include_path(file.group, header_extension)
-        case _:
-            raise ValueError()
+    if file.role == RoleInGroup.PUBLIC_HEADER:
+        return get_include_path(file.group, header_extension)
+    elif file.role in GENERATED_HEADER_INFIXES:
+        return get_generated_role_include_path(file.group, file.role, header_extension)
+    else:
+        raise ValueError()
 
 def get_file_for_include_path(include_path: PurePath, header_extension: str) -> Optional[File]:
     if len(include_path.parts) <= 1:
@@ -85,12 +91,19 @@ def get_file_for_include_path(include_path: PurePath, header_extension: str) ->
 
     file_rel_path = include_path.relative_to(PurePath(component_name))
 
-    if file_rel_path.name.endswith('.dtg' + header_extension):
-        return FileGroup(
-            with_suffix_removed(file_rel_path, n=2),
-            component,
-        ).generated_header
-    elif file_rel_path.name.endswith(header_extension):
+    # longest first, as every generated header also ends with '.dtg' + header_extension
+    for role, infix in sorted(GENERATED_HEADER_INFIXES.items(), key=lambda kv: -len(kv[1])):
+        suffix = '.dtg' + infix + header_extension
+        if file_rel_path.name.endswith(suffix) and file_rel_path.name != suffix:
+            return File(
+                FileGroup(
+                    file_rel_path.with_name(file_rel_path.name.removesuffix(suffix)),
+                    component,
+                ),
+                role,
+            )
+
+    if file_rel_path.name.endswith(header_extension):
         return FileGroup(
             with_suffix_removed(file_rel_path, n=1),
             component,
@@ -167,11 +180,12 @@ def replace_file_group_include_in_cpp_file_contents(contents: str, curr: FileGro
         goal=get_include_path(goal, header_extension=header_extension),
     )
     
-    contents = replace_include_in_cpp_file_contents(
-        contents,
-        curr=get_generated_include_path(curr, header_extension=header_extension),
-        goal=get_generated_include_path(goal, header_extension=header_extension),
-    )
+    for role in GENERATED_HEADER_INFIXES:
+        contents = replace_include_in_cpp_file_contents(
+            contents,
+            curr=get_generated_role_include_path(curr, role, header_extension=header_extension),
+            goal=get_generated_role_include_path(goal, role, header_extension=header_extension),
+        )
 
     return contents
 
@@ -186,11 +200,12 @@ def replace_file_group_include_in_dtg_toml_file_contents(contents: str, curr: Fi
         goal=get_include_path(goal, header_extension=header_extension),
     )
     
-    contents = replace_include_in_dtg_toml_file_contents(
-        contents,
-        curr=get_generated_include_path(curr, header_extension=header_extension),
-        goal=get_generated_include_path(goal, header_extension=header_extension),
-    )
+    for role in GENERATED_HEADER_INFIXES:
+        contents = replace_include_in_dtg_toml_file_contents(
+            contents,
+            curr=get_generated_role_include_path(curr, role, header_extension=header_extension),
+            goal=get_generated_role_include_path(goal, role, header_extension=header_extension),
+        )
 
     return contents
 
@@ -198,24 +213,23 @@ def find_occurrences_of_include(repo_file_tree: FileTree, include: IncludeSpec,
     return set(_find_occurrences_of_include(repo_file_tree, include, extension_config))
 
 def _find_occurrences_of_include(repo_file_tree: FileTree, include: IncludeSpec, extension_config: ExtensionConfig) -> Iterator[File]:
-    for file in scan_repo_for_files(repo_file_tree, extension_config):
-        if isinstance(file, File):
-            path = get_repo_rel_path(file, extension_config=extension_config).path
-            match file.role:
-                case RoleInGroup.GENERATED_HEADER | RoleInGroup.GENERATED_SOURCE:
-                    continue
-                case RoleInGroup.DTGEN_TOML:
-                    if include in find_include_specs_in_dtgen_toml_file_contents(
-                        repo_file_tree.get_file_contents(path),
-                    ):
-                        yield file
-                case (
-                    RoleInGroup.PUBLIC_HEADER 
-                    | RoleInGroup.SOURCE
-                    | RoleInGroup.TEST
-                    | RoleInGroup.BENCHMARK
-                ):
-                    if include in find_include_specs_in_cpp_file_contents(
-                        repo_file_tree.get_file_contents(path),
-                    ):
-                        yield file
+    files = {
+        get_repo_rel_path(file, extension_config=extension_config).path: file
+        for file in scan_repo_for_files(repo_file_tree, extension_config)
+        if isinstance(file, File) 
+        and not file.role.is_generated
+    }
+    for path, contents in repo_file_tree.get_many_file_contents(files.keys()):
+        file = files[path]
+        match file.role:
+            case RoleInGroup.DTGEN_TOML:
+                if include in find_include_specs_in_dtgen_toml_file_contents(contents):
+                    yield file
+            case (
+                RoleInGroup.PUBLIC_HEADER 
+                | RoleInGroup.SOURCE
+                | RoleInGroup.TEST
+                | RoleInGroup.BENCHMARK
+            ):
+                if include in find_include_specs_in_cpp_file_contents(contents):
+                    yield file
@@ -11,8 +11,10 @@ from proj.trees import (
     PathTree,
     MaskedPathTree,
     IgnoreMask,
+    PrunePredicate,
 )
 from typing import (
+    Optional,
     Dict,
     Tuple,
     Set,
@@ -50,6 +52,53 @@ class UnrecognizedFile:
 class KnownFile:
     path: ComponentRelPath
 
+@dataclass(frozen=True)
+class OrphanedDtgenOutput:
+    file: File
+
+@dataclass(frozen=True)
+class DtgenFiles:
+    specs: Tuple[File, ...]
+    outputs: Tuple[File, ...]
+    orphans: Tuple[File, ...]
+
+DTGEN_ROLES = frozenset([
+    RoleInGroup.DTGEN_TOML,
+    *(role for role in RoleInGroup if role.is_generated),
+])
+
+def classify_dtgen_files(files: Iterable[File]) -> DtgenFiles:
+    specs: List[File] = []
+    outputs: List[File] = []
+    for file in files:
+        if file.role == RoleInGroup.DTGEN_TOML:
+            specs.append(file)
+        elif file.role in DTGEN_ROLES:
+            outputs.append(file)
+    spec_groups = set(spec.group for spec in specs)
+    return DtgenFiles(
+        specs=tuple(specs),
+        outputs=tuple(outputs),
+        orphans=tuple(out for out in outputs if out.group not in spec_groups),
+    )
+
+def scan_repo_for_dtgen_files(
+    path_tree: PathTree,
+    extension_config: ExtensionConfig,
+    prune: Optional[PrunePredicate] = None,
+) -> DtgenFiles:
+    # a single walk (rather than one per extension) that only parses
+    # paths that can possibly be dtgen specs or outputs
+    def try_to_parse(p: PurePath) -> Optional[File]:
+        if '.dtg.' not in p.name:
+            return None
+        return parse_file_path(RepoRelPath(p), extension_config)
+
+    return classify_dtgen_files(
+        file for file in map(try_to_parse, path_tree.files(prune=prune))
+        if file is not None
+    )
+
 
 def _scan_component_for_files(
     component: Component,
@@ -157,7 +206,7 @@ def run_layout_check(
     repo_path_tree: PathTree,
     extension_config: ExtensionConfig,
     ignore_paths: Iterable[RepoRelPath],
-) -> Iterator[IncompleteGroup | UnrecognizedFile]:
+) -> Iterator[IncompleteGroup | UnrecognizedFile | OrphanedDtgenOutput]:
     _ignore_paths = list(ignore_paths)
     _l.debug("Layout check ignoring paths: %s", ignore_paths)
 
@@ -167,9 +216,14 @@ def run_layout_check(
     )
 
     file_groups: Dict[FileGroup, Set[RoleInGroup]] = defaultdict(set)
+    dtgen_files: List[File] = []
     for file_found in scan_repo_for_files(masked_path_tree, extension_config):
         if isinstance(file_found, UnrecognizedFile):
             yield file_found
         elif isinstance(file_found, File):
             file_groups[file_found.group].add(file_found.role)
+            if file_found.role in DTGEN_ROLES:
+                dtgen_files.append(file_found)
     yield from detect_incomplete_groups(file_groups)
+    for orphan in classify_dtgen_files(dtgen_files).orphans:
+        yield OrphanedDtgenOutput(orphan)
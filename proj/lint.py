@@ -51,8 +51,18 @@ def find_repo_files_for_linter(repo_path_tree: PathTree, extension_config: Exten
             return True
         return False
 
+    def can_prune(p: PurePath) -> bool:
+        if not any(
+            p.is_relative_to(whitelisted.path) or whitelisted.path.is_relative_to(p)
+            for whitelisted in whitelist
+        ):
+            return True
+        if any(p.is_relative_to(blacklisted.path) for blacklisted in blacklist):
+            return True
+        return p.name == "test"
+
     for extension in extensions:
-        for found in repo_path_tree.with_extension(extension):
+        for found in repo_path_tree.with_extension(extension, prune=can_prune):
             if not is_blacklisted(RepoRelPath(found)):
                 yield RepoRelPath(found)
 
@@ -8,6 +8,7 @@ from typing import (
 )
 from .paths import (
     RoleInGroup,
+    GENERATED_HEADER_INFIXES,
     FileGroup,
     File,
     RepoRelPath,
@@ -26,6 +27,7 @@ from .trees import (
     MaskedPathTree,
     MaskedFileTree,
     replay_trace_on_file_tree,
+    optimize_file_trace,
 )
 import io
 from .utils import (
@@ -165,50 +167,53 @@ def perform_file_group_move_with_include_and_ifndef_update(
             extension_config,
             must_exist=False,
         )
-        fix_ifndefs_in_file(
-            mock_file_tree,
-            dst_file.group.generated_header,
-            ifndef_base,
-            extension_config,
-            must_exist=False,
-        )
+        for role in GENERATED_HEADER_INFIXES:
+            fix_ifndefs_in_file(
+                mock_file_tree,
+                File(dst_file.group, role),
+                ifndef_base,
+                extension_config,
+                must_exist=False,
+            )
 
     if update_includes:
-        for file in list(scan_repo_for_files(mock_file_tree, extension_config)):
-            if isinstance(file, File):
-                file_path = get_repo_rel_path(file, extension_config).path
-                if file.role == RoleInGroup.DTGEN_TOML:
-                    file_contents = mock_file_tree.get_file_contents(file_path)
-                    updated_contents = replace_file_group_include_in_dtg_toml_file_contents(
-                        contents=file_contents,
-                        curr=src_file.group,
-                        goal=dst_file.group,
-                        header_extension=extension_config.header_extension,
+        files = {
+            get_repo_rel_path(file, extension_config).path: file
+            for file in scan_repo_for_files(mock_file_tree, extension_config)
+            if isinstance(file, File)
+        }
+        for file_path, file_contents in mock_file_tree.get_many_file_contents(list(files.keys())):
+            file = files[file_path]
+            if file.role == RoleInGroup.DTGEN_TOML:
+                updated_contents = replace_file_group_include_in_dtg_toml_file_contents(
+                    contents=file_contents,
+                    curr=src_file.group,
+                    goal=dst_file.group,
+                    header_extension=extension_config.header_extension,
+                )
+                if file_contents != updated_contents:
+                    mock_file_tree.set_file_contents(
+                        file_path, 
+                        updated_contents,
+                        exist_ok=True,
                     )
-                    if file_contents != updated_contents:
-                        mock_file_tree.set_file_contents(
-                            file_path, 
-                            updated_contents,
-                            exist_ok=True,
-                        )
-                else:
-                    file_contents = mock_file_tree.get_file_contents(file_path)
-                    updated_contents = replace_file_group_include_in_cpp_file_contents(
-                        contents=file_contents,
-                        curr=src_file.group,
-                        goal=dst_file.group,
-                        header_extension=extension_config.header_extension,
+            else:
+                updated_contents = replace_file_group_include_in_cpp_file_contents(
+                    contents=file_contents,
+                    curr=src_file.group,
+                    goal=dst_file.group,
+                    header_extension=extension_config.header_extension,
+                )
+                if file_contents != updated_contents:
+                    mock_file_tree.set_file_contents(
+                        file_path, 
+                        updated_contents,
+                        exist_ok=True,
                     )
-                    if file_contents != updated_contents:
-                        mock_file_tree.set_file_contents(
-                            file_path, 
-                            updated_contents,
-                            exist_ok=True,
-                        )
 
-    trace = mock_file_tree.get_file_trace()
+    trace = optimize_file_trace(mock_file_tree.get_file_trace())
 
     if dry_run:
         print(render_file_diff(trace))
     else:
-        replay_trace_on_file_tree(trace, repo_file_tree)
+        replay_trace_on_file_tree(trace, repo_file_tree, transactional=True)
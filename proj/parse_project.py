@@ -2,7 +2,9 @@ from .trees.path_tree import PathTree
 from pathlib import PurePath
 from typing import (
     Iterator,
+    Mapping,
     Optional,
+    Tuple,
     TYPE_CHECKING,
     Union,
 )
@@ -14,6 +16,8 @@ from .paths import (
     File,
     RoleInGroup,
     FileGroup,
+    GENERATED_HEADER_INFIXES,
+    GENERATED_SOURCE_INFIXES,
 )
 from .utils import map_optional
 
@@ -67,6 +71,13 @@ def find_executables_in_repo(repo: Repo, path_tree: PathTree) -> Iterator[Compon
         yield Component.executable(bin_name.name, repo=repo)
 
 
+def _parse_generated_name(stem: str, infixes: Mapping[RoleInGroup, str]) -> Optional[Tuple[RoleInGroup, str]]:
+    for role, infix in infixes.items():
+        suffix = '.dtg' + infix
+        if stem.endswith(suffix) and len(stem) > len(suffix):
+            return (role, stem.removesuffix(suffix))
+    return None
+
 def parse_file_path(
     rel: Union[ComponentRelPath, RepoRelPath], 
     extension_config: 'ExtensionConfig',
@@ -99,11 +110,11 @@ def parse_file_path(
             component,
         )
     elif p.is_relative_to(public_include_dir) and p.suffix == header_extension:
-        pp = p.parent / p.stem
-        if pp.suffix == '.dtg':
-            file_type = RoleInGroup.GENERATED_HEADER
+        generated = _parse_generated_name(p.stem, GENERATED_HEADER_INFIXES)
+        if generated is not None:
+            file_type, group_name = generated
             group = FileGroup(
-                p.parent.relative_to(public_include_dir) / pp.stem,
+                p.parent.relative_to(public_include_dir) / group_name,
                 component,
             )
         else:
@@ -114,11 +125,11 @@ def parse_file_path(
             )
 
     elif p.is_relative_to(src_dir) and p != src_dir:
-        pp = p.parent / p.stem
-        if pp.suffix == '.dtg':
-            file_type = RoleInGroup.GENERATED_SOURCE
+        generated = _parse_generated_name(p.stem, GENERATED_SOURCE_INFIXES)
+        if generated is not None:
+            file_type, group_name = generated
             group = FileGroup(
-                p.parent.relative_to(src_dir) / pp.stem,
+                p.parent.relative_to(src_dir) / group_name,
                 component,
             )
         elif p.suffix == extension_config.src_extension:
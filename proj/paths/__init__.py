@@ -2,7 +2,11 @@ from .file import File
 from .file_group import FileGroup
 from .repo import Repo
 from .repo_rel_path import RepoRelPath
-from .role_in_group import RoleInGroup
+from .role_in_group import (
+    RoleInGroup,
+    GENERATED_HEADER_INFIXES as GENERATED_HEADER_INFIXES,
+    GENERATED_SOURCE_INFIXES as GENERATED_SOURCE_INFIXES,
+)
 from .absolute_path import AbsolutePath
 from .component_rel_path import ComponentRelPath
 from .component import Component
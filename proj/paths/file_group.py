@@ -39,6 +39,26 @@ class FileGroup:
     def generated_source(self) -> 'File':
         return File(self, RoleInGroup.GENERATED_SOURCE)
 
+    @property
+    def generated_fwd_header(self) -> 'File':
+        return File(self, RoleInGroup.GENERATED_FWD_HEADER)
+
+    @property
+    def generated_json_header(self) -> 'File':
+        return File(self, RoleInGroup.GENERATED_JSON_HEADER)
+
+    @property
+    def generated_json_source(self) -> 'File':
+        return File(self, RoleInGroup.GENERATED_JSON_SOURCE)
+
+    @property
+    def generated_rapidcheck_header(self) -> 'File':
+        return File(self, RoleInGroup.GENERATED_RAPIDCHECK_HEADER)
+
+    @property
+    def generated_rapidcheck_source(self) -> 'File':
+        return File(self, RoleInGroup.GENERATED_RAPIDCHECK_SOURCE)
+
     @property
     def dtgen_toml(self) -> 'File':
         return File(self, RoleInGroup.DTGEN_TOML)
@@ -11,6 +11,11 @@ class RoleInGroup(Enum):
     DTGEN_TOML = auto()
     GENERATED_HEADER = auto()
     GENERATED_SOURCE = auto()
+    GENERATED_FWD_HEADER = auto()
+    GENERATED_JSON_HEADER = auto()
+    GENERATED_JSON_SOURCE = auto()
+    GENERATED_RAPIDCHECK_HEADER = auto()
+    GENERATED_RAPIDCHECK_SOURCE = auto()
 
     @property
     def shortname(self) -> str:
@@ -22,5 +27,27 @@ class RoleInGroup(Enum):
             RoleInGroup.DTGEN_TOML: 'toml',
             RoleInGroup.GENERATED_SOURCE: 'gensrc',
             RoleInGroup.GENERATED_HEADER: 'genhdr',
+            RoleInGroup.GENERATED_FWD_HEADER: 'genfwd',
+            RoleInGroup.GENERATED_JSON_HEADER: 'genjsonhdr',
+            RoleInGroup.GENERATED_JSON_SOURCE: 'genjsonsrc',
+            RoleInGroup.GENERATED_RAPIDCHECK_HEADER: 'genrchdr',
+            RoleInGroup.GENERATED_RAPIDCHECK_SOURCE: 'genrcsrc',
         }[self]
 
+    @property
+    def is_generated(self) -> bool:
+        return self in GENERATED_HEADER_INFIXES or self in GENERATED_SOURCE_INFIXES
+
+# the part of the file name between ".dtg" and the header/source extension
+GENERATED_HEADER_INFIXES = {
+    RoleInGroup.GENERATED_HEADER: '',
+    RoleInGroup.GENERATED_FWD_HEADER: '.fwd',
+    RoleInGroup.GENERATED_JSON_HEADER: '.json',
+    RoleInGroup.GENERATED_RAPIDCHECK_HEADER: '.rapidcheck',
+}
+
+GENERATED_SOURCE_INFIXES = {
+    RoleInGroup.GENERATED_SOURCE: '',
+    RoleInGroup.GENERATED_JSON_SOURCE: '.json',
+    RoleInGroup.GENERATED_RAPIDCHECK_SOURCE: '.rapidcheck',
+}
@@ -1,6 +1,7 @@
 from .path_tree import (
     PathTree, 
     MutablePathTree,
+    PrunePredicate,
     TracedMutablePathTree,
     MoveTrace,
     MkDirTrace,
@@ -16,6 +17,7 @@ from .file_tree import (
     ModifyFileTrace,
     CreateFileTrace,
     replay_trace_on_file_tree,
+    optimize_file_trace,
 )
 from .file_trees import (
     FilesystemFileTree, 
@@ -23,16 +25,24 @@ from .file_trees import (
     EmulatedFileTreeWithMtime,
     MutableTracedFileTreeByWrapping,
     MaskedFileTree,
+    StatCachedFileTree,
+    StatCacheCounters,
+    OverlayFileTree,
+    WriteIfChangedFileTree,
+    WriteCounters,
 )
 from .path_trees import (
     EmulatedPathTree, 
+    FilesystemPathTree,
     PathType,
     MutableTracedPathTreeByWrapping,
     MaskedPathTree,
     AllowMask,
     IgnoreMask,
+    OverlayPathTree,
 )
 from .filesystem import (
     load_root_filesystem, 
     load_filesystem_for_repo,
+    TreeBackend,
 )
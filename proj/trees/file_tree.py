@@ -12,11 +12,20 @@ from .path_tree import (
 import abc
 from dataclasses import dataclass
 from typing import (
+    Dict,
+    List,
+    Optional,
     Sequence,
+    Set,
     Union,
     Iterable,
+    Iterator,
+    Tuple,
+)
+from .line_delta import (
+    LineDelta,
+    content_hash,
 )
-import difflib
 
 class FileTree(PathTree):
     @abc.abstractmethod
@@ -26,23 +35,59 @@ class FileTree(PathTree):
     ) -> str:
         ...
 
+    def get_many_file_contents(
+        self,
+        paths: Iterable[PurePath],
+    ) -> Iterator[Tuple[PurePath, str]]:
+        for p in paths:
+            yield (p, self.get_file_contents(p))
+
+    def get_file_head(
+        self,
+        p: PurePath,
+        max_chars: int,
+    ) -> str:
+        return self.get_file_contents(p)[:max_chars]
+
 @dataclass(frozen=True)
 class ModifyFileTrace:
     path: PurePath
-    old_contents: str
-    new_contents: str
+    old_hash: str
+    new_hash: str
+    delta: LineDelta
 
     def __post_init__(self) -> None:
-        assert self.old_contents != self.new_contents
+        assert self.old_hash != self.new_hash
+
+    @staticmethod
+    def from_contents(path: PurePath, old_contents: str, new_contents: str) -> 'ModifyFileTrace':
+        return ModifyFileTrace(
+            path=path,
+            old_hash=content_hash(old_contents),
+            new_hash=content_hash(new_contents),
+            delta=LineDelta.from_contents(old_contents, new_contents),
+        )
 
     @property
     def diff(self) -> str:
-        return '\n'.join(
-            list(difflib.unified_diff(
-                self.old_contents.splitlines(),
-                self.new_contents.splitlines(),
-                lineterm='\n',
-            ))[2:]
+        return self.delta.render()
+
+    def apply(self, old_contents: str) -> str:
+        assert content_hash(old_contents) == self.old_hash, self.path
+        new_contents = self.delta.apply(old_contents)
+        assert content_hash(new_contents) == self.new_hash, self.path
+        return new_contents
+
+    def then(self, other: 'ModifyFileTrace') -> Optional['ModifyFileTrace']:
+        assert self.path == other.path
+        assert self.new_hash == other.old_hash, self.path
+        if self.old_hash == other.new_hash:
+            return None
+        return ModifyFileTrace(
+            path=self.path,
+            old_hash=self.old_hash,
+            new_hash=other.new_hash,
+            delta=self.delta.then(other.delta),
         )
 
 @dataclass(frozen=True)
@@ -61,6 +106,22 @@ class MutableFileTree(MutablePathTree, FileTree):
     ) -> None:
         ...
 
+    def set_file_contents_atomically(
+        self,
+        p: PurePath,
+        contents: str,
+        exist_ok: bool = False,
+        parents: bool = False,
+    ) -> None:
+        self.set_file_contents(p, contents, exist_ok=exist_ok, parents=parents)
+
+    def commit_file_trace(
+        self,
+        file_trace: Sequence[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]],
+    ) -> None:
+        for trace_elem in file_trace:
+            execute_trace_element_on_file_tree(trace_elem, self)
+
 def execute_trace_element_on_file_tree(
     trace_element: Union[
         MoveTrace,
@@ -81,15 +142,80 @@ def execute_trace_element_on_file_tree(
         case CreateFileTrace(path, contents):
             assert not file_tree.has_file(path)
             file_tree.set_file_contents(path, contents, exist_ok=False, parents=False)
-        case ModifyFileTrace(path, old_contents=old_contents, new_contents=new_contents):
-            curr_contents = file_tree.get_file_contents(path)
-            assert curr_contents == old_contents
+        case ModifyFileTrace(path):
+            new_contents = trace_element.apply(file_tree.get_file_contents(path))
             file_tree.set_file_contents(path, new_contents, exist_ok=True, parents=False)
 
+def _trace_element_paths(
+    trace_element: Union[
+        MoveTrace,
+        MkDirTrace,
+        RmFileTrace,
+        CreateFileTrace,
+        ModifyFileTrace,
+    ],
+) -> Tuple[PurePath, ...]:
+    match trace_element:
+        case MoveTrace(src, dst):
+            return (src, dst)
+        case MkDirTrace(path) | RmFileTrace(path) | CreateFileTrace(path) | ModifyFileTrace(path):
+            return (path,)
+    raise ValueError(trace_element)
+
+def optimize_file_trace(
+    file_trace: Iterable[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]],
+) -> List[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]]:
+    result: List[Optional[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]]] = []
+    hoisted_dirs: Dict[PurePath, None] = {}
+    seen_paths: Set[PurePath] = set()
+    open_writes: Dict[PurePath, int] = {}
+
+    # a directory may only be created up front if nothing earlier in the
+    # trace touched it or one of its ancestors: those could be unhoisted
+    # mkdirs, or moves of a directory into (or out of) the path
+    def can_hoist(d: PurePath) -> bool:
+        return not any(p in seen_paths for p in [d, *d.parents])
+
+    def coalesce(i: int, modify: ModifyFileTrace) -> None:
+        match result[i]:
+            case CreateFileTrace(path, contents):
+                result[i] = CreateFileTrace(path=path, contents=modify.apply(contents))
+            case ModifyFileTrace(path) as prev:
+                result[i] = prev.then(modify)
+                if result[i] is None:
+                    del open_writes[path]
+
+    for trace_elem in file_trace:
+        if isinstance(trace_elem, MoveTrace) and trace_elem.src == trace_elem.dst:
+            continue
+        if isinstance(trace_elem, MkDirTrace) and can_hoist(trace_elem.path):
+            hoisted_dirs[trace_elem.path] = None
+            continue
+        if isinstance(trace_elem, ModifyFileTrace) and trace_elem.path in open_writes:
+            coalesce(open_writes[trace_elem.path], trace_elem)
+            continue
+
+        for p in _trace_element_paths(trace_elem):
+            seen_paths.add(p)
+            for written in [w for w in open_writes if w.is_relative_to(p) or p.is_relative_to(w)]:
+                del open_writes[written]
+        if isinstance(trace_elem, (CreateFileTrace, ModifyFileTrace)):
+            open_writes[trace_elem.path] = len(result)
+        result.append(trace_elem)
+
+    return [
+        *[MkDirTrace(path=d) for d in sorted(hoisted_dirs, key=lambda d: len(d.parts))],
+        *[t for t in result if t is not None],
+    ]
+
 def replay_trace_on_file_tree(
     file_trace: Iterable[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]],
     file_tree: MutableFileTree, 
+    transactional: bool = False,
 ) -> None:
+    if transactional:
+        file_tree.commit_file_trace(list(file_trace))
+        return
     for trace_elem in file_trace:
         execute_trace_element_on_file_tree(trace_elem, file_tree)
 
@@ -110,5 +236,9 @@ class FileTreeWithMtime(FileTree):
     def get_mtime(self, p: PurePath) -> float:
         ...
 
+    @abc.abstractmethod
+    def get_size(self, p: PurePath) -> int:
+        ...
+
 class MutableFileTreeWithMtime(MutableFileTree, FileTreeWithMtime):
     ...
@@ -3,3 +3,6 @@ from .emulated_file_tree_with_mtime import EmulatedFileTreeWithMtime
 from .filesystem_file_tree import FilesystemFileTree
 from .traced_file_tree import MutableTracedFileTreeByWrapping
 from .masked_file_tree import MaskedFileTree
+from .stat_cached_file_tree import StatCachedFileTree, StatCacheCounters
+from .overlay_file_tree import OverlayFileTree
+from .write_if_changed_file_tree import WriteIfChangedFileTree, WriteCounters
@@ -1,6 +1,12 @@
 from pathlib import PurePath
+from ..path_trees.emulated_path_index import EmulatedPathIndex
 from ..file_tree import MutableFileTree
-from dataclasses import dataclass
+from ..path_tree import (
+    PrunePredicate,
+    is_pruned,
+    is_pruned_dir,
+)
+from dataclasses import dataclass, field
 from typing import (
     Dict,
     Optional,
@@ -10,35 +16,72 @@ from typing import (
     Tuple,
     Union,
 )
+import copy
 
 @dataclass(eq=True)
 class EmulatedFileTree(MutableFileTree):
     _m: Dict[PurePath, Optional[str]]
+    _index: EmulatedPathIndex = field(init=False, compare=False, repr=False)
+    _prefix: PurePath = field(default=PurePath('.'), compare=False)
+
+    def __post_init__(self) -> None:
+        self._index = EmulatedPathIndex(self._m)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EmulatedFileTree):
+            return NotImplemented
+        return self._as_dict() == other._as_dict()
+
+    def _key(self, p: PurePath) -> PurePath:
+        return self._prefix / p
+
+    def _rel(self, k: PurePath) -> PurePath:
+        return k.relative_to(self._prefix)
+
+    def _keys(self) -> Iterator[PurePath]:
+        if self._prefix == PurePath('.'):
+            yield from list(self._m)
+            return
+        yield self._prefix
+        yield from self._index.descendants(self._prefix)
+
+    def _as_dict(self) -> Dict[PurePath, Optional[str]]:
+        return {self._rel(k): self._m[k] for k in self._keys()}
+
+    def _set(self, p: PurePath, v: Optional[str]) -> None:
+        k = self._key(p)
+        if k not in self._m:
+            self._index.add(k)
+        self._m[k] = v
+
+    def _del(self, p: PurePath) -> None:
+        k = self._key(p)
+        del self._m[k]
+        self._index.remove(k)
 
     def has_path(self, p: PurePath) -> bool:
-        return p in self._m
+        return self._key(p) in self._m
 
     def has_dir(self, p: PurePath) -> bool:
         if not self.has_path(p):
             return False
-        return self._m[p] is None
+        return self._m[self._key(p)] is None
 
     def has_file(self, p: PurePath) -> bool:
         if not self.has_path(p):
             return False
-        return self._m[p] is not None
+        return self._m[self._key(p)] is not None
 
     def ls_dir(self, p: PurePath) -> Iterator[PurePath]: 
         assert self.has_dir(p)
-        for path in self._m:
-            if path == (p / path.name):
-                yield path
+        for k in self._index.children(self._key(p)):
+            yield self._rel(k)
 
     def rename(self, src: PurePath, dst: PurePath) -> None:
         assert self.has_file(src)
         assert not self.has_file(dst)
-        self._m[dst] = self._m[src]
-        del self._m[src]
+        self._set(dst, self._m[self._key(src)])
+        self._del(src)
 
     def mkdir(
         self, 
@@ -51,14 +94,14 @@ class EmulatedFileTree(MutableFileTree):
         if parents:
             for parent in p.parents[::-1]:
                 self.mkdir(parent, exist_ok=True, parents=False)
-        self._m[p] = None
+        self._set(p, None)
 
     def get_file_contents(
         self,
         p: PurePath
     ) -> str:
         assert self.has_file(p)
-        contents = self._m[p]
+        contents = self._m[self._key(p)]
         assert contents is not None
         return contents
 
@@ -73,36 +116,36 @@ class EmulatedFileTree(MutableFileTree):
             assert not self.has_file(p)
         if parents:
             self.mkdir(p.parent)
-        self._m[p] = contents
+        self._set(p, contents)
 
     def restrict_to_subdir(self, p: PurePath) -> 'EmulatedFileTree':
         assert self.has_dir(p)
-        return EmulatedFileTree(
-            {
-                k.relative_to(p): v for k, v in self._m.items()
-                if k.is_relative_to(p)
-            },
-        )
+        result = copy.copy(self)
+        result._prefix = self._key(p)
+        return result
 
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
         assert extension.startswith('.')
-        for path in self._m:
-            if path.name.endswith(extension):
+        for k in self._index.with_suffix(extension, self._prefix):
+            path = self._rel(k)
+            if not is_pruned(path, prune):
                 yield path
 
-    def files(self) -> Iterator[PurePath]:
-        for path in self._m:
-            if self.has_file(path):
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        for k in self._keys():
+            path = self._rel(k)
+            if self._m[k] is not None and not is_pruned(path, prune):
                 yield path
 
-    def dirs(self) -> Iterator[PurePath]:
-        for path in self._m:
-            if self.has_dir(path):
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        for k in self._keys():
+            path = self._rel(k)
+            if self._m[k] is None and not is_pruned_dir(path, prune):
                 yield path
 
     def rm_file(self, p: PurePath) -> None:
         assert self.has_file(p)
-        del self._m[p]
+        self._del(p)
 
     @staticmethod
     def from_map(m: Mapping[PurePath, Optional[str]]) -> 'EmulatedFileTree':
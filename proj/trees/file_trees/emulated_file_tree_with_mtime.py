@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, InitVar
 from typing import (
     Dict,
     Optional,
@@ -8,10 +8,17 @@ from typing import (
     Union,
 )
 from ..file_tree import MutableFileTreeWithMtime
+from ..path_tree import (
+    PrunePredicate,
+    is_pruned,
+    is_pruned_dir,
+)
 from ..path_trees import EmulatedPathTree, PathType
 from .emulated_file_tree import EmulatedFileTree
 from pathlib import PurePath
+from ..path_trees.emulated_path_index import EmulatedPathIndex
 from typing import Tuple
+import copy
 
 @dataclass(eq=True)
 class PathRecord:
@@ -24,35 +31,88 @@ class PathRecord:
     def is_file(self) -> bool:
         return self.contents is not None
 
+# shared (like the index) between a tree and its restricted views, so that
+# advancing the time through either is seen by both
+@dataclass
+class EmulatedClock:
+    curr_time: float
+
 @dataclass(eq=True)
 class EmulatedFileTreeWithMtime(MutableFileTreeWithMtime):
     _m: Dict[PurePath, PathRecord]
-    _curr_time: float
+    curr_time: InitVar[float]
+    _clock: EmulatedClock = field(init=False, compare=False, repr=False)
+    _index: EmulatedPathIndex = field(init=False, compare=False, repr=False)
+    _prefix: PurePath = field(default=PurePath('.'), compare=False)
+
+    def __post_init__(self, curr_time: float) -> None:
+        self._clock = EmulatedClock(curr_time)
+        self._index = EmulatedPathIndex(self._m)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EmulatedFileTreeWithMtime):
+            return NotImplemented
+        return self._as_dict() == other._as_dict() and self._clock.curr_time == other._clock.curr_time
+
+    def _key(self, p: PurePath) -> PurePath:
+        return self._prefix / p
+
+    def _rel(self, k: PurePath) -> PurePath:
+        return k.relative_to(self._prefix)
+
+    def _keys(self) -> Iterator[PurePath]:
+        if self._prefix == PurePath('.'):
+            yield from list(self._m)
+            return
+        yield self._prefix
+        yield from self._index.descendants(self._prefix)
+
+    def _as_dict(self) -> Dict[PurePath, PathRecord]:
+        return {self._rel(k): self._m[k] for k in self._keys()}
+
+    def _touch_parent(self, k: PurePath) -> None:
+        # as on a real filesystem, adding or removing an entry bumps the
+        # mtime of the directory containing it
+        parent = self._m.get(k.parent)
+        if parent is not None and k != k.parent:
+            parent.mtime = self._clock.curr_time
+
+    def _set(self, p: PurePath, v: PathRecord) -> None:
+        k = self._key(p)
+        if k not in self._m:
+            self._index.add(k)
+            self._touch_parent(k)
+        self._m[k] = v
+
+    def _del(self, p: PurePath) -> None:
+        k = self._key(p)
+        del self._m[k]
+        self._index.remove(k)
+        self._touch_parent(k)
 
     def has_path(self, p: PurePath) -> bool:
-        return p in self._m
+        return self._key(p) in self._m
 
     def has_dir(self, p: PurePath) -> bool:
         if not self.has_path(p):
             return False
-        return self._m[p].is_dir()
+        return self._m[self._key(p)].is_dir()
 
     def has_file(self, p: PurePath) -> bool:
         if not self.has_path(p):
             return False
-        return self._m[p].is_file()
+        return self._m[self._key(p)].is_file()
 
     def ls_dir(self, p: PurePath) -> Iterator[PurePath]: 
         assert self.has_dir(p)
-        for path in self._m:
-            if path == (p / path.name):
-                yield path
+        for k in self._index.children(self._key(p)):
+            yield self._rel(k)
 
     def rename(self, src: PurePath, dst: PurePath) -> None:
         assert self.has_file(src)
         assert not self.has_file(dst)
-        self._m[dst] = self._m[src]
-        del self._m[src]
+        self._set(dst, self._m[self._key(src)])
+        self._del(src)
 
     def mkdir(
         self, 
@@ -65,17 +125,17 @@ class EmulatedFileTreeWithMtime(MutableFileTreeWithMtime):
         if parents:
             for parent in p.parents[::-1]:
                 self.mkdir(parent, exist_ok=True, parents=False)
-        self._m[p] = PathRecord(
+        self._set(p, PathRecord(
             contents=None,
-            mtime=self._curr_time,
-        )
+            mtime=self._clock.curr_time,
+        ))
 
     def get_file_contents(
         self,
         p: PurePath
     ) -> str:
         assert self.has_file(p)
-        contents = self._m[p].contents
+        contents = self._m[self._key(p)].contents
         assert contents is not None
         return contents
 
@@ -90,58 +150,63 @@ class EmulatedFileTreeWithMtime(MutableFileTreeWithMtime):
             assert not self.has_file(p)
         if parents:
             self.mkdir(p.parent)
-        self._m[p] = PathRecord(
+        self._set(p, PathRecord(
             contents=contents,
-            mtime=self._curr_time,
-        )
+            mtime=self._clock.curr_time,
+        ))
 
     def set_curr_time(
         self,
         t: float
     ) -> None:
-        assert t >= self._curr_time
-        self._mtime = t
+        assert t >= self._clock.curr_time
+        self._clock.curr_time = t
 
     def get_curr_time(
         self,
     ) -> float:
-        return self._mtime
+        return self._clock.curr_time
 
     def get_mtime(
         self, 
         p: PurePath,
     ) -> float:
         assert self.has_path(p)
-        return self._m[p].mtime
+        return self._m[self._key(p)].mtime
+
+    def get_size(self, p: PurePath) -> int:
+        assert self.has_file(p)
+        contents = self._m[self._key(p)].contents
+        assert contents is not None
+        return len(contents.encode('utf-8'))
 
     def rm_file(self, p: PurePath) -> None:
         assert self.has_file(p)
-        del self._m[p]
+        self._del(p)
 
     def restrict_to_subdir(self, p: PurePath) -> 'EmulatedFileTreeWithMtime':
         assert self.has_dir(p)
-        return EmulatedFileTreeWithMtime(
-            {
-                k.relative_to(p): v for k, v in self._m.items()
-                if k.is_relative_to(p)
-            },
-            self._curr_time,
-        )
+        result = copy.copy(self)
+        result._prefix = self._key(p)
+        return result
 
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
         assert extension.startswith('.')
-        for path in self._m:
-            if path.name.endswith(extension):
+        for k in self._index.with_suffix(extension, self._prefix):
+            path = self._rel(k)
+            if not is_pruned(path, prune):
                 yield path
 
-    def files(self) -> Iterator[PurePath]:
-        for path in self._m:
-            if self.has_file(path):
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        for k in self._keys():
+            path = self._rel(k)
+            if self._m[k].is_file() and not is_pruned(path, prune):
                 yield path
 
-    def dirs(self) -> Iterator[PurePath]:
-        for path in self._m:
-            if self.has_dir(path):
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        for k in self._keys():
+            path = self._rel(k)
+            if self._m[k].is_dir() and not is_pruned_dir(path, prune):
                 yield path
 
     def path_tree(self) -> EmulatedPathTree:
@@ -152,7 +217,7 @@ class EmulatedFileTreeWithMtime(MutableFileTreeWithMtime):
                 return PathType.FILE
 
         return EmulatedPathTree({
-            k: get_file_type(v) for k, v in self._m.items()
+            k: get_file_type(v) for k, v in self._as_dict().items()
         })
 
     def without_mtime(self) -> EmulatedFileTree:
@@ -1,21 +1,102 @@
-from ..file_tree import MutableFileTreeWithMtime
+from ..file_tree import (
+    MutableFileTreeWithMtime,
+    CreateFileTrace,
+    ModifyFileTrace,
+)
+from ..path_tree import (
+    MoveTrace,
+    MkDirTrace,
+    RmFileTrace,
+)
 from ..path_trees.filesystem_path_tree import FilesystemPathTree
+from ..path_trees.emulated_path_tree import PathType
 from .emulated_file_tree import EmulatedFileTree
+from .filesystem_transaction import (
+    FilesystemTransaction,
+    lock_transactions,
+    recover_interrupted_transactions,
+)
 from pathlib import PurePath, Path
 from ...paths.absolute_path import AbsolutePath
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import deque
+from typing import (
+    Deque,
+    Iterable,
+    Iterator,
+    Sequence,
+    Tuple,
+    Union,
+)
+import multiprocessing
+import os
+import uuid
+
+MAX_READ_WORKERS = min(32, multiprocessing.cpu_count() + 4)
+MAX_READS_IN_FLIGHT = 4 * MAX_READ_WORKERS
+
+def write_file_atomically(path: Path, contents: str) -> None:
+    if path.is_symlink():
+        path = path.resolve()
+    tmp_path = path.with_name(f'.{path.name}.{uuid.uuid4().hex[:8]}.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(contents)
+        if path.exists():
+            os.chmod(tmp_path, path.stat().st_mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 class FilesystemFileTree(MutableFileTreeWithMtime, FilesystemPathTree):
     def get_file_contents(
         self,
         p: PurePath,
     ) -> str:
-        assert self.has_file(p), p
         abs_path = (self._root.raw / p)
         try:
             return abs_path.read_text()
+        except (FileNotFoundError, IsADirectoryError):
+            assert False, p
+        except UnicodeDecodeError as e:
+            raise RuntimeError(f'Failed to load data from path {abs_path}') from e
+
+    def get_file_head(
+        self,
+        p: PurePath,
+        max_chars: int,
+    ) -> str:
+        abs_path = (self._root.raw / p)
+        try:
+            with abs_path.open('r') as f:
+                return f.read(max_chars)
+        except (FileNotFoundError, IsADirectoryError):
+            assert False, p
         except UnicodeDecodeError as e:
             raise RuntimeError(f'Failed to load data from path {abs_path}') from e
 
+    def get_many_file_contents(
+        self,
+        paths: Iterable[PurePath],
+    ) -> Iterator[Tuple[PurePath, str]]:
+        paths = list(paths)
+        if len(paths) <= 1:
+            yield from super().get_many_file_contents(paths)
+            return
+
+        with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as pool:
+            pending: Deque[Tuple[PurePath, Future[str]]] = deque()
+            for p in paths:
+                pending.append((p, pool.submit(self.get_file_contents, p)))
+                if len(pending) >= MAX_READS_IN_FLIGHT:
+                    done, future = pending.popleft()
+                    yield (done, future.result())
+            while len(pending) > 0:
+                done, future = pending.popleft()
+                yield (done, future.result())
+
     def set_file_contents(
         self, 
         p: PurePath, 
@@ -27,10 +108,55 @@ class FilesystemFileTree(MutableFileTreeWithMtime, FilesystemPathTree):
         if not exist_ok:
             assert not self.has_file(p), p
         Path(self._root.raw / p).write_text(contents)
+        if self._snapshot is not None:
+            self._snapshot.add(self._snapshot_key(p), PathType.FILE)
+
+    def set_file_contents_atomically(
+        self,
+        p: PurePath,
+        contents: str,
+        exist_ok: bool = False,
+        parents: bool = False,
+    ) -> None:
+        self.mkdir(p.parent, exist_ok=True, parents=parents)
+        if not exist_ok:
+            assert not self.has_file(p), p
+        write_file_atomically(Path(self._root.raw / p), contents)
+        if self._snapshot is not None:
+            self._snapshot.add(self._snapshot_key(p), PathType.FILE)
+
+    def commit_file_trace(
+        self,
+        file_trace: Sequence[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]],
+    ) -> None:
+        root = Path(self._root.raw)
+        with lock_transactions(root):
+            recover_interrupted_transactions(root)
+            FilesystemTransaction(root).commit(file_trace)
+        if self._snapshot is None:
+            return
+        for trace_elem in file_trace:
+            match trace_elem:
+                case MoveTrace(src, dst):
+                    self._snapshot.move(self._snapshot_key(src), self._snapshot_key(dst))
+                case MkDirTrace(path):
+                    self._snapshot.add(self._snapshot_key(path), PathType.DIR)
+                case RmFileTrace(path):
+                    self._snapshot.remove(self._snapshot_key(path))
+                case CreateFileTrace(path):
+                    self._snapshot.add(self._snapshot_key(path), PathType.FILE)
 
     def get_mtime(self, p: PurePath) -> float:
-        assert self.has_path(p), p
-        return Path(self._root.raw / p).stat().st_mtime
+        try:
+            return Path(self._root.raw / p).stat().st_mtime
+        except FileNotFoundError:
+            assert False, p
+
+    def get_size(self, p: PurePath) -> int:
+        try:
+            return Path(self._root.raw / p).stat().st_size
+        except FileNotFoundError:
+            assert False, p
 
     @staticmethod
     def for_path(path: PurePath) -> 'FilesystemFileTree':
@@ -0,0 +1,240 @@
+from ..file_tree import (
+    CreateFileTrace,
+    ModifyFileTrace,
+)
+from ..path_tree import (
+    MoveTrace,
+    MkDirTrace,
+    RmFileTrace,
+)
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import PurePath, Path
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Union,
+)
+import contextlib
+import fcntl
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import uuid
+
+_l = logging.getLogger(__name__)
+
+TRANSACTION_DIR_PREFIX = '.proj-transaction-'
+MAX_WRITE_WORKERS = min(32, multiprocessing.cpu_count() + 4)
+
+def _read_journal(transaction_dir: Path) -> List[List[str]]:
+    try:
+        with (transaction_dir / 'journal').open('r') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return []
+    result = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # only the final line can be torn by a crash
+            break
+        assert isinstance(entry, list)
+        result.append(entry)
+    return result
+
+def rollback_transaction(root: Path, transaction_dir: Path) -> None:
+    entries = _read_journal(transaction_dir)
+    if len(entries) > 0 and entries[-1] == ['commit']:
+        shutil.rmtree(transaction_dir)
+        return
+
+    for entry in reversed(entries):
+        match entry:
+            case ['mkdir', path]:
+                if os.path.isdir(root / path):
+                    os.rmdir(root / path)
+            case ['move', src, dst]:
+                if os.path.lexists(root / dst) and not os.path.lexists(root / src):
+                    os.rename(root / dst, root / src)
+            case ['rm', path, i]:
+                if os.path.lexists(transaction_dir / f'{i}.backup'):
+                    os.rename(transaction_dir / f'{i}.backup', root / path)
+            case ['create', path, i]:
+                if not os.path.lexists(transaction_dir / f'{i}.staged'):
+                    os.unlink(root / path)
+            case ['modify', path, i]:
+                if os.path.lexists(transaction_dir / f'{i}.backup'):
+                    os.replace(transaction_dir / f'{i}.backup', root / path)
+            case _:
+                raise ValueError(entry)
+    shutil.rmtree(transaction_dir)
+
+@contextlib.contextmanager
+def lock_transactions(root: Path) -> Iterator[None]:
+    fd = os.open(root, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+def _is_owned(transaction_dir: Path) -> bool:
+    # a live transaction holds a lock on its journal until it finishes
+    try:
+        fd = os.open(transaction_dir / 'journal', os.O_RDONLY)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+def recover_interrupted_transactions(root: Path) -> int:
+    recovered = 0
+    for transaction_dir in root.glob(f'{TRANSACTION_DIR_PREFIX}*'):
+        if _is_owned(transaction_dir):
+            _l.debug(f'Skipping transaction {transaction_dir} held by a running process')
+            continue
+        _l.warning(f'Rolling back interrupted transaction {transaction_dir}')
+        rollback_transaction(root, transaction_dir)
+        recovered += 1
+    return recovered
+
+class FilesystemTransaction:
+    _root: Path
+    _dir: Path
+    _journal: Optional[TextIO]
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+        self._dir = root / f'{TRANSACTION_DIR_PREFIX}{uuid.uuid4().hex[:8]}'
+        self._journal = None
+
+    def _staged(self, i: int) -> Path:
+        return self._dir / f'{i}.staged'
+
+    def _backup(self, i: int) -> Path:
+        return self._dir / f'{i}.backup'
+
+    def _log(self, *entry: str) -> None:
+        assert self._journal is not None
+        # flushing (rather than fsyncing) is enough to survive the process
+        # dying, which is the failure we care about
+        self._journal.write(json.dumps(entry) + '\n')
+        self._journal.flush()
+
+    def _write_staged(self, i: int, contents: str) -> None:
+        with self._staged(i).open('x') as f:
+            f.write(contents)
+
+    def _write_modified(
+        self,
+        i: int,
+        trace_elem: ModifyFileTrace,
+        source: Union[PurePath, int],
+        dependency: Optional['Future[None]'],
+    ) -> None:
+        if isinstance(source, int):
+            assert dependency is not None
+            dependency.result()
+            old_contents = self._staged(source).read_text()
+        else:
+            old_contents = (self._root / source).read_text()
+        self._write_staged(i, trace_elem.apply(old_contents))
+
+    def _stage(
+        self,
+        file_trace: Sequence[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]],
+    ) -> None:
+        # tracks where the current contents of each path can be read from
+        # before anything is committed: either its original location on disk
+        # or the staged output of an earlier write in the trace
+        sources: Dict[PurePath, Union[PurePath, int]] = {}
+        with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as pool:
+            staged: Dict[int, Future[None]] = {}
+            for i, trace_elem in enumerate(file_trace):
+                match trace_elem:
+                    case MoveTrace(src, dst):
+                        sources[dst] = sources.pop(src, src)
+                    case RmFileTrace(path):
+                        sources.pop(path, None)
+                    case CreateFileTrace(path, contents):
+                        staged[i] = pool.submit(self._write_staged, i, contents)
+                        sources[path] = i
+                    case ModifyFileTrace(path):
+                        source = sources.get(path, path)
+                        dependency = staged[source] if isinstance(source, int) else None
+                        staged[i] = pool.submit(self._write_modified, i, trace_elem, source, dependency)
+                        sources[path] = i
+            for future in staged.values():
+                future.result()
+
+    def _execute(
+        self,
+        i: int,
+        trace_elem: Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace],
+    ) -> None:
+        root = self._root
+        match trace_elem:
+            case MoveTrace(src, dst):
+                assert os.path.lexists(root / src), src
+                assert not os.path.lexists(root / dst), dst
+                self._log('move', str(src), str(dst))
+                os.rename(root / src, root / dst)
+            case MkDirTrace(path):
+                if os.path.lexists(root / path):
+                    raise FileExistsError(root / path)
+                self._log('mkdir', str(path))
+                os.mkdir(root / path)
+            case RmFileTrace(path):
+                assert (root / path).is_file(), path
+                self._log('rm', str(path), str(i))
+                os.rename(root / path, self._backup(i))
+            case CreateFileTrace(path):
+                assert not os.path.lexists(root / path), path
+                self._log('create', str(path), str(i))
+                os.rename(self._staged(i), root / path)
+            case ModifyFileTrace(path):
+                assert (root / path).is_file(), path
+                os.chmod(self._staged(i), (root / path).stat().st_mode)
+                self._log('modify', str(path), str(i))
+                os.rename(root / path, self._backup(i))
+                os.rename(self._staged(i), root / path)
+
+    def commit(
+        self,
+        file_trace: Sequence[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]],
+    ) -> None:
+        if len(file_trace) == 0:
+            return
+
+        self._dir.mkdir()
+        try:
+            self._journal = (self._dir / 'journal').open('x')
+            fcntl.flock(self._journal.fileno(), fcntl.LOCK_EX)
+            self._stage(file_trace)
+            for i, trace_elem in enumerate(file_trace):
+                self._execute(i, trace_elem)
+            self._log('commit')
+        except BaseException:
+            self._close_journal()
+            _l.warning(f'Rolling back failed transaction {self._dir}')
+            rollback_transaction(self._root, self._dir)
+            raise
+        self._close_journal()
+        shutil.rmtree(self._dir)
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
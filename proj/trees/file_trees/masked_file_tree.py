@@ -1,10 +1,14 @@
 from typing import (
+    Iterable,
     Iterator,
+    Optional,
+    Tuple,
 )
 from ..file_tree import (
     FileTree,
     PathTree,
 )
+from ..path_tree import PrunePredicate
 from pathlib import PurePath
 
 class MaskedFileTree(FileTree):
@@ -37,14 +41,14 @@ class MaskedFileTree(FileTree):
     def has_file(self, p: PurePath) -> bool:
         return self._path_tree.has_file(p)
 
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
-        return self._path_tree.with_extension(extension)
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._path_tree.with_extension(extension, prune=prune)
 
-    def files(self) -> Iterator[PurePath]:
-        return self._path_tree.files()
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._path_tree.files(prune=prune)
 
-    def dirs(self) -> Iterator[PurePath]:
-        return self._path_tree.dirs()
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._path_tree.dirs(prune=prune)
 
     def get_file_contents(
         self,
@@ -52,3 +56,12 @@ class MaskedFileTree(FileTree):
     ) -> str:
         assert self.has_path(p)
         return self._file_tree.get_file_contents(p)
+
+    def get_many_file_contents(
+        self,
+        paths: Iterable[PurePath],
+    ) -> Iterator[Tuple[PurePath, str]]:
+        paths = list(paths)
+        for p in paths:
+            assert self.has_path(p)
+        return self._file_tree.get_many_file_contents(paths)
@@ -0,0 +1,76 @@
+from ..file_tree import (
+    FileTree,
+    MutableFileTree,
+)
+from ..path_trees.overlay_path_tree import OverlayPathTree
+from ..path_trees.emulated_path_tree import PathType
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    Tuple,
+)
+from pathlib import PurePath
+
+class OverlayFileTree(MutableFileTree, OverlayPathTree):
+    _base: FileTree
+    _contents: Dict[PurePath, str]
+
+    def __init__(self, base: FileTree) -> None:
+        OverlayPathTree.__init__(self, base)
+        self._contents = {}
+
+    def get_file_contents(
+        self,
+        p: PurePath,
+    ) -> str:
+        assert self.has_file(p), p
+        k = self._key(p)
+        if k in self._contents:
+            return self._contents[k]
+        return self._base.get_file_contents(k)
+
+    def get_many_file_contents(
+        self,
+        paths: Iterable[PurePath],
+    ) -> Iterator[Tuple[PurePath, str]]:
+        paths = list(paths)
+        for p in paths:
+            assert self.has_file(p), p
+        from_layer = {
+            p: self._contents[self._key(p)] for p in paths if self._key(p) in self._contents
+        }
+        from_base = self._base.get_many_file_contents(
+            [self._key(p) for p in paths if p not in from_layer]
+        )
+        for p in paths:
+            if p in from_layer:
+                yield (p, from_layer[p])
+            else:
+                _, contents = next(from_base)
+                yield (p, contents)
+
+    def set_file_contents(
+        self,
+        p: PurePath,
+        contents: str,
+        exist_ok: bool = False,
+        parents: bool = False,
+    ) -> None:
+        if not exist_ok:
+            assert not self.has_file(p)
+        if parents:
+            self.mkdir(p.parent, exist_ok=True, parents=True)
+        k = self._key(p)
+        self._layer[k] = PathType.FILE
+        self._contents[k] = contents
+
+    def rm_file(self, p: PurePath) -> None:
+        OverlayPathTree.rm_file(self, p)
+        self._contents.pop(self._key(p), None)
+
+    def rename(self, src: PurePath, dst: PurePath) -> None:
+        contents = self.get_file_contents(src)
+        OverlayPathTree.rename(self, src, dst)
+        self._contents[self._key(dst)] = contents
+        self._contents.pop(self._key(src), None)
@@ -0,0 +1,187 @@
+from ..file_tree import (
+    MutableFileTreeWithMtime,
+    CreateFileTrace,
+    ModifyFileTrace,
+)
+from ..path_tree import (
+    PrunePredicate,
+    MoveTrace,
+    MkDirTrace,
+    RmFileTrace,
+)
+from ..path_trees.emulated_path_tree import PathType
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from pathlib import PurePath
+
+@dataclass(frozen=True)
+class StatCacheCounters:
+    hits: int
+    misses: int
+
+class StatCachedFileTree(MutableFileTreeWithMtime):
+    _wrapped: MutableFileTreeWithMtime
+    _types: Dict[PurePath, Optional[PathType]]
+    _mtimes: Dict[PurePath, float]
+    _sizes: Dict[PurePath, int]
+    _hits: int
+    _misses: int
+
+    def __init__(self, file_tree: MutableFileTreeWithMtime) -> None:
+        self._wrapped = file_tree
+        self._types = {}
+        self._mtimes = {}
+        self._sizes = {}
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def counters(self) -> StatCacheCounters:
+        return StatCacheCounters(hits=self._hits, misses=self._misses)
+
+    def _get_type(self, p: PurePath) -> Optional[PathType]:
+        if p in self._types:
+            self._hits += 1
+            return self._types[p]
+        self._misses += 1
+        path_type: Optional[PathType]
+        if self._wrapped.has_file(p):
+            path_type = PathType.FILE
+        elif self._wrapped.has_dir(p):
+            path_type = PathType.DIR
+        else:
+            path_type = None
+        self._types[p] = path_type
+        return path_type
+
+    def _invalidate_subtree(self, p: PurePath) -> None:
+        for cached in [k for k in self._types if k.is_relative_to(p)]:
+            del self._types[cached]
+        for cached in [k for k in self._mtimes if k.is_relative_to(p)]:
+            del self._mtimes[cached]
+        for cached in [k for k in self._sizes if k.is_relative_to(p)]:
+            del self._sizes[cached]
+
+    def _invalidate_mtime(self, p: PurePath) -> None:
+        self._mtimes.pop(p, None)
+        self._sizes.pop(p, None)
+
+    def _set_created_dirs(self, p: PurePath) -> None:
+        for parent in [p, *p.parents]:
+            if self._types.get(parent) == PathType.DIR:
+                break
+            self._types[parent] = PathType.DIR
+            self._invalidate_mtime(parent)
+            self._invalidate_mtime(parent.parent)
+
+    def has_path(self, p: PurePath) -> bool:
+        return self._get_type(p) is not None
+
+    def has_dir(self, p: PurePath) -> bool:
+        return self._get_type(p) == PathType.DIR
+
+    def has_file(self, p: PurePath) -> bool:
+        return self._get_type(p) == PathType.FILE
+
+    def get_mtime(self, p: PurePath) -> float:
+        if p in self._mtimes:
+            self._hits += 1
+            return self._mtimes[p]
+        self._misses += 1
+        mtime = self._wrapped.get_mtime(p)
+        self._mtimes[p] = mtime
+        return mtime
+
+    def get_size(self, p: PurePath) -> int:
+        if p in self._sizes:
+            self._hits += 1
+            return self._sizes[p]
+        self._misses += 1
+        size = self._wrapped.get_size(p)
+        self._sizes[p] = size
+        return size
+
+    def get_file_contents(self, p: PurePath) -> str:
+        return self._wrapped.get_file_contents(p)
+
+    def get_file_head(self, p: PurePath, max_chars: int) -> str:
+        return self._wrapped.get_file_head(p, max_chars)
+
+    def get_many_file_contents(
+        self,
+        paths: Iterable[PurePath],
+    ) -> Iterator[Tuple[PurePath, str]]:
+        return self._wrapped.get_many_file_contents(paths)
+
+    def ls_dir(self, p: PurePath) -> Iterator[PurePath]:
+        return self._wrapped.ls_dir(p)
+
+    def restrict_to_subdir(self, p: PurePath) -> 'StatCachedFileTree':
+        return StatCachedFileTree(self._wrapped.restrict_to_subdir(p))
+
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.with_extension(extension=extension, prune=prune)
+
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.files(prune=prune)
+
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.dirs(prune=prune)
+
+    def mkdir(
+        self,
+        p: PurePath,
+        exist_ok: bool = False,
+        parents: bool = False,
+    ) -> None:
+        self._wrapped.mkdir(p=p, exist_ok=exist_ok, parents=parents)
+        self._set_created_dirs(p)
+
+    def rename(self, src: PurePath, dst: PurePath) -> None:
+        self._wrapped.rename(src=src, dst=dst)
+        self._invalidate_subtree(src)
+        self._invalidate_subtree(dst)
+        self._types[src] = None
+        self._invalidate_mtime(src.parent)
+        self._invalidate_mtime(dst.parent)
+
+    def rm_file(self, p: PurePath) -> None:
+        self._wrapped.rm_file(p=p)
+        self._types[p] = None
+        self._invalidate_mtime(p)
+        self._invalidate_mtime(p.parent)
+
+    def set_file_contents(
+        self,
+        p: PurePath,
+        contents: str,
+        exist_ok: bool = False,
+        parents: bool = False,
+    ) -> None:
+        self._wrapped.set_file_contents(
+            p=p,
+            contents=contents,
+            exist_ok=exist_ok,
+            parents=parents,
+        )
+        self._set_created_dirs(p.parent)
+        self._types[p] = PathType.FILE
+        self._invalidate_mtime(p)
+        self._invalidate_mtime(p.parent)
+
+    def commit_file_trace(
+        self,
+        file_trace: Sequence[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]],
+    ) -> None:
+        self._wrapped.commit_file_trace(file_trace)
+        self._types.clear()
+        self._mtimes.clear()
+        self._sizes.clear()
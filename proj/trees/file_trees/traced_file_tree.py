@@ -7,8 +7,12 @@ from ..file_tree import (
     ModifyFileTrace,
     MutableFileTree,
 )
+from ..path_tree import PrunePredicate
 from typing import (
+    Iterable,
     List,
+    Tuple,
+    Optional,
     Union,
     Iterator,
 )
@@ -42,6 +46,12 @@ class MutableTracedFileTreeByWrapping(TracedMutableFileTree):
     ) -> str:
         return self._wrapped.get_file_contents(p=p)
 
+    def get_many_file_contents(
+        self,
+        paths: Iterable[PurePath],
+    ) -> Iterator[Tuple[PurePath, str]]:
+        return self._wrapped.get_many_file_contents(paths)
+
     def has_path(self, p: PurePath) -> bool:
         return self._wrapped.has_path(p=p)
 
@@ -59,14 +69,14 @@ class MutableTracedFileTreeByWrapping(TracedMutableFileTree):
     def has_file(self, p: PurePath) -> bool:
         return self._wrapped.has_file(p=p)
 
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
-        return self._wrapped.with_extension(extension=extension)
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.with_extension(extension=extension, prune=prune)
 
-    def files(self) -> Iterator[PurePath]:
-        return self._wrapped.files()
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.files(prune=prune)
 
-    def dirs(self) -> Iterator[PurePath]:
-        return self._wrapped.dirs()
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.dirs(prune=prune)
 
     def _mkdir_in_trace(self, p: PurePath) -> None:
         for parent in p.parents[::-1]:
@@ -138,7 +148,7 @@ class MutableTracedFileTreeByWrapping(TracedMutableFileTree):
 
             if curr_contents != contents:
                 self._trace.append(
-                    ModifyFileTrace(
+                    ModifyFileTrace.from_contents(
                         path=p,
                         old_contents=curr_contents,
                         new_contents=contents,
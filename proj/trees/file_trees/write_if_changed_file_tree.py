@@ -0,0 +1,120 @@
+from ..file_tree import (
+    MutableFileTreeWithMtime,
+    CreateFileTrace,
+    ModifyFileTrace,
+)
+from ..path_tree import (
+    PrunePredicate,
+    MoveTrace,
+    MkDirTrace,
+    RmFileTrace,
+)
+from dataclasses import dataclass
+from typing import (
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from pathlib import PurePath
+
+@dataclass(frozen=True)
+class WriteCounters:
+    written: int
+    skipped: int
+
+class WriteIfChangedFileTree(MutableFileTreeWithMtime):
+    _wrapped: MutableFileTreeWithMtime
+    _written: int
+    _skipped: int
+
+    def __init__(self, file_tree: MutableFileTreeWithMtime) -> None:
+        self._wrapped = file_tree
+        self._written = 0
+        self._skipped = 0
+
+    @property
+    def counters(self) -> WriteCounters:
+        return WriteCounters(written=self._written, skipped=self._skipped)
+
+    def has_path(self, p: PurePath) -> bool:
+        return self._wrapped.has_path(p)
+
+    def has_dir(self, p: PurePath) -> bool:
+        return self._wrapped.has_dir(p)
+
+    def has_file(self, p: PurePath) -> bool:
+        return self._wrapped.has_file(p)
+
+    def get_mtime(self, p: PurePath) -> float:
+        return self._wrapped.get_mtime(p)
+
+    def get_size(self, p: PurePath) -> int:
+        return self._wrapped.get_size(p)
+
+    def get_file_contents(self, p: PurePath) -> str:
+        return self._wrapped.get_file_contents(p)
+
+    def get_file_head(self, p: PurePath, max_chars: int) -> str:
+        return self._wrapped.get_file_head(p, max_chars)
+
+    def get_many_file_contents(
+        self,
+        paths: Iterable[PurePath],
+    ) -> Iterator[Tuple[PurePath, str]]:
+        return self._wrapped.get_many_file_contents(paths)
+
+    def ls_dir(self, p: PurePath) -> Iterator[PurePath]:
+        return self._wrapped.ls_dir(p)
+
+    def restrict_to_subdir(self, p: PurePath) -> 'WriteIfChangedFileTree':
+        return WriteIfChangedFileTree(self._wrapped.restrict_to_subdir(p))
+
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.with_extension(extension=extension, prune=prune)
+
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.files(prune=prune)
+
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.dirs(prune=prune)
+
+    def mkdir(
+        self,
+        p: PurePath,
+        exist_ok: bool = False,
+        parents: bool = False,
+    ) -> None:
+        self._wrapped.mkdir(p=p, exist_ok=exist_ok, parents=parents)
+
+    def rename(self, src: PurePath, dst: PurePath) -> None:
+        self._wrapped.rename(src=src, dst=dst)
+
+    def rm_file(self, p: PurePath) -> None:
+        self._wrapped.rm_file(p=p)
+
+    def set_file_contents(
+        self,
+        p: PurePath,
+        contents: str,
+        exist_ok: bool = False,
+        parents: bool = False,
+    ) -> None:
+        if exist_ok and self._wrapped.has_file(p) and self._wrapped.get_file_contents(p) == contents:
+            self._skipped += 1
+            return
+        self._written += 1
+        self._wrapped.set_file_contents_atomically(
+            p=p,
+            contents=contents,
+            exist_ok=exist_ok,
+            parents=parents,
+        )
+
+    def commit_file_trace(
+        self,
+        file_trace: Sequence[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]],
+    ) -> None:
+        self._wrapped.commit_file_trace(file_trace)
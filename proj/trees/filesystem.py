@@ -1,15 +1,54 @@
 from .file_tree import MutableFileTreeWithMtime
 from .file_trees.filesystem_file_tree import FilesystemFileTree
+from .path_trees.tree_index import TreeIndex
 from proj.paths.absolute_path import AbsolutePath
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import (
+    Dict,
+    TYPE_CHECKING,
+)
+from enum import StrEnum
+import atexit
 
 if TYPE_CHECKING:
     from proj.paths import Repo
 
+class TreeBackend(StrEnum):
+    FILESYSTEM = 'filesystem'
+    GIT_INDEX = 'git-index'
+
+# generated outputs are usually gitignored, but dtgen still has to see them
+# to decide what is stale and which outputs are orphaned
+GIT_INDEX_REINCLUDE_PATTERNS = ('*.dtg.*',)
+
 def load_root_filesystem() -> MutableFileTreeWithMtime:
     return FilesystemFileTree(AbsolutePath('/'))
 
-def load_filesystem_for_repo(repo: 'Repo') -> MutableFileTreeWithMtime:
-    fs = load_root_filesystem()
+def get_tree_index_path(repo: 'Repo') -> Path:
+    return Path(repo.path) / '.proj' / 'cache' / 'tree-index'
+
+# a single command loads the repo tree several times (and watch mode does so
+# on every rescan), so each index is loaded and saved once per process
+_tree_indexes: Dict[Path, TreeIndex] = {}
+
+def get_tree_index(repo: 'Repo') -> TreeIndex:
+    path = get_tree_index_path(repo)
+    index = _tree_indexes.get(path)
+    if index is None:
+        index = TreeIndex.load(path)
+        _tree_indexes[path] = index
+        atexit.register(index.save)
+    return index
+
+def load_filesystem_for_repo(
+    repo: 'Repo', 
+    use_index: bool = True, 
+    backend: TreeBackend = TreeBackend.FILESYSTEM,
+) -> MutableFileTreeWithMtime:
+    if backend == TreeBackend.GIT_INDEX:
+        return FilesystemFileTree(AbsolutePath(repo.path)).with_git_index(GIT_INDEX_REINCLUDE_PATTERNS)
+
+    if not use_index:
+        return FilesystemFileTree(AbsolutePath(repo.path)).with_snapshot()
 
-    return fs.restrict_to_subdir(repo.path)
+    return FilesystemFileTree(AbsolutePath(repo.path)).with_snapshot(get_tree_index(repo))
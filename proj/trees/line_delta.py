@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from typing import (
+    List,
+    Sequence,
+    Tuple,
+)
+import difflib
+import hashlib
+
+DIFF_CONTEXT_LINES = 3
+
+Opcode = Tuple[str, int, int, int, int]
+
+def content_hash(contents: str) -> str:
+    return hashlib.blake2b(contents.encode('utf-8', 'surrogateescape'), digest_size=16).hexdigest()
+
+def _strip_line_ending(line: str) -> str:
+    return line.splitlines()[0]
+
+def _format_range(start: int, stop: int) -> str:
+    length = stop - start
+    if length == 1:
+        return f'{start + 1}'
+    if length == 0:
+        return f'{start},0'
+    return f'{start + 1},{length}'
+
+@dataclass(frozen=True)
+class LineHunk:
+    old_start: int
+    new_start: int
+    old_lines: Tuple[str, ...]
+    new_lines: Tuple[str, ...]
+    opcodes: Tuple[Opcode, ...]
+
+    @property
+    def old_stop(self) -> int:
+        return self.old_start + len(self.old_lines)
+
+    @property
+    def new_stop(self) -> int:
+        return self.new_start + len(self.new_lines)
+
+    def render(self) -> List[str]:
+        result = [f'@@ -{_format_range(self.old_start, self.old_stop)} +{_format_range(self.new_start, self.new_stop)} @@\n']
+        for tag, i1, i2, j1, j2 in self.opcodes:
+            if tag == 'equal':
+                result.extend(' ' + _strip_line_ending(line) for line in self.old_lines[i1:i2])
+                continue
+            if tag in ('replace', 'delete'):
+                result.extend('-' + _strip_line_ending(line) for line in self.old_lines[i1:i2])
+            if tag in ('replace', 'insert'):
+                result.extend('+' + _strip_line_ending(line) for line in self.new_lines[j1:j2])
+        return result
+
+def _splice(
+    start: int,
+    lines: Sequence[str],
+    replacements: Sequence[Tuple[int, int, Tuple[str, ...]]],
+) -> List[str]:
+    result: List[str] = []
+    pos = start
+    for r_start, r_stop, r_lines in replacements:
+        result.extend(lines[pos - start:r_start - start])
+        result.extend(r_lines)
+        pos = r_stop
+    result.extend(lines[pos - start:])
+    return result
+
+def _hunks_from_lines(
+    old_lines: Sequence[str],
+    new_lines: Sequence[str],
+    old_offset: int = 0,
+    new_offset: int = 0,
+) -> List[LineHunk]:
+    # lines are matched without their endings, like the rendered diff, so a
+    # final line gaining a newline stays context; only when an ending change
+    # falls outside every hunk do the endings have to take part in matching
+    hunks = _hunks_from_matcher(
+        difflib.SequenceMatcher(
+            None,
+            [_strip_line_ending(line) for line in old_lines],
+            [_strip_line_ending(line) for line in new_lines],
+        ),
+        old_lines, new_lines, old_offset, new_offset,
+    )
+    replacements = [(h.old_start, h.old_stop, h.new_lines) for h in hunks]
+    if _splice(old_offset, old_lines, replacements) == list(new_lines):
+        return hunks
+    return _hunks_from_matcher(
+        difflib.SequenceMatcher(None, old_lines, new_lines),
+        old_lines, new_lines, old_offset, new_offset,
+    )
+
+def _hunks_from_matcher(
+    matcher: 'difflib.SequenceMatcher[str]',
+    old_lines: Sequence[str],
+    new_lines: Sequence[str],
+    old_offset: int,
+    new_offset: int,
+) -> List[LineHunk]:
+    result = []
+    for group in matcher.get_grouped_opcodes(DIFF_CONTEXT_LINES):
+        i1, j1 = group[0][1], group[0][3]
+        i2, j2 = group[-1][2], group[-1][4]
+        result.append(LineHunk(
+            old_start=old_offset + i1,
+            new_start=new_offset + j1,
+            old_lines=tuple(old_lines[i1:i2]),
+            new_lines=tuple(new_lines[j1:j2]),
+            opcodes=tuple((tag, a1 - i1, a2 - i1, b1 - j1, b2 - j1) for tag, a1, a2, b1, b2 in group),
+        ))
+    return result
+
+@dataclass(frozen=True)
+class LineDelta:
+    hunks: Tuple[LineHunk, ...]
+
+    @staticmethod
+    def from_contents(old_contents: str, new_contents: str) -> 'LineDelta':
+        return LineDelta(tuple(_hunks_from_lines(
+            old_contents.splitlines(keepends=True),
+            new_contents.splitlines(keepends=True),
+        )))
+
+    def apply(self, old_contents: str) -> str:
+        old_lines = old_contents.splitlines(keepends=True)
+        result: List[str] = []
+        pos = 0
+        for hunk in self.hunks:
+            assert tuple(old_lines[hunk.old_start:hunk.old_stop]) == hunk.old_lines, hunk
+            result.extend(old_lines[pos:hunk.old_start])
+            result.extend(hunk.new_lines)
+            pos = hunk.old_stop
+        result.extend(old_lines[pos:])
+        return ''.join(result)
+
+    def render(self) -> str:
+        return '\n'.join(line for hunk in self.hunks for line in hunk.render())
+
+    def then(self, other: 'LineDelta') -> 'LineDelta':
+        # every line of the intermediate contents near a change is known from
+        # either our new side or the other delta's old side, so each connected
+        # region can be rebuilt on both ends and re-diffed independently
+        spans = sorted(
+            [(h.new_start, h.new_stop, h.new_lines, 0, h) for h in self.hunks]
+            + [(h.old_start, h.old_stop, h.old_lines, 1, h) for h in other.hunks],
+            key=lambda s: (s[0], s[1]),
+        )
+        regions: List[Tuple[int, int, List[Tuple[int, int, Tuple[str, ...], int, LineHunk]]]] = []
+        for span in spans:
+            if len(regions) > 0 and span[0] <= regions[-1][1]:
+                start, stop, members = regions[-1]
+                regions[-1] = (start, max(stop, span[1]), members + [span])
+            else:
+                regions.append((span[0], span[1], [span]))
+
+        hunks: List[LineHunk] = []
+        old_shift = 0
+        new_shift = 0
+        for start, stop, members in regions:
+            mid_lines: List[str] = [''] * (stop - start)
+            for m_start, m_stop, m_lines, _, _ in members:
+                mid_lines[m_start - start:m_stop - start] = m_lines
+            ours = [h for _, _, _, side, h in members if side == 0]
+            theirs = [h for _, _, _, side, h in members if side == 1]
+            hunks.extend(_hunks_from_lines(
+                _splice(start, mid_lines, [(h.new_start, h.new_stop, h.old_lines) for h in ours]),
+                _splice(start, mid_lines, [(h.old_start, h.old_stop, h.new_lines) for h in theirs]),
+                old_offset=start - old_shift,
+                new_offset=start + new_shift,
+            ))
+            old_shift += sum(len(h.new_lines) - len(h.old_lines) for h in ours)
+            new_shift += sum(len(h.new_lines) - len(h.old_lines) for h in theirs)
+        return LineDelta(tuple(hunks))
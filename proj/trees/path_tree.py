@@ -1,5 +1,7 @@
 from typing import (
+    Callable,
     Iterator,
+    Optional,
     Self,
     Sequence,
     Union,
@@ -11,6 +13,24 @@ from pathlib import (
 import abc
 from dataclasses import dataclass
 
+PrunePredicate = Callable[[PurePath], bool]
+
+def name_suffixes(name: str) -> Iterator[str]:
+    i = name.find('.')
+    while i != -1:
+        yield name[i:]
+        i = name.find('.', i + 1)
+
+def is_pruned(p: PurePath, prune: Optional[PrunePredicate]) -> bool:
+    if prune is None:
+        return False
+    return any(prune(parent) for parent in p.parents[:-1])
+
+def is_pruned_dir(p: PurePath, prune: Optional[PrunePredicate]) -> bool:
+    if prune is None:
+        return False
+    return prune(p) or is_pruned(p, prune)
+
 class PathTree(abc.ABC): 
     @abc.abstractmethod
     def has_path(self, p: PurePath) -> bool:
@@ -33,15 +53,15 @@ class PathTree(abc.ABC):
         ...
 
     @abc.abstractmethod
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
         ...
 
     @abc.abstractmethod
-    def files(self) -> Iterator[PurePath]:
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
         ...
 
     @abc.abstractmethod
-    def dirs(self) -> Iterator[PurePath]:
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
         ...
 
 class MutablePathTree(PathTree):
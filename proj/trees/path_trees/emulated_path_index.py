@@ -0,0 +1,49 @@
+from pathlib import PurePath
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+)
+from ..path_tree import name_suffixes
+
+class EmulatedPathIndex:
+    _children: Dict[PurePath, Dict[PurePath, None]]
+    # keyed by every ancestor directory, so that restricted views only see
+    # the matches under their own prefix
+    _by_suffix: Dict[Tuple[str, PurePath], Dict[PurePath, None]]
+
+    def __init__(self, paths: Iterable[PurePath] = tuple()) -> None:
+        self._children = {}
+        self._by_suffix = {}
+        for p in paths:
+            self.add(p)
+
+    def add(self, p: PurePath) -> None:
+        if p != p.parent:
+            self._children.setdefault(p.parent, {})[p] = None
+        for suffix in name_suffixes(p.name):
+            for parent in p.parents:
+                self._by_suffix.setdefault((suffix, parent), {})[p] = None
+
+    def remove(self, p: PurePath) -> None:
+        siblings = self._children.get(p.parent)
+        if siblings is not None:
+            siblings.pop(p, None)
+        for suffix in name_suffixes(p.name):
+            for parent in p.parents:
+                self._by_suffix[(suffix, parent)].pop(p, None)
+
+    def children(self, d: PurePath) -> Iterator[PurePath]:
+        yield from list(self._children.get(d, {}))
+
+    def with_suffix(self, suffix: str, d: PurePath) -> Iterator[PurePath]:
+        yield from list(self._by_suffix.get((suffix, d), {}))
+
+    def descendants(self, d: PurePath) -> Iterator[PurePath]:
+        to_visit: List[PurePath] = [d]
+        while len(to_visit) > 0:
+            for child in self.children(to_visit.pop()):
+                yield child
+                to_visit.append(child)
@@ -1,8 +1,14 @@
-from ..path_tree import MutablePathTree
+from ..path_tree import (
+    MutablePathTree,
+    PrunePredicate,
+    is_pruned,
+    is_pruned_dir,
+)
 from typing import (
     Dict,
     Iterator,
     Mapping,
+    Optional,
     Union,
     Iterable,
 )
@@ -10,9 +16,11 @@ from enum import (
     Enum,
     auto,
 )
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import PurePath, Path
+from .emulated_path_index import EmulatedPathIndex
 import os
+import copy
 
 class PathType(Enum):
     FILE = auto()
@@ -21,27 +29,63 @@ class PathType(Enum):
 @dataclass(eq=True)
 class EmulatedPathTree(MutablePathTree):
     _paths: Dict[PurePath, PathType]
+    _index: EmulatedPathIndex = field(init=False, compare=False, repr=False)
+    _prefix: PurePath = field(default=PurePath('.'), compare=False)
+
+    def __post_init__(self) -> None:
+        self._index = EmulatedPathIndex(self._paths)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EmulatedPathTree):
+            return NotImplemented
+        return self._as_dict() == other._as_dict()
+
+    def _key(self, p: PurePath) -> PurePath:
+        return self._prefix / p
+
+    def _rel(self, k: PurePath) -> PurePath:
+        return k.relative_to(self._prefix)
+
+    def _keys(self) -> Iterator[PurePath]:
+        if self._prefix == PurePath('.'):
+            yield from list(self._paths)
+            return
+        if self._prefix in self._paths:
+            yield self._prefix
+        yield from self._index.descendants(self._prefix)
+
+    def _as_dict(self) -> Dict[PurePath, PathType]:
+        return {self._rel(k): self._paths[k] for k in self._keys()}
+
+    def _set(self, p: PurePath, path_type: PathType) -> None:
+        k = self._key(p)
+        if k not in self._paths:
+            self._index.add(k)
+        self._paths[k] = path_type
+
+    def _del(self, p: PurePath) -> None:
+        k = self._key(p)
+        del self._paths[k]
+        self._index.remove(k)
 
     def has_path(self, p: PurePath) -> bool:
-        return p in self._paths
+        return self._key(p) in self._paths
 
     def has_dir(self, p: PurePath) -> bool:
-        return self._paths.get(p) == PathType.DIR
+        return self._paths.get(self._key(p)) == PathType.DIR
 
     def has_file(self, p: PurePath) -> bool:
-        return self._paths.get(p) == PathType.FILE
+        return self._paths.get(self._key(p)) == PathType.FILE
 
     def ls_dir(self, p: PurePath) -> Iterator[PurePath]: 
         assert self.has_dir(p)
-        for path in self._paths:
-            if path == (p / path.name):
-                yield path
+        for k in self._index.children(self._key(p)):
+            yield self._rel(k)
 
     def restrict_to_subdir(self, p: PurePath) -> 'EmulatedPathTree':
-        return EmulatedPathTree({
-            k.relative_to(p): v for k, v in self._paths.items()
-            if k.is_relative_to(p)
-        })
+        result = copy.copy(self)
+        result._prefix = self._key(p)
+        return result
 
     def mkdir(
         self, 
@@ -54,34 +98,37 @@ class EmulatedPathTree(MutablePathTree):
         if parents:
             for parent in p.parents[::-1]:
                 self.mkdir(parent, exist_ok=True, parents=False)
-        self._paths[p] = PathType.DIR
+        self._set(p, PathType.DIR)
 
     def rm_file(self, p: PurePath) -> None:
         assert self.has_file(p)
-        del self._paths[p]
+        self._del(p)
 
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
         assert extension.startswith('.')
-        for path in self._paths:
-            if path.name.endswith(extension):
+        for k in self._index.with_suffix(extension, self._prefix):
+            path = self._rel(k)
+            if not is_pruned(path, prune):
                 yield path
 
-    def files(self) -> Iterator[PurePath]:
-        for path in self._paths:
-            if self.has_file(path):
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        for k in self._keys():
+            path = self._rel(k)
+            if self._paths[k] == PathType.FILE and not is_pruned(path, prune):
                 yield path
 
-    def dirs(self) -> Iterator[PurePath]:
-        for path in self._paths:
-            if self.has_dir(path):
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        for k in self._keys():
+            path = self._rel(k)
+            if self._paths[k] == PathType.DIR and not is_pruned_dir(path, prune):
                 yield path
 
     def rename(self, src: PurePath, dst: PurePath) -> None:
         assert self.has_path(src)
         assert self.has_dir(dst.parent)
         assert not self.has_path(dst)
-        self._paths[dst] = self._paths[src]
-        del self._paths[src]
+        self._set(dst, self._paths[self._key(src)])
+        self._del(src)
 
     @staticmethod
     def from_map(m: Union[Mapping[PurePath, PathType]]) -> 'EmulatedPathTree':
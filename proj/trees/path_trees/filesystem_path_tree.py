@@ -1,28 +1,68 @@
 from pathlib import PurePath, Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import (
     Iterator,
+    List,
+    Optional,
     Self,
+    Sequence,
     TYPE_CHECKING,
+    Tuple,
 )
-from ..path_tree import MutablePathTree
+from ..path_tree import MutablePathTree, PrunePredicate
+from .emulated_path_tree import PathType
+from .filesystem_snapshot import FilesystemSnapshot
+from .tree_index import TreeIndex
+from .git_index import list_git_worktree
+import logging
 import os
 import copy
 
+_l = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from proj.paths import AbsolutePath
 
 @dataclass(eq=True)
 class FilesystemPathTree(MutablePathTree):
     _root: 'AbsolutePath'
+    _snapshot: Optional[FilesystemSnapshot] = field(default=None, compare=False, repr=False)
+
+    def with_snapshot(self, index: Optional[TreeIndex] = None) -> Self:
+        result = copy.copy(self)
+        result._snapshot = FilesystemSnapshot(self._root.raw, index)
+        return result
+
+    def with_git_index(self, reinclude: Sequence[str] = ()) -> Self:
+        listing = list_git_worktree(self._root.raw, reinclude)
+        if listing is None:
+            _l.debug(f'No usable git index for {self._root}, falling back to scanning the filesystem')
+            return self.with_snapshot()
+        result = copy.copy(self)
+        result._snapshot = FilesystemSnapshot.from_listing(self._root.raw, listing)
+        return result
+
+    def _snapshot_key(self, p: PurePath) -> PurePath:
+        assert self._snapshot is not None
+        return self._root.raw.relative_to(self._snapshot.base) / p
+
+    def _snapshot_type(self, p: PurePath) -> Optional[PathType]:
+        assert self._snapshot is not None
+        return self._snapshot.get_type(self._snapshot_key(p))
 
     def has_path(self, p: PurePath) -> bool:
+        if self._snapshot is not None:
+            return self._snapshot_type(p) is not None
         return (self._root / p).raw.exists()
 
     def has_dir(self, p: PurePath) -> bool:
+        if self._snapshot is not None:
+            return self._snapshot_type(p) == PathType.DIR
         return (self._root / p).raw.is_dir()
 
     def has_file(self, p: PurePath) -> bool:
+        if self._snapshot is not None:
+            return self._snapshot_type(p) == PathType.FILE
         return (self._root / p) .raw.is_file()
 
     def mkdir(
@@ -32,20 +72,43 @@ class FilesystemPathTree(MutablePathTree):
         parents: bool = False,
     ) -> None:
         Path(self._root.raw / p).mkdir(exist_ok=exist_ok, parents=parents)
+        if self._snapshot is not None:
+            key = self._snapshot_key(p)
+            for parent in [*key.parents[::-1][1:], key]:
+                self._snapshot.add(parent, PathType.DIR)
 
     def rm_file(self, p: PurePath) -> None:
         assert self.has_file(p)
         Path(self._root.raw / p).unlink()
-
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
+        if self._snapshot is not None:
+            self._snapshot.remove(self._snapshot_key(p))
+
+    def with_extension(
+        self,
+        extension: str,
+        prune: Optional[PrunePredicate] = None,
+    ) -> Iterator[PurePath]:
         assert extension.startswith('.')
 
+        if self._snapshot is not None:
+            prefix = self._snapshot_key(PurePath('.'))
+            for found in self._snapshot.with_suffix(extension, prefix, self._snapshot_prune(prune)):
+                yield found.relative_to(prefix)
+            return
+
         def has_extension(p: PurePath) -> bool:
             return p.name.endswith(extension)
 
-        yield from filter(has_extension, self.files())
+        yield from filter(has_extension, self.files(prune=prune))
 
     def ls_dir(self, p: PurePath) -> Iterator[PurePath]: 
+        if self._snapshot is not None:
+            prefix = self._snapshot_key(PurePath('.'))
+            yield from [
+                _p.relative_to(prefix) for _p in self._snapshot.ls_dir(prefix / p)
+            ]
+            return
+
         yield from [
             _p.relative_to(self._root.raw) for _p in Path(self._root.raw / p).iterdir()
         ]
@@ -55,25 +118,51 @@ class FilesystemPathTree(MutablePathTree):
         assert self.has_dir(dst.parent)
         assert not self.has_path(dst)
         Path(self._root.raw / src).rename(self._root.raw / dst)
+        if self._snapshot is not None:
+            self._snapshot.move(self._snapshot_key(src), self._snapshot_key(dst))
 
     def restrict_to_subdir(self, p: PurePath) -> Self:
         assert self.has_dir(p)
-        result = copy.deepcopy(self)
+        result = copy.copy(self)
         result._root = self._root / p
         return result
 
-    def files(self) -> Iterator[PurePath]:
+    def _snapshot_prune(self, prune: Optional[PrunePredicate]) -> Optional[PrunePredicate]:
+        if prune is None:
+            return None
+        prefix = self._snapshot_key(PurePath('.'))
+        return lambda k: prune(k.relative_to(prefix))
+
+    def _walk_snapshot(self, path_type: PathType, prune: Optional[PrunePredicate]) -> Iterator[PurePath]:
+        assert self._snapshot is not None
+        prefix = self._snapshot_key(PurePath('.'))
+        for found, found_type in self._snapshot.walk(prefix, self._snapshot_prune(prune)):
+            if found_type == path_type:
+                yield found.relative_to(prefix)
+
+    def _walk(self, prune: Optional[PrunePredicate]) -> Iterator[Tuple[PurePath, List[str], List[str]]]:
         base = self._root.raw
 
         for (dirpath, dirnames, filenames) in os.walk(base):
             _dirpath = PurePath(dirpath).relative_to(base)
+            if prune is not None:
+                dirnames[:] = [d for d in dirnames if not prune(_dirpath / d)]
+            yield (_dirpath, dirnames, filenames)
+
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        if self._snapshot is not None:
+            yield from self._walk_snapshot(PathType.FILE, prune)
+            return
+
+        for (_dirpath, dirnames, filenames) in self._walk(prune):
             for fname in filenames:
                 yield (_dirpath / fname)
 
-    def dirs(self) -> Iterator[PurePath]:
-        base = self._root.raw
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        if self._snapshot is not None:
+            yield from self._walk_snapshot(PathType.DIR, prune)
+            return
 
-        for (dirpath, dirnames, filenames) in os.walk(base):
-            _dirpath = PurePath(dirpath).relative_to(base)
+        for (_dirpath, dirnames, filenames) in self._walk(prune):
             for dirname in dirnames:
                 yield (_dirpath / dirname)
@@ -0,0 +1,240 @@
+from pathlib import PurePath, Path
+from typing import (
+    AbstractSet,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+from .emulated_path_tree import PathType
+from ..path_tree import PrunePredicate, name_suffixes
+from .tree_index import TreeIndex, TreeIndexEntry
+import os
+
+class FilesystemSnapshot:
+    _base: Path
+    _children: Dict[PurePath, Dict[str, PathType]]
+    _symlinked_dirs: Set[PurePath]
+    _by_suffix: Dict[str, Dict[PurePath, None]]
+    _is_built: bool
+    _index: Optional[TreeIndex]
+
+    def __init__(self, base: Path, index: Optional[TreeIndex] = None) -> None:
+        self._base = base
+        self._index = index
+        self._children = {}
+        self._symlinked_dirs = set()
+        self._by_suffix = {}
+        self._is_built = False
+
+    @staticmethod
+    def from_listing(base: Path, listing: Mapping[PurePath, PathType]) -> 'FilesystemSnapshot':
+        result = FilesystemSnapshot(base)
+        result._children[PurePath('.')] = {}
+        for p, path_type in listing.items():
+            missing = []
+            d = p.parent
+            while d not in result._children:
+                missing.append(d)
+                d = d.parent
+            for d in reversed(missing):
+                result._children[d.parent][d.name] = PathType.DIR
+                result._children[d] = {}
+            result._children[p.parent][p.name] = path_type
+            if path_type == PathType.DIR:
+                result._children.setdefault(p, {})
+            else:
+                result._add_to_suffix_index(p)
+        result._is_built = True
+        return result
+
+    @property
+    def base(self) -> Path:
+        return self._base
+
+    def _scan_dir(self, d: PurePath) -> Dict[str, PathType]:
+        if self._index is not None:
+            mtime_ns = os.stat(self._base / d).st_mtime_ns
+            cached = self._index.lookup(d, mtime_ns)
+            if cached is not None:
+                return self._load_listing(d, dict(cached.children), cached.symlinked_dirs)
+
+        listing: Dict[str, PathType] = {}
+        symlinked_dirs: Set[str] = set()
+        with os.scandir(self._base / d) as it:
+            for entry in it:
+                if entry.is_dir():
+                    listing[entry.name] = PathType.DIR
+                    if entry.is_symlink():
+                        symlinked_dirs.add(entry.name)
+                else:
+                    listing[entry.name] = PathType.FILE
+
+        if self._index is not None:
+            self._index.record(d, TreeIndexEntry(
+                mtime_ns=mtime_ns,
+                children=dict(listing),
+                symlinked_dirs=frozenset(symlinked_dirs),
+            ))
+        return self._load_listing(d, listing, symlinked_dirs)
+
+    def _load_listing(
+        self, 
+        d: PurePath, 
+        listing: Dict[str, PathType], 
+        symlinked_dirs: AbstractSet[str],
+    ) -> Dict[str, PathType]:
+        for name, path_type in listing.items():
+            if path_type == PathType.FILE:
+                self._add_to_suffix_index(d / name)
+        for name in symlinked_dirs:
+            self._symlinked_dirs.add(d / name)
+        self._children[d] = listing
+        return listing
+
+    def _ensure_built(self) -> None:
+        if self._is_built:
+            return
+        for _ in self.walk(PurePath('.')):
+            pass
+        self._is_built = True
+        if self._index is not None:
+            self._index.mark_complete()
+
+    def _add_to_suffix_index(self, p: PurePath) -> None:
+        for suffix in name_suffixes(p.name):
+            self._by_suffix.setdefault(suffix, {})[p] = None
+
+    def _remove_from_suffix_index(self, p: PurePath) -> None:
+        for suffix in name_suffixes(p.name):
+            self._by_suffix[suffix].pop(p, None)
+
+    def _listing(self, d: PurePath) -> Optional[Dict[str, PathType]]:
+        listing = self._children.get(d)
+        if listing is None and self.get_type(d) == PathType.DIR:
+            listing = self._scan_dir(d)
+        return listing
+
+    def get_type(self, p: PurePath) -> Optional[PathType]:
+        if p == PurePath('.'):
+            return PathType.DIR
+        listing = self._listing(p.parent)
+        if listing is None:
+            return None
+        return listing.get(p.name)
+
+    def ls_dir(self, d: PurePath) -> Iterator[PurePath]:
+        listing = self._listing(d)
+        assert listing is not None, d
+        for name in list(listing):
+            yield d / name
+
+    def walk(
+        self,
+        d: PurePath,
+        prune: Optional[PrunePredicate] = None,
+        scan: bool = True,
+    ) -> Iterator[Tuple[PurePath, PathType]]:
+        to_visit: List[PurePath] = [d]
+        while len(to_visit) > 0:
+            curr = to_visit.pop()
+            if scan:
+                listing = self._listing(curr)
+            else:
+                listing = self._children.get(curr)
+            if listing is None:
+                continue
+            for name, path_type in list(listing.items()):
+                p = curr / name
+                if path_type == PathType.DIR:
+                    if prune is not None and prune(p):
+                        continue
+                    if p not in self._symlinked_dirs:
+                        to_visit.append(p)
+                yield (p, path_type)
+
+    def with_suffix(
+        self,
+        suffix: str,
+        d: PurePath,
+        prune: Optional[PrunePredicate] = None,
+    ) -> Iterator[PurePath]:
+        if prune is not None and not self._is_built:
+            for p, path_type in self.walk(d, prune):
+                if path_type == PathType.FILE and p.name.endswith(suffix):
+                    yield p
+            return
+
+        self._ensure_built()
+        for p in list(self._by_suffix.get(suffix, {})):
+            if not p.is_relative_to(d):
+                continue
+            if prune is not None and any(
+                prune(parent) for parent in p.parents
+                if parent != d and parent.is_relative_to(d)
+            ):
+                continue
+            yield p
+
+    def add(self, p: PurePath, path_type: PathType) -> None:
+        if p == PurePath('.'):
+            return
+        listing = self._children.get(p.parent)
+        if listing is None:
+            return
+        if listing.get(p.name) == path_type:
+            return
+        listing[p.name] = path_type
+        if path_type == PathType.DIR:
+            self._children[p] = {}
+        else:
+            self._add_to_suffix_index(p)
+
+    def remove(self, p: PurePath) -> None:
+        listing = self._children.get(p.parent)
+        if listing is None or p.name not in listing:
+            return
+        path_type = listing.pop(p.name)
+        if path_type == PathType.DIR:
+            for sub, sub_type in list(self.walk(p, scan=False)):
+                if sub_type == PathType.FILE:
+                    self._remove_from_suffix_index(sub)
+                else:
+                    self._children.pop(sub, None)
+                    self._symlinked_dirs.discard(sub)
+            self._children.pop(p, None)
+            self._symlinked_dirs.discard(p)
+        else:
+            self._remove_from_suffix_index(p)
+
+    def move(self, src: PurePath, dst: PurePath) -> None:
+        listing = self._children.get(src.parent)
+        if listing is None or src.name not in listing:
+            if (self._base / dst).is_dir():
+                self.add(dst, PathType.DIR)
+                self._children.pop(dst, None)
+            else:
+                self.add(dst, PathType.FILE)
+            return
+
+        src_type = listing[src.name]
+        moved = list(self.walk(src, scan=False)) if src_type == PathType.DIR else []
+        unscanned = [
+            sub for sub, sub_type in [(src, src_type), *moved]
+            if sub_type == PathType.DIR and sub not in self._children
+        ]
+        symlinked = [
+            sub for sub, _ in [(src, src_type), *moved]
+            if sub in self._symlinked_dirs
+        ]
+        self.remove(src)
+        self.add(dst, src_type)
+        for sub, sub_type in moved:
+            self.add(dst / sub.relative_to(src), sub_type)
+        for sub in unscanned:
+            self._children.pop(dst / sub.relative_to(src), None)
+        for sub in symlinked:
+            self._symlinked_dirs.add(dst / sub.relative_to(src))
@@ -0,0 +1,79 @@
+from pathlib import PurePath, Path
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
+from .emulated_path_tree import PathType
+from ... import subprocess_trace as subprocess
+import logging
+import os
+
+_l = logging.getLogger(__name__)
+
+_MODE_TYPE_MASK = 0o170000
+_MODE_SYMLINK = 0o120000
+_MODE_GITLINK = 0o160000
+
+def find_git_dir(root: Path) -> Optional[Path]:
+    dot_git = root / '.git'
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        # linked worktrees and submodules use a `gitdir: <path>` pointer file
+        contents = dot_git.read_text().strip()
+        if contents.startswith('gitdir:'):
+            return (root / contents.removeprefix('gitdir:').strip()).resolve()
+    return None
+
+def _list_git_files(root: Path, reinclude: Sequence[str]) -> Optional[bytes]:
+    try:
+        output: bytes = subprocess.check_output(
+            [
+                'git', 'ls-files', '-z', '-t', '--stage',
+                '--cached', '--others', '--deleted', '--exclude-standard',
+                # command line patterns take precedence over .gitignore
+                *[f'--exclude=!{pattern}' for pattern in reinclude],
+            ],
+            cwd=root,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        _l.debug(f'Failed to list git files in {root}: {e}')
+        return None
+    return output
+
+def list_git_worktree(root: Path, reinclude: Sequence[str] = ()) -> Optional[Dict[PurePath, PathType]]:
+    if find_git_dir(root) is None:
+        return None
+    output = _list_git_files(root, reinclude)
+    if output is None:
+        return None
+
+    result: Dict[PurePath, PathType] = {}
+    deleted: List[PurePath] = []
+    for record in output.split(b'\0'):
+        if len(record) == 0:
+            continue
+        tag, rest = record[:1], record[2:]
+        if tag == b'?':
+            # untracked nested repositories are listed as directories
+            name = os.fsdecode(rest)
+            result[PurePath(name)] = PathType.DIR if name.endswith('/') else PathType.FILE
+            continue
+        stage, _, name_bytes = rest.partition(b'\t')
+        p = PurePath(os.fsdecode(name_bytes))
+        if tag == b'R':
+            deleted.append(p)
+            continue
+        mode_type = int(stage.split(b' ')[0], 8) & _MODE_TYPE_MASK
+        if mode_type == _MODE_GITLINK:
+            result[p] = PathType.DIR
+        elif mode_type == _MODE_SYMLINK and (root / p).is_dir():
+            result[p] = PathType.DIR
+        else:
+            result[p] = PathType.FILE
+    for p in deleted:
+        result.pop(p, None)
+    return result
@@ -2,23 +2,30 @@ from typing import (
     Iterable,
     FrozenSet,
     Iterator,
+    Optional,
 )
 from pathlib import PurePath
 from ..path_tree import (
     PathTree,
+    PrunePredicate,
 )
+from .path_trie import PathTrie
 from proj.utils import saturating_relative_to
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass(frozen=True)
 class AllowMask:
     paths: FrozenSet[PurePath]
+    _trie: PathTrie = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_trie', PathTrie(self.paths))
 
     def is_allowed(self, p: PurePath) -> bool:
-        for _p in self.paths:
-            if p.is_relative_to(_p):
-                return True
-        return False
+        return self._trie.has_ancestor_of(p)
+
+    def can_prune(self, p: PurePath) -> bool:
+        return self._trie.is_disjoint_from(p)
 
     def restrict_to_subdir(self, p: PurePath) -> 'AllowMask':
         return AllowMask.from_iter(
@@ -34,12 +41,16 @@ class AllowMask:
 @dataclass(frozen=True)
 class IgnoreMask:
     paths: FrozenSet[PurePath]
+    _trie: PathTrie = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, '_trie', PathTrie(self.paths))
 
     def is_allowed(self, p: PurePath) -> bool:
-        for _p in self.paths:
-            if p.is_relative_to(_p):
-                return False
-        return True
+        return not self._trie.has_ancestor_of(p)
+
+    def can_prune(self, p: PurePath) -> bool:
+        return not self.is_allowed(p)
 
     def restrict_to_subdir(self, p: PurePath) -> 'IgnoreMask':
         return IgnoreMask.from_iter(
@@ -71,6 +82,13 @@ class MaskedPathTree(PathTree):
     def _is_masked(self, p: PurePath) -> bool:
         return not self._mask.is_allowed(p)
 
+    def _pushdown_prune(self, prune: Optional[PrunePredicate]) -> PrunePredicate:
+        def _prune(p: PurePath) -> bool:
+            if self._mask.can_prune(p):
+                return True
+            return prune is not None and prune(p)
+        return _prune
+
     def _filter_masked(self, i: Iterable[PurePath]) -> Iterator[PurePath]:
         for p in i:
             if not self._is_masked(p):
@@ -98,16 +116,16 @@ class MaskedPathTree(PathTree):
     def has_file(self, p: PurePath) -> bool:
         if self._is_masked(p):
             return False
-        return self.has_file(p=p)
+        return self._wrapped.has_file(p=p)
 
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
-        return self._filter_masked(self._wrapped.with_extension(extension=extension))
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._filter_masked(self._wrapped.with_extension(extension=extension, prune=self._pushdown_prune(prune)))
 
-    def files(self) -> Iterator[PurePath]:
-        return self._filter_masked(self._wrapped.files())
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._filter_masked(self._wrapped.files(prune=self._pushdown_prune(prune)))
 
-    def dirs(self) -> Iterator[PurePath]:
-        return self._filter_masked(self._wrapped.dirs())
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._filter_masked(self._wrapped.dirs(prune=self._pushdown_prune(prune)))
 
     def __str__(self) -> str:
         return f'MaskedPathTree(_wrapped={self._wrapped}, _mask={self._mask})'
@@ -0,0 +1,143 @@
+from ..path_tree import (
+    PathTree,
+    MutablePathTree,
+    PrunePredicate,
+    is_pruned,
+    is_pruned_dir,
+)
+from .emulated_path_tree import PathType
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+)
+from pathlib import PurePath
+import copy
+
+class OverlayPathTree(MutablePathTree):
+    _base: PathTree
+    _layer: Dict[PurePath, Optional[PathType]]
+    _prefix: PurePath
+
+    def __init__(self, base: PathTree) -> None:
+        self._base = base
+        self._layer = {}
+        self._prefix = PurePath('.')
+
+    def _key(self, p: PurePath) -> PurePath:
+        return self._prefix / p
+
+    def _rel(self, k: PurePath) -> PurePath:
+        return k.relative_to(self._prefix)
+
+    def _get_type(self, k: PurePath) -> Optional[PathType]:
+        if k in self._layer:
+            return self._layer[k]
+        if k == PurePath('.'):
+            return PathType.DIR
+        if self._base.has_file(k):
+            return PathType.FILE
+        if self._base.has_dir(k):
+            return PathType.DIR
+        return None
+
+    def _base_view(self) -> Optional[PathTree]:
+        if self._prefix == PurePath('.'):
+            return self._base
+        if self._prefix in self._layer or not self._base.has_dir(self._prefix):
+            return None
+        return self._base.restrict_to_subdir(self._prefix)
+
+    def _merge(
+        self,
+        found: Iterator[PurePath],
+        include: Callable[[PurePath, PathType], bool],
+    ) -> Iterator[PurePath]:
+        for p in found:
+            if self._key(p) not in self._layer:
+                yield p
+        for k, path_type in list(self._layer.items()):
+            if path_type is None or k == self._prefix or not k.is_relative_to(self._prefix):
+                continue
+            if include(self._rel(k), path_type):
+                yield self._rel(k)
+
+    @property
+    def modified_paths(self) -> Iterator[PurePath]:
+        for k in self._layer:
+            if k.is_relative_to(self._prefix):
+                yield self._rel(k)
+
+    def has_path(self, p: PurePath) -> bool:
+        return self._get_type(self._key(p)) is not None
+
+    def has_dir(self, p: PurePath) -> bool:
+        return self._get_type(self._key(p)) == PathType.DIR
+
+    def has_file(self, p: PurePath) -> bool:
+        return self._get_type(self._key(p)) == PathType.FILE
+
+    def ls_dir(self, p: PurePath) -> Iterator[PurePath]:
+        assert self.has_dir(p)
+        k = self._key(p)
+        if k not in self._layer and self._base.has_dir(k):
+            for child in self._base.ls_dir(k):
+                if child not in self._layer:
+                    yield self._rel(child)
+        for child, path_type in list(self._layer.items()):
+            if path_type is not None and child != k and child.parent == k:
+                yield self._rel(child)
+
+    def restrict_to_subdir(self, p: PurePath) -> 'OverlayPathTree':
+        assert self.has_dir(p)
+        result = copy.copy(self)
+        result._prefix = self._key(p)
+        return result
+
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        assert extension.startswith('.')
+        base = self._base_view()
+        return self._merge(
+            iter([]) if base is None else base.with_extension(extension, prune=prune),
+            lambda p, _: p.name.endswith(extension) and not is_pruned(p, prune),
+        )
+
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        base = self._base_view()
+        return self._merge(
+            iter([]) if base is None else base.files(prune=prune),
+            lambda p, path_type: path_type == PathType.FILE and not is_pruned(p, prune),
+        )
+
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        base = self._base_view()
+        return self._merge(
+            iter([]) if base is None else base.dirs(prune=prune),
+            lambda p, path_type: path_type == PathType.DIR and not is_pruned_dir(p, prune),
+        )
+
+    def mkdir(
+        self,
+        p: PurePath,
+        exist_ok: bool = False,
+        parents: bool = False,
+    ) -> None:
+        if not exist_ok:
+            assert not self.has_dir(p)
+        if parents:
+            for parent in p.parents[::-1]:
+                self.mkdir(parent, exist_ok=True, parents=False)
+        if not self.has_dir(p):
+            self._layer[self._key(p)] = PathType.DIR
+
+    def rm_file(self, p: PurePath) -> None:
+        assert self.has_file(p)
+        self._layer[self._key(p)] = None
+
+    def rename(self, src: PurePath, dst: PurePath) -> None:
+        assert self.has_file(src)
+        assert self.has_dir(dst.parent)
+        assert not self.has_path(dst)
+        self._layer[self._key(dst)] = PathType.FILE
+        self._layer[self._key(src)] = None
@@ -0,0 +1,50 @@
+from dataclasses import dataclass, field
+from pathlib import PurePath
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+)
+
+@dataclass
+class PathTrieNode:
+    is_terminal: bool = False
+    children: Dict[str, 'PathTrieNode'] = field(default_factory=dict)
+
+class PathTrie:
+    _root: PathTrieNode
+
+    def __init__(self, paths: Iterable[PurePath] = tuple()) -> None:
+        self._root = PathTrieNode()
+        for p in paths:
+            self.add(p)
+
+    def add(self, p: PurePath) -> None:
+        node = self._root
+        for part in p.parts:
+            node = node.children.setdefault(part, PathTrieNode())
+        node.is_terminal = True
+
+    def has_ancestor_of(self, p: PurePath) -> bool:
+        node: Optional[PathTrieNode] = self._root
+        for part in p.parts:
+            assert node is not None
+            if node.is_terminal:
+                return True
+            node = node.children.get(part)
+            if node is None:
+                return False
+        assert node is not None
+        return node.is_terminal
+
+    def is_disjoint_from(self, p: PurePath) -> bool:
+        node: Optional[PathTrieNode] = self._root
+        for part in p.parts:
+            assert node is not None
+            if node.is_terminal:
+                return False
+            node = node.children.get(part)
+            if node is None:
+                return True
+        assert node is not None
+        return not node.is_terminal and len(node.children) == 0
@@ -1,5 +1,6 @@
 from typing import (
     List,
+    Optional,
     Union,
     Iterator,
 )
@@ -10,6 +11,7 @@ from ..path_tree import (
     MoveTrace,
     MkDirTrace,
     RmFileTrace,
+    PrunePredicate,
 )
 
 class MutableTracedPathTreeByWrapping(TracedMutablePathTree):
@@ -44,14 +46,14 @@ class MutableTracedPathTreeByWrapping(TracedMutablePathTree):
     def has_file(self, p: PurePath) -> bool:
         return self._wrapped.has_file(p=p)
 
-    def with_extension(self, extension: str) -> Iterator[PurePath]:
-        return self._wrapped.with_extension(extension=extension)
+    def with_extension(self, extension: str, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.with_extension(extension=extension, prune=prune)
 
-    def files(self) -> Iterator[PurePath]:
-        return self._wrapped.files()
+    def files(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.files(prune=prune)
 
-    def dirs(self) -> Iterator[PurePath]:
-        return self._wrapped.dirs()
+    def dirs(self, prune: Optional[PrunePredicate] = None) -> Iterator[PurePath]:
+        return self._wrapped.dirs(prune=prune)
 
 
     def mkdir(
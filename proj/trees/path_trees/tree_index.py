@@ -0,0 +1,130 @@
+from pathlib import PurePath, Path
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    FrozenSet,
+    Mapping,
+    Optional,
+)
+from .emulated_path_tree import PathType
+import json
+import logging
+import os
+import tempfile
+import time
+
+_l = logging.getLogger(__name__)
+
+TREE_INDEX_VERSION = 1
+
+# directories modified this recently may still change within the same mtime
+# tick, so (like git's racy-index handling) we never trust or record them
+RACY_WINDOW_NS = 2_000_000_000
+
+@dataclass(frozen=True)
+class TreeIndexEntry:
+    mtime_ns: int
+    children: Mapping[str, PathType]
+    symlinked_dirs: FrozenSet[str]
+
+    @staticmethod
+    def from_json(j: object) -> 'TreeIndexEntry':
+        assert isinstance(j, list)
+        assert len(j) == 4
+        mtime_ns, files, dirs, symlinked_dirs = j
+        assert isinstance(mtime_ns, int)
+        assert isinstance(files, list)
+        assert isinstance(dirs, list)
+        assert isinstance(symlinked_dirs, list)
+        children = {name: PathType.FILE for name in files}
+        children.update({name: PathType.DIR for name in dirs})
+        return TreeIndexEntry(
+            mtime_ns=mtime_ns,
+            children=children,
+            symlinked_dirs=frozenset(symlinked_dirs),
+        )
+
+    def to_json(self) -> object:
+        return [
+            self.mtime_ns,
+            sorted(name for name, t in self.children.items() if t == PathType.FILE),
+            sorted(name for name, t in self.children.items() if t == PathType.DIR),
+            sorted(self.symlinked_dirs),
+        ]
+
+class TreeIndex:
+    _path: Path
+    _entries: Dict[PurePath, TreeIndexEntry]
+    _visited: Dict[PurePath, TreeIndexEntry]
+    _is_dirty: bool
+
+    def __init__(self, path: Path, entries: Dict[PurePath, TreeIndexEntry]) -> None:
+        self._path = path
+        self._entries = entries
+        self._visited = {}
+        self._is_dirty = False
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @staticmethod
+    def load(path: Path) -> 'TreeIndex':
+        try:
+            with path.open('r') as f:
+                j = json.load(f)
+            assert isinstance(j, dict)
+            if j.get('version') != TREE_INDEX_VERSION:
+                _l.debug(f'Ignoring tree index {path} with unknown version {j.get("version")}')
+                return TreeIndex(path, {})
+            dirs = j['dirs']
+            assert isinstance(dirs, dict)
+            return TreeIndex(path, {
+                PurePath(d): TreeIndexEntry.from_json(entry) for d, entry in dirs.items()
+            })
+        except FileNotFoundError:
+            return TreeIndex(path, {})
+        except (OSError, ValueError, AssertionError) as e:
+            _l.debug(f'Ignoring unreadable tree index {path}: {e}')
+            return TreeIndex(path, {})
+
+    def lookup(self, d: PurePath, mtime_ns: int) -> Optional[TreeIndexEntry]:
+        entry = self._entries.get(d)
+        if entry is None or entry.mtime_ns != mtime_ns:
+            return None
+        self._visited[d] = entry
+        return entry
+
+    def record(self, d: PurePath, entry: TreeIndexEntry) -> None:
+        self._is_dirty = True
+        if time.time_ns() - entry.mtime_ns < RACY_WINDOW_NS:
+            self._entries.pop(d, None)
+            self._visited.pop(d, None)
+        else:
+            self._entries[d] = entry
+            self._visited[d] = entry
+
+    def mark_complete(self) -> None:
+        if len(self._visited) != len(self._entries):
+            self._entries = dict(self._visited)
+            self._is_dirty = True
+
+    def save(self) -> None:
+        if not self._is_dirty:
+            return
+        j = {
+            'version': TREE_INDEX_VERSION,
+            'dirs': {str(d): entry.to_json() for d, entry in self._entries.items()},
+        }
+        tmp_path: Optional[str] = None
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self._path.parent, delete=False) as f:
+                tmp_path = f.name
+                json.dump(j, f, separators=(',', ':'))
+            os.replace(tmp_path, self._path)
+            self._is_dirty = False
+        except OSError as e:
+            _l.debug(f'Failed to write tree index {self._path}: {e}')
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
@@ -5,6 +5,8 @@ from .paths import (
     ComponentType,
     RoleInGroup,
     RepoRelPath,
+    GENERATED_HEADER_INFIXES,
+    GENERATED_SOURCE_INFIXES,
 )
 from .config_file import ExtensionConfig
 from pathlib import PurePath
@@ -36,10 +38,12 @@ def get_component_rel_path(file: File, extension_config: ExtensionConfig) -> Com
         rel = PurePath('benchmark/src') / component_name / group_dir / (group_name + source_extension)
     elif file.role == RoleInGroup.DTGEN_TOML:
         rel = PurePath('include') / component_name / group_dir / (group_name + '.dtg.toml')
-    elif file.role == RoleInGroup.GENERATED_HEADER:
-        rel = PurePath('include') / component_name / group_dir / (group_name + '.dtg' + header_extension)
-    elif file.role == RoleInGroup.GENERATED_SOURCE:
-        rel = PurePath('src') / component_name / group_dir / (group_name + '.dtg' + source_extension)
+    elif file.role in GENERATED_HEADER_INFIXES:
+        infix = GENERATED_HEADER_INFIXES[file.role]
+        rel = PurePath('include') / component_name / group_dir / (group_name + '.dtg' + infix + header_extension)
+    elif file.role in GENERATED_SOURCE_INFIXES:
+        infix = GENERATED_SOURCE_INFIXES[file.role]
+        rel = PurePath('src') / component_name / group_dir / (group_name + '.dtg' + infix + source_extension)
     else:
         raise ValueError()
 
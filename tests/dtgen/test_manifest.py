@@ -0,0 +1,155 @@
+from proj.dtgen.project import (
+    run_dtgen,
+    DTGEN_VERSION,
+)
+from proj.dtgen.manifest import DtgenManifest
+from proj.trees import EmulatedFileTreeWithMtime
+from proj.paths import Repo
+from proj.config_file import (
+    DtgenStaleness,
+    ExtensionConfig,
+)
+from pathlib import PurePath, Path
+from .test_project import toml_contents
+import pytest
+
+SPEC_PATH = PurePath('lib/example/include/example/integer.dtg.toml')
+HEADER_PATH = PurePath('lib/example/include/example/integer.dtg.h')
+FWD_HEADER_PATH = PurePath('lib/example/include/example/integer.dtg.fwd.h')
+SOURCE_PATH = PurePath('lib/example/src/example/integer.dtg.cc')
+
+def _run(file_tree: EmulatedFileTreeWithMtime, manifest: DtgenManifest) -> None:
+    run_dtgen(
+        Repo(PurePath('repo')),
+        repo_file_tree=file_tree,
+        force=False,
+        extension_config=ExtensionConfig(header_extension='.h', src_extension='.cc'),
+        ifndef_base='TEST',
+        write_if_changed=False,
+        staleness=DtgenStaleness.CONTENT_HASH,
+        manifest=manifest,
+    )
+
+def test_dtgen_manifest_skips_unchanged_specs(tmp_path: Path) -> None:
+    manifest_path = tmp_path / 'dtgen-manifest'
+    generated = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(SPEC_PATH, 1, toml_contents)],
+        dirs=[],
+    )
+    _run(generated, DtgenManifest.load(manifest_path))
+
+    entry = DtgenManifest.load(manifest_path).lookup(SPEC_PATH)
+    assert entry is not None
+    assert entry.spec_mtime == 1
+    assert entry.generator_version == DTGEN_VERSION
+    assert set(entry.outputs) == {HEADER_PATH, FWD_HEADER_PATH, SOURCE_PATH}
+
+    def make_tree(spec_mtime: float) -> EmulatedFileTreeWithMtime:
+        # the spec contents differ, but only the mtime and size are consulted
+        # while the manifest entry matches
+        return EmulatedFileTreeWithMtime.from_lists(
+            curr_time=20,
+            files=[
+                (SPEC_PATH, spec_mtime, toml_contents.replace('"ord",', '"fmt",')),
+                (HEADER_PATH, 10, generated.get_file_contents(HEADER_PATH)),
+                (FWD_HEADER_PATH, 10, generated.get_file_contents(FWD_HEADER_PATH)),
+                (SOURCE_PATH, 10, generated.get_file_contents(SOURCE_PATH)),
+            ],
+            dirs=[],
+        )
+
+    unchanged = make_tree(spec_mtime=1)
+    _run(unchanged, DtgenManifest.load(manifest_path))
+    assert unchanged.get_mtime(HEADER_PATH) == 10
+
+    touched = make_tree(spec_mtime=15)
+    _run(touched, DtgenManifest.load(manifest_path))
+    assert touched.get_mtime(HEADER_PATH) == 20
+    assert touched.get_file_contents(HEADER_PATH) != generated.get_file_contents(HEADER_PATH)
+
+    entry = DtgenManifest.load(manifest_path).lookup(SPEC_PATH)
+    assert entry is not None
+    assert entry.spec_mtime == 15
+
+def test_dtgen_manifest_ignores_unreadable_file(tmp_path: Path) -> None:
+    manifest_path = tmp_path / 'dtgen-manifest'
+    manifest_path.write_text('not json')
+    assert DtgenManifest.load(manifest_path).lookup(SPEC_PATH) is None
+
+def test_dtgen_manifest_no_op_run_reads_no_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manifest_path = tmp_path / 'dtgen-manifest'
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(SPEC_PATH, 1, toml_contents)],
+        dirs=[],
+    )
+    _run(file_tree, DtgenManifest.load(manifest_path))
+
+    def fail_read(p: PurePath) -> str:
+        assert False, p
+
+    monkeypatch.setattr(file_tree, 'get_file_contents', fail_read)
+    _run(file_tree, DtgenManifest.load(manifest_path))
+
+def test_dtgen_manifest_records_sizes_and_output_dirs(tmp_path: Path) -> None:
+    manifest_path = tmp_path / 'dtgen-manifest'
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(SPEC_PATH, 1, toml_contents)],
+        dirs=[],
+    )
+    _run(file_tree, DtgenManifest.load(manifest_path))
+
+    entry = DtgenManifest.load(manifest_path).lookup(SPEC_PATH)
+    assert entry is not None
+    assert entry.spec_size == len(toml_contents.encode('utf-8'))
+    assert entry.outputs[HEADER_PATH].size == len(file_tree.get_file_contents(HEADER_PATH).encode('utf-8'))
+    assert entry.output_dirs == {HEADER_PATH.parent: 10, SOURCE_PATH.parent: 10}
+
+def test_dtgen_manifest_skips_outputs_in_unchanged_dirs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manifest_path = tmp_path / 'dtgen-manifest'
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(SPEC_PATH, 1, toml_contents)],
+        dirs=[],
+    )
+    _run(file_tree, DtgenManifest.load(manifest_path))
+
+    outputs = {HEADER_PATH, FWD_HEADER_PATH, SOURCE_PATH}
+    get_mtime = file_tree.get_mtime
+    get_size = file_tree.get_size
+
+    def get_mtime_of_non_output(p: PurePath) -> float:
+        assert p not in outputs, p
+        return get_mtime(p)
+
+    def get_size_of_non_output(p: PurePath) -> int:
+        assert p not in outputs, p
+        return get_size(p)
+
+    monkeypatch.setattr(file_tree, 'get_mtime', get_mtime_of_non_output)
+    monkeypatch.setattr(file_tree, 'get_size', get_size_of_non_output)
+    _run(file_tree, DtgenManifest.load(manifest_path))
+
+def test_dtgen_manifest_checks_outputs_in_changed_dirs(tmp_path: Path) -> None:
+    manifest_path = tmp_path / 'dtgen-manifest'
+    generated = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(SPEC_PATH, 1, toml_contents)],
+        dirs=[],
+    )
+    _run(generated, DtgenManifest.load(manifest_path))
+
+    # the header was deleted since, which left its directory with a newer mtime
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=20,
+        files=[
+            (SPEC_PATH, 1, toml_contents),
+            (FWD_HEADER_PATH, 10, generated.get_file_contents(FWD_HEADER_PATH)),
+            (SOURCE_PATH, 10, generated.get_file_contents(SOURCE_PATH)),
+        ],
+        dirs=[],
+    )
+    _run(file_tree, DtgenManifest.load(manifest_path))
+    assert file_tree.get_file_contents(HEADER_PATH) == generated.get_file_contents(HEADER_PATH)
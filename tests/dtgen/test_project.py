@@ -1,6 +1,8 @@
 from proj.dtgen.project import (
+    DTGEN_VERSION,
     run_dtgen, 
     generate_source_contents,
+    generate_fwd_header_contents,
 )
 from proj.trees import EmulatedFileTreeWithMtime, EmulatedPathTree
 from proj.paths import (
@@ -8,13 +10,19 @@ from proj.paths import (
     Component,
     FileGroup,
 )
-from pathlib import PurePath
-from proj.config_file import ExtensionConfig
+from pathlib import Path, PurePath
+from proj.config_file import (
+    DtgenStaleness,
+    ExtensionConfig,
+)
 from proj.dtgen.enum.spec import (
     Feature,
     EnumSpec,
     ValueSpec,
 )
+from proj.dtgen.project import parse_spec_contents
+from proj.dtgen.manifest import DtgenManifest
+import pytest
 import re
 
 toml_contents = '''
@@ -74,6 +82,7 @@ def test_run_dtgen_for_lib() -> None:
         files=[
             'lib/example/include/example/integer.dtg.toml',
             'lib/example/include/example/integer.dtg.h',
+            'lib/example/include/example/integer.dtg.fwd.h',
             'lib/example/src/example/integer.dtg.cc',
         ],
         dirs=[],
@@ -117,6 +126,7 @@ def test_run_dtgen_for_bin() -> None:
         files=[
             'bin/example/include/example/integer.dtg.toml',
             'bin/example/include/example/integer.dtg.h',
+            'bin/example/include/example/integer.dtg.fwd.h',
             'bin/example/src/example/integer.dtg.cc',
         ],
         dirs=[],
@@ -126,20 +136,178 @@ def test_run_dtgen_for_bin() -> None:
 
 
 
+def test_run_dtgen_in_parallel_reports_failed_specs() -> None:
+    repo = Repo(PurePath('repo'))
+
+    def make_file_tree() -> EmulatedFileTreeWithMtime:
+        return EmulatedFileTreeWithMtime.from_lists(
+            curr_time=10,
+            files=[
+                *[
+                    (f'lib/example/include/example/integer{i}.dtg.toml', 1, toml_contents)
+                    for i in range(4)
+                ],
+                ('lib/example/include/example/broken.dtg.toml', 1, 'type = "struct"\n'),
+            ],
+            dirs=[]
+        )
+
+    extension_config = ExtensionConfig(
+        header_extension='.h',
+        src_extension='.cc',
+    )
+
+    serial = make_file_tree()
+    parallel = make_file_tree()
+    for file_tree, jobs in [(serial, 1), (parallel, 2)]:
+        with pytest.raises(RuntimeError, match='broken.dtg.toml'):
+            run_dtgen(
+                repo, 
+                repo_file_tree=file_tree, 
+                force=False,
+                extension_config=extension_config,
+                ifndef_base='TEST',
+                jobs=jobs,
+            )
+
+    assert parallel == serial
+    assert parallel.has_file(PurePath('lib/example/src/example/integer3.dtg.cc'))
+    assert not parallel.has_file(PurePath('lib/example/src/example/broken.dtg.cc'))
+
+
+def test_run_dtgen_content_hash_staleness() -> None:
+    repo = Repo(PurePath('repo'))
+    spec_path = 'lib/example/include/example/integer.dtg.toml'
+    header_path = PurePath('lib/example/include/example/integer.dtg.h')
+    source_path = PurePath('lib/example/src/example/integer.dtg.cc')
+
+    extension_config = ExtensionConfig(
+        header_extension='.h',
+        src_extension='.cc',
+    )
+
+    def run(file_tree: EmulatedFileTreeWithMtime, staleness: DtgenStaleness) -> None:
+        run_dtgen(
+            repo, 
+            repo_file_tree=file_tree, 
+            force=False,
+            extension_config=extension_config,
+            ifndef_base='TEST',
+            write_if_changed=False,
+            staleness=staleness,
+        )
+
+    generated = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(spec_path, 1, toml_contents)],
+        dirs=[],
+    )
+    run(generated, DtgenStaleness.CONTENT_HASH)
+
+    def make_touched_tree(spec_contents: str) -> EmulatedFileTreeWithMtime:
+        return EmulatedFileTreeWithMtime.from_lists(
+            curr_time=20,
+            files=[
+                (spec_path, 15, spec_contents),
+                (header_path, 1, generated.get_file_contents(header_path)),
+                (source_path, 1, generated.get_file_contents(source_path)),
+            ],
+            dirs=[],
+        )
+
+    by_mtime = make_touched_tree(toml_contents)
+    run(by_mtime, DtgenStaleness.MTIME)
+    assert by_mtime.get_mtime(header_path) == 1
+
+    by_mtime = make_touched_tree(toml_contents.replace('"ord",', ''))
+    run(by_mtime, DtgenStaleness.MTIME)
+    assert by_mtime.get_mtime(header_path) == 20
+
+    by_hash = make_touched_tree(toml_contents)
+    run(by_hash, DtgenStaleness.CONTENT_HASH)
+    assert by_hash.get_mtime(header_path) == 1
+    assert by_hash.get_mtime(source_path) == 1
+
+    by_hash = make_touched_tree(toml_contents.replace('"ord",', ''))
+    run(by_hash, DtgenStaleness.CONTENT_HASH)
+    assert by_hash.get_mtime(header_path) == 20
+    assert by_hash.get_mtime(source_path) == 20
+
+
+def test_run_dtgen_mtime_staleness_records_touched_spec(tmp_path: Path) -> None:
+    repo = Repo(PurePath('repo'))
+    spec_path = PurePath('lib/example/include/example/integer.dtg.toml')
+    header_path = PurePath('lib/example/include/example/integer.dtg.h')
+    manifest_path = tmp_path / 'dtgen-manifest'
+
+    extension_config = ExtensionConfig(
+        header_extension='.h',
+        src_extension='.cc',
+    )
+
+    def run(file_tree: EmulatedFileTreeWithMtime) -> None:
+        run_dtgen(
+            repo,
+            repo_file_tree=file_tree,
+            force=False,
+            extension_config=extension_config,
+            ifndef_base='TEST',
+            staleness=DtgenStaleness.MTIME,
+            manifest=DtgenManifest.load(manifest_path),
+        )
+
+    generated = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(spec_path, 1, toml_contents)],
+        dirs=[],
+    )
+    run(generated)
+
+    touched = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=20,
+        files=[
+            (spec_path, 15, toml_contents),
+            *[(p, 1, generated.get_file_contents(p)) for p in generated.files() if p != spec_path],
+        ],
+        dirs=[],
+    )
+    run(touched)
+    assert touched.get_mtime(header_path) == 1
+    assert touched.without_mtime() == generated.without_mtime()
+
+    entry = DtgenManifest.load(manifest_path).lookup(spec_path)
+    assert entry is not None
+    assert entry.spec_mtime == 15
+    assert entry.is_up_to_date(touched, spec_path, DTGEN_VERSION)
+
+
 ENUM_EXPECTED_GENERATED_SOURCE = '''// THIS FILE WAS AUTO-GENERATED BY proj. DO NOT MODIFY IT!
 // If you would like to modify this datatype, instead modify
 // lib/person/include/person/color.dtg.toml
 /* proj-data
 {
-  "generated_from": "4141"
+  "generated_from": "4141",
+  "generator_version": 4
 }
 */
 
 #include "person/color.dtg.hh"
 
+#include <algorithm>
+#include <array>
+#include <utility>
 #include <stdexcept>
 #include <sstream>
 
+namespace FlexFlow{static constexpr std::array<std::pair<std::string_view, Color>, 3> Color_string_table = {{{"BLUE", Color::BLUE}, {"RED", Color::RED}, {"YELLOW", Color::YELLOW}}};
+bool try_from_string(std::string_view s, Color &x){auto it = std::lower_bound(Color_string_table.begin(), Color_string_table.end(), s, [](std::pair<std::string_view, Color> const &entry, std::string_view key) { return entry.first < key; });
+if (it == Color_string_table.end() || it->first != s){return false;
+}x = it->second;
+return true;
+}void from_string(std::string_view s, Color &x){if (!try_from_string(s, x)){std::ostringstream oss;
+oss << "Unknown Color value " << s;
+throw std::runtime_error(oss.str());
+}}}// namespace {name}
 namespace std{size_t hash<FlexFlow::Color>::operator()(FlexFlow::Color x) const{return std::hash<int>{}(static_cast<int>(x));
 }}// namespace {name}
 namespace FlexFlow{std::string format_as(Color x){switch (x){case Color::RED:
@@ -166,14 +334,8 @@ default:
 std::ostringstream oss;
 oss << "Unknown Color value " << static_cast<int>(x);
 throw std::runtime_error(oss.str());
-}}void from_json(::nlohmann::json const &j, Color &x){std::string as_str = j.get<std::string>();
-if (as_str == "RED"){x = Color::RED;
-}else if (as_str == "BLUE"){x = Color::BLUE;
-}else if (as_str == "YELLOW"){x = Color::YELLOW;
-}else {std::ostringstream oss;
-oss << "Unknown Color value " << as_str;
-throw std::runtime_error(oss.str());
-}}}// namespace {name}
+}}void from_json(::nlohmann::json const &j, Color &x){from_string(j.get_ref<std::string const &>(), x);
+}}// namespace {name}
 namespace rc{Gen<FlexFlow::Color> Arbitrary<FlexFlow::Color>::arbitrary(){return gen::element<FlexFlow::Color>(FlexFlow::Color::RED, FlexFlow::Color::BLUE, FlexFlow::Color::YELLOW);}}// namespace {name}
 '''
 
@@ -236,3 +398,270 @@ def test_generate_source_contents() -> None:
         return re.sub(r'\s', '', s)
 
     assert normalize_whitespace(result) == normalize_whitespace(correct)
+
+def test_generate_fwd_header_contents() -> None:
+    spec = parse_spec_contents(PurePath('pair.dtg.toml'), '''
+namespace = "FlexFlow"
+name = "Pair"
+type = "struct"
+features = []
+template_params = ["L", "R"]
+
+[[fields]]
+name = "left"
+type = "L"
+
+[[fields]]
+name = "right"
+type = "R"
+''')
+
+    result = generate_fwd_header_contents(
+        spec=spec,
+        file_group=FileGroup(PurePath('pair'), Component.library('person')),
+        spec_hash=b'AA',
+        extension_config=ExtensionConfig(header_extension='.hh', src_extension='.cc'),
+        ifndef_base='TEST',
+    )
+
+    assert result.endswith('''
+#ifndef _TEST_LIB_PERSON_INCLUDE_PERSON_PAIR_DTG_FWD_HH
+#define _TEST_LIB_PERSON_INCLUDE_PERSON_PAIR_DTG_FWD_HH
+
+namespace FlexFlow{template <typename L, typename R>
+struct Pair;
+}// namespace {name}
+
+#endif // _TEST_LIB_PERSON_INCLUDE_PERSON_PAIR_DTG_FWD_HH
+''')
+
+split_toml_contents = '''
+namespace = "FlexFlow"
+name = "Integer"
+type = "struct"
+features = [
+  "eq",
+  "json",
+  "rapidcheck",
+]
+split_features = [
+  "json",
+]
+
+[[fields]]
+name = "value"
+type = "int"
+'''
+
+def test_run_dtgen_splits_features_into_companions() -> None:
+    repo = Repo(PurePath('repo'))
+
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[
+            (
+                'lib/example/include/example/integer.dtg.toml',
+                1,
+                split_toml_contents,
+            ),
+        ],
+        dirs=[]
+    )
+
+    extension_config = ExtensionConfig(
+        header_extension='.h',
+        src_extension='.cc',
+    )
+
+    run_dtgen(
+        repo,
+        repo_file_tree=file_tree,
+        force=False,
+        extension_config=extension_config,
+        ifndef_base='TEST',
+    )
+
+    correct = EmulatedPathTree.from_lists(
+        files=[
+            'lib/example/include/example/integer.dtg.toml',
+            'lib/example/include/example/integer.dtg.h',
+            'lib/example/include/example/integer.dtg.fwd.h',
+            'lib/example/include/example/integer.dtg.json.h',
+            'lib/example/src/example/integer.dtg.cc',
+            'lib/example/src/example/integer.dtg.json.cc',
+        ],
+        dirs=[],
+    )
+    assert file_tree.path_tree() == correct
+
+    header = file_tree.get_file_contents(PurePath('lib/example/include/example/integer.dtg.h'))
+    assert 'nlohmann' not in header
+    assert 'rapidcheck.h' in header
+
+    json_header = file_tree.get_file_contents(PurePath('lib/example/include/example/integer.dtg.json.h'))
+    assert '#include "example/integer.dtg.h"' in json_header
+    assert '#include <nlohmann/json.hpp>' in json_header
+    assert 'adl_serializer' in json_header
+
+    json_source = file_tree.get_file_contents(PurePath('lib/example/src/example/integer.dtg.json.cc'))
+    assert '#include "example/integer.dtg.json.h"' in json_source
+    assert '::from_json(json const &j)' in json_source
+
+    # features that are no longer split drop their companions
+    file_tree.set_file_contents(
+        PurePath('lib/example/include/example/integer.dtg.toml'),
+        split_toml_contents.replace('"json",\n]', ']'),
+        exist_ok=True,
+    )
+    run_dtgen(
+        repo,
+        repo_file_tree=file_tree,
+        force=True,
+        extension_config=extension_config,
+        ifndef_base='TEST',
+    )
+    assert not file_tree.has_file(PurePath('lib/example/include/example/integer.dtg.json.h'))
+    assert not file_tree.has_file(PurePath('lib/example/src/example/integer.dtg.json.cc'))
+    assert 'nlohmann' in file_tree.get_file_contents(PurePath('lib/example/include/example/integer.dtg.h'))
+
+def test_split_features_must_be_enabled() -> None:
+    with pytest.raises(ValueError):
+        parse_spec_contents(PurePath('integer.dtg.toml'), split_toml_contents.replace('"json",\n  "rapidcheck",', ''))
+
+def test_generate_source_contents_moves_constructor_args() -> None:
+    spec = parse_spec_contents(PurePath('graph.dtg.toml'), '''
+namespace = "FlexFlow"
+name = "Graph"
+type = "struct"
+features = []
+
+[[fields]]
+name = "nodes"
+type = "std::vector<int>"
+
+[[fields]]
+name = "edges"
+type = "std::map<int, int>"
+indirect = true
+''')
+
+    result = generate_source_contents(
+        spec=spec,
+        file_group=FileGroup(PurePath('graph'), Component.library('person')),
+        spec_hash=b'AA',
+        extension_config=ExtensionConfig(header_extension='.hh', src_extension='.cc'),
+    )
+
+    assert 'Graph::Graph(std::vector<int> nodes, std::map<int, int> edges)' in result
+    assert 'nodes(std::move(nodes))' in result
+    assert 'edges_ptr(std::make_shared<std::map<int, int>>(std::move(edges)))' in result
+    assert 'std::map<int, int> const & Graph::get_edges() const & noexcept' in result
+    assert 'std::map<int, int> Graph::get_edges() &&' in result
+    assert 'return std::move(*this->edges_ptr);' in result
+
+cached_hash_toml_contents = '''
+namespace = "FlexFlow"
+name = "Key"
+type = "struct"
+features = [
+  "eq",
+  "hash",
+  "cached_hash",
+]
+
+[[fields]]
+name = "parts"
+type = "std::vector<int>"
+indirect = true
+'''
+
+def test_generate_source_contents_with_cached_hash() -> None:
+    spec = parse_spec_contents(PurePath('key.dtg.toml'), cached_hash_toml_contents)
+
+    result = generate_source_contents(
+        spec=spec,
+        file_group=FileGroup(PurePath('key'), Component.library('person')),
+        spec_hash=b'AA',
+        extension_config=ExtensionConfig(header_extension='.hh', src_extension='.cc'),
+    )
+
+    def normalize_whitespace(s: str) -> str:
+        return re.sub(r'\s', '', s)
+
+    normalized = normalize_whitespace(result)
+    assert normalize_whitespace('size_t Key::get_hash() const') in normalized
+    assert normalize_whitespace('std::hash<std::vector<int>>{}(this->get_parts())') in normalized
+    assert normalize_whitespace('return x.get_hash();') in normalized
+    assert 'this_hash' not in normalized
+
+def test_cached_hash_requires_hash() -> None:
+    with pytest.raises(ValueError):
+        parse_spec_contents(PurePath('key.dtg.toml'), cached_hash_toml_contents.replace('"hash",\n', ''))
+
+def test_generate_source_contents_sorts_enum_string_table_by_json_key() -> None:
+    spec = parse_spec_contents(PurePath('op_type.dtg.toml'), '''
+namespace = "FlexFlow"
+name = "OpType"
+type = "enum"
+features = []
+
+[[values]]
+name = "ADD"
+json_key = "add"
+
+[[values]]
+name = "RELU"
+json_key = "Relu"
+
+[[values]]
+name = "CONV2D"
+json_key = "conv2d"
+''')
+
+    result = generate_source_contents(
+        spec=spec,
+        file_group=FileGroup(PurePath('op_type'), Component.library('person')),
+        spec_hash=b'AA',
+        extension_config=ExtensionConfig(header_extension='.hh', src_extension='.cc'),
+    )
+
+    assert '{{{"Relu", OpType::RELU}, {"add", OpType::ADD}, {"conv2d", OpType::CONV2D}}}' in result
+
+@pytest.mark.parametrize('staleness', [DtgenStaleness.MTIME, DtgenStaleness.CONTENT_HASH])
+def test_run_dtgen_regenerates_missing_companion(staleness: DtgenStaleness) -> None:
+    repo = Repo(PurePath('repo'))
+
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[
+            (
+                'lib/example/include/example/integer.dtg.toml',
+                1,
+                split_toml_contents,
+            ),
+        ],
+        dirs=[]
+    )
+
+    extension_config = ExtensionConfig(
+        header_extension='.h',
+        src_extension='.cc',
+    )
+
+    def run() -> None:
+        run_dtgen(
+            repo,
+            repo_file_tree=file_tree,
+            force=False,
+            extension_config=extension_config,
+            ifndef_base='TEST',
+            staleness=staleness,
+        )
+
+    run()
+    companion_path = PurePath('lib/example/include/example/integer.dtg.json.h')
+    companion_contents = file_tree.get_file_contents(companion_path)
+    file_tree.rm_file(companion_path)
+
+    run()
+    assert file_tree.get_file_contents(companion_path) == companion_contents
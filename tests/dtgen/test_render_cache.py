@@ -0,0 +1,78 @@
+from proj.dtgen.project import run_dtgen
+from proj.dtgen.render_cache import DtgenRenderCache
+from proj.trees import EmulatedFileTreeWithMtime
+from proj.paths import Repo
+from proj.config_file import ExtensionConfig
+from pathlib import PurePath, Path
+from typing import List
+from .test_project import toml_contents
+import os
+import pytest
+import proj.dtgen.project
+
+SPEC_PATH = PurePath('lib/example/include/example/integer.dtg.toml')
+HEADER_PATH = PurePath('lib/example/include/example/integer.dtg.h')
+
+def _run(file_tree: EmulatedFileTreeWithMtime, render_cache: DtgenRenderCache) -> None:
+    run_dtgen(
+        Repo(PurePath('repo')),
+        repo_file_tree=file_tree,
+        force=True,
+        extension_config=ExtensionConfig(header_extension='.h', src_extension='.cc'),
+        ifndef_base='TEST',
+        write_if_changed=False,
+        render_cache=render_cache,
+    )
+
+def _make_tree() -> EmulatedFileTreeWithMtime:
+    return EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(SPEC_PATH, 1, toml_contents)],
+        dirs=[],
+    )
+
+def test_forced_dtgen_uses_render_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    render_cache = DtgenRenderCache(tmp_path)
+    first = _make_tree()
+    _run(first, render_cache)
+    assert render_cache.hits == 0
+
+    def fail_render(task: object) -> object:
+        raise AssertionError('should have been served from the render cache')
+
+    monkeypatch.setattr(proj.dtgen.project, 'render_dtgen_task', fail_render)
+    second = _make_tree()
+    _run(second, render_cache)
+    # header, fwd header, source, and the (empty) set of companions
+    assert render_cache.hits == 4
+    assert second.get_file_contents(HEADER_PATH) == first.get_file_contents(HEADER_PATH)
+
+def test_render_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    render_cache = DtgenRenderCache(tmp_path, max_bytes=10)
+    render_cache.put('aa01', 'xxxx')
+    render_cache.put('aa02', 'yyyy')
+    render_cache.put('aa03', 'zzzz')
+    for i, key in enumerate(['aa02', 'aa01', 'aa03']):
+        os.utime(tmp_path / key[:2] / key[2:], (i, i))
+    assert render_cache.get('aa02') == 'yyyy'
+
+    assert render_cache.trim() == 1
+    assert render_cache.get('aa01') is None
+    assert render_cache.get('aa02') == 'yyyy'
+    assert render_cache.get('aa03') == 'zzzz'
+
+def test_render_cache_only_trims_after_storing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    render_cache = DtgenRenderCache(tmp_path)
+    trims: List[int] = []
+    original_trim = render_cache.trim
+
+    def counting_trim() -> int:
+        trims.append(1)
+        return original_trim()
+
+    monkeypatch.setattr(render_cache, 'trim', counting_trim)
+    _run(_make_tree(), render_cache)
+    assert len(trims) == 1
+
+    _run(_make_tree(), render_cache)
+    assert len(trims) == 1
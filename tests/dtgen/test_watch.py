@@ -0,0 +1,73 @@
+from proj.dtgen.watch import (
+    apply_dtgen_changes,
+    is_watch_pruned,
+    InotifySpecWatcher,
+    PollingSpecWatcher,
+    SpecWatcher,
+)
+from proj.trees import EmulatedFileTreeWithMtime
+from proj.paths import Repo
+from proj.config_file import ExtensionConfig
+from pathlib import PurePath, Path
+from .test_project import toml_contents
+import pytest
+import sys
+
+SPEC_PATH = PurePath('lib/example/include/example/integer.dtg.toml')
+HEADER_PATH = PurePath('lib/example/include/example/integer.dtg.h')
+SOURCE_PATH = PurePath('lib/example/src/example/integer.dtg.cc')
+
+def _apply(file_tree: EmulatedFileTreeWithMtime, changed: set[PurePath]) -> None:
+    apply_dtgen_changes(
+        Repo(PurePath('repo')),
+        repo_file_tree=file_tree,
+        changed=changed,
+        extension_config=ExtensionConfig(header_extension='.h', src_extension='.cc'),
+        ifndef_base='TEST',
+    )
+
+def test_apply_dtgen_changes() -> None:
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=10,
+        files=[(SPEC_PATH, 1, toml_contents)],
+        dirs=[],
+    )
+
+    _apply(file_tree, {SPEC_PATH})
+    assert file_tree.has_file(HEADER_PATH)
+    assert file_tree.has_file(SOURCE_PATH)
+
+    file_tree.rm_file(SOURCE_PATH)
+    _apply(file_tree, {SOURCE_PATH})
+    assert file_tree.has_file(SOURCE_PATH)
+
+    file_tree.rm_file(SPEC_PATH)
+    _apply(file_tree, {SPEC_PATH})
+    assert not file_tree.has_file(HEADER_PATH)
+    assert not file_tree.has_file(SOURCE_PATH)
+
+def _check_watcher_sees_spec_changes(root: Path, watcher: SpecWatcher) -> None:
+    try:
+        (root / 'lib/example/include/example/new.dtg.toml').write_text('type = "struct"')
+        changes = watcher.wait_for_changes()
+        assert changes == {PurePath('lib/example/include/example/new.dtg.toml')}
+
+        (root / 'lib/example/include/example/other.h').write_text('')
+        (root / 'lib/example/include/example/new.dtg.toml').unlink()
+        changes = watcher.wait_for_changes()
+        assert changes == {PurePath('lib/example/include/example/new.dtg.toml')}
+    finally:
+        watcher.close()
+
+def test_polling_spec_watcher(tmp_path: Path) -> None:
+    (tmp_path / 'lib/example/include/example').mkdir(parents=True)
+    watcher = PollingSpecWatcher(tmp_path, is_watch_pruned, interval=0.01)
+    _check_watcher_sees_spec_changes(tmp_path, watcher)
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify is linux-only')
+def test_inotify_spec_watcher(tmp_path: Path) -> None:
+    (tmp_path / 'lib').mkdir()
+    watcher = InotifySpecWatcher(tmp_path, is_watch_pruned)
+    # directories created after the watch started are picked up too
+    (tmp_path / 'lib/example/include/example').mkdir(parents=True)
+    _check_watcher_sees_spec_changes(tmp_path, watcher)
@@ -1,6 +1,7 @@
 #include <doctest/doctest.h>
 #include <nlohmann/json.hpp>
 #include <type_traits>
+#include <utility>
 #include "person/person_indirect.dtg.hh"
 #include <fmt/format.h>
 #include "person/json/optional.h"
@@ -58,6 +59,18 @@ TEST_SUITE(TP_TEST_SUITE) {
       CHECK(!std::is_default_constructible_v<PersonIndirect>);
     }
 
+    SUBCASE("accessor on temporary") {
+      CHECK(std::is_same_v<decltype(std::declval<PersonIndirect>().get_spouse()), std::optional<PersonIndirect>>);
+      CHECK(std::is_same_v<decltype(std::declval<PersonIndirect &>().get_spouse()), std::optional<PersonIndirect> const &>);
+
+      PersonIndirect p = PersonIndirect{ first_name, last_name, age, spouse };
+      PersonIndirect shared = p;
+      CHECK(std::move(p).get_spouse() == spouse);
+      CHECK(shared.get_spouse() == spouse);
+
+      CHECK(PersonIndirect{ first_name, last_name, age, spouse }.get_spouse() == spouse);
+    }
+
     SUBCASE("manual json deserialization") {
       json j = {
         {"first_name", first_name},
@@ -51,7 +51,7 @@ def test_render_file_diff() -> None:
         ),
         MoveTrace(PurePath('a/c.txt'), PurePath('a/d/e.txt')),
         RmFileTrace(PurePath('a/a.txt')),
-        ModifyFileTrace(
+        ModifyFileTrace.from_contents(
             PurePath('a/f.txt'),
             '\n'.join([
                 'a',
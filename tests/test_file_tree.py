@@ -1,2 +1,130 @@
+from proj.trees import (
+    MoveTrace,
+    MkDirTrace,
+    RmFileTrace,
+    CreateFileTrace,
+    ModifyFileTrace,
+    EmulatedFileTree,
+    optimize_file_trace,
+    replay_trace_on_file_tree,
+)
+from pathlib import PurePath
+import difflib
+from typing import (
+    List,
+    Union,
+)
+import pytest
+
 def test_file_tree():
     ...
+
+def test_optimize_file_trace() -> None:
+    a = PurePath('lib/a.h')
+    b = PurePath('lib/b.h')
+    c = PurePath('lib/c/c.h')
+    trace: List[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]] = [
+        ModifyFileTrace.from_contents(path=a, old_contents='a0', new_contents='a1'),
+        MoveTrace(src=b, dst=b),
+        MkDirTrace(path=PurePath('lib/c')),
+        CreateFileTrace(path=c, contents='c0'),
+        ModifyFileTrace.from_contents(path=c, old_contents='c0', new_contents='c1'),
+        ModifyFileTrace.from_contents(path=a, old_contents='a1', new_contents='a2'),
+        ModifyFileTrace.from_contents(path=b, old_contents='b0', new_contents='b1'),
+        ModifyFileTrace.from_contents(path=b, old_contents='b1', new_contents='b0'),
+        RmFileTrace(path=a),
+    ]
+
+    assert optimize_file_trace(trace) == [
+        MkDirTrace(path=PurePath('lib/c')),
+        ModifyFileTrace.from_contents(path=a, old_contents='a0', new_contents='a2'),
+        CreateFileTrace(path=c, contents='c1'),
+        RmFileTrace(path=a),
+    ]
+
+    tree = EmulatedFileTree.from_lists(
+        files=[(a, 'a0'), (b, 'b0')],
+        dirs=[],
+    )
+    replay_trace_on_file_tree(optimize_file_trace(trace), tree)
+    assert tree == EmulatedFileTree.from_lists(
+        files=[(b, 'b0'), (c, 'c1')],
+        dirs=[],
+    )
+
+def test_optimize_file_trace_keeps_writes_separated_by_move() -> None:
+    a = PurePath('a.h')
+    b = PurePath('b.h')
+    trace: List[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]] = [
+        ModifyFileTrace.from_contents(path=a, old_contents='a0', new_contents='a1'),
+        MoveTrace(src=a, dst=b),
+        MoveTrace(src=b, dst=a),
+        ModifyFileTrace.from_contents(path=a, old_contents='a1', new_contents='a2'),
+    ]
+
+    assert optimize_file_trace(trace) == trace
+
+def test_optimize_file_trace_keeps_mkdir_after_move_of_ancestor() -> None:
+    trace: List[Union[MoveTrace, MkDirTrace, RmFileTrace, CreateFileTrace, ModifyFileTrace]] = [
+        MkDirTrace(path=PurePath('lib/a')),
+        MoveTrace(src=PurePath('old'), dst=PurePath('lib/b')),
+        MkDirTrace(path=PurePath('lib/b/c')),
+        CreateFileTrace(path=PurePath('lib/b/c/c.h'), contents='c'),
+    ]
+
+    assert optimize_file_trace(trace) == [
+        MkDirTrace(path=PurePath('lib/a')),
+        MoveTrace(src=PurePath('old'), dst=PurePath('lib/b')),
+        MkDirTrace(path=PurePath('lib/b/c')),
+        CreateFileTrace(path=PurePath('lib/b/c/c.h'), contents='c'),
+    ]
+
+def test_modify_file_trace_stores_only_changed_lines() -> None:
+    old_contents = ''.join(f'line {i}\n' for i in range(1000))
+    new_contents = old_contents.replace('line 500\n', 'changed\n')
+    trace = ModifyFileTrace.from_contents(PurePath('a.h'), old_contents, new_contents)
+
+    assert len(trace.delta.hunks) == 1
+    assert len(trace.delta.hunks[0].old_lines) == 7
+    assert trace.apply(old_contents) == new_contents
+    assert trace.diff == '\n'.join(list(difflib.unified_diff(
+        old_contents.splitlines(),
+        new_contents.splitlines(),
+        lineterm='\n',
+    ))[2:])
+    with pytest.raises(AssertionError):
+        trace.apply(new_contents)
+
+def test_modify_file_trace_composes_deltas() -> None:
+    v0 = ''.join(f'line {i}\n' for i in range(100))
+    v1 = v0.replace('line 10\n', 'x\ny\n').replace('line 80\n', '')
+    v2 = v1.replace('line 12\n', 'z\n').replace('line 50\n', 'w\n')
+    a = PurePath('a.h')
+
+    composed = ModifyFileTrace.from_contents(a, v0, v1).then(ModifyFileTrace.from_contents(a, v1, v2))
+
+    assert composed is not None
+    assert composed.apply(v0) == v2
+    assert composed.diff == ModifyFileTrace.from_contents(a, v0, v2).diff
+    assert ModifyFileTrace.from_contents(a, v0, v1).then(ModifyFileTrace.from_contents(a, v1, v0)) is None
+
+def test_modify_file_trace_ignores_missing_final_newline_in_diff() -> None:
+    trace = ModifyFileTrace.from_contents(PurePath('a.h'), 'x\ny', 'x\ny\nz')
+
+    assert trace.apply('x\ny') == 'x\ny\nz'
+    assert trace.diff == '\n'.join(list(difflib.unified_diff(
+        ['x', 'y'],
+        ['x', 'y', 'z'],
+        lineterm='\n',
+    ))[2:])
+    assert '-y' not in trace.diff.splitlines()
+
+@pytest.mark.parametrize('old_contents, new_contents', [
+    ('x\ny', 'x\ny\n'),
+    ('x\ny\n', 'x\ny'),
+    ('x\r\ny\r\n', 'x\ny\n'),
+])
+def test_modify_file_trace_applies_line_ending_changes(old_contents: str, new_contents: str) -> None:
+    trace = ModifyFileTrace.from_contents(PurePath('a.h'), old_contents, new_contents)
+
+    assert trace.apply(old_contents) == new_contents
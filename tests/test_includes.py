@@ -65,6 +65,14 @@ def test_get_generated_include_path() -> None:
         PurePath('c/a/b.dtg.hhh'),
         FileGroup(PurePath('a/b'), Component.unknown('c')).generated_header,
     ),
+    (
+        PurePath('c/a/b.dtg.fwd.hhh'),
+        FileGroup(PurePath('a/b'), Component.unknown('c')).generated_fwd_header,
+    ),
+    (
+        PurePath('c/a/b.dtg.json.hhh'),
+        FileGroup(PurePath('a/b'), Component.unknown('c')).generated_json_header,
+    ),
     (
         PurePath('c/a/b.h'),
         None,
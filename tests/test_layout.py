@@ -7,6 +7,8 @@ from proj.layout import (
     scan_repo_for_components,
     detect_missing_roles,
     detect_incomplete_groups,
+    scan_repo_for_dtgen_files,
+    OrphanedDtgenOutput,
 )
 from proj.paths import (
     Component,
@@ -14,6 +16,7 @@ from proj.paths import (
     RoleInGroup,
     ComponentRelPath,
     RepoRelPath,
+    File,
 )
 from proj.trees import (
     EmulatedPathTree,
@@ -199,3 +202,53 @@ def test_run_layout_check() -> None:
     }
 
     assert result == correct
+
+def test_run_layout_check_reports_orphaned_dtgen_outputs() -> None:
+    component = Component.library('example')
+    extension_config = ExtensionConfig('.h', '.cc')
+
+    component_path_tree = EmulatedPathTree.from_map({
+        PurePath(p): PathType.FILE
+        for p in [
+            'lib/example/CMakeLists.txt',
+            'lib/example/include/example/color.dtg.toml',
+            'lib/example/include/example/color.dtg.h',
+            'lib/example/src/example/color.dtg.cc',
+            'lib/example/include/example/removed.dtg.h',
+        ]
+    })
+
+    result = set(run_layout_check(component_path_tree, extension_config, ignore_paths=[]))
+
+    orphan = File(FileGroup(PurePath('removed'), component), RoleInGroup.GENERATED_HEADER)
+    assert result == {OrphanedDtgenOutput(orphan)}
+
+def test_scan_repo_for_dtgen_files() -> None:
+    component = Component.library('example')
+    extension_config = ExtensionConfig('.h', '.cc')
+
+    repo_path_tree = EmulatedPathTree.from_map({
+        PurePath(p): PathType.FILE
+        for p in [
+            'lib/example/include/example/color.dtg.toml',
+            'lib/example/include/example/color.dtg.h',
+            'lib/example/include/example/person.h',
+            'lib/example/src/example/removed.dtg.cc',
+            'deps/other/lib/x/src/x/removed.dtg.cc',
+        ]
+    })
+
+    result = scan_repo_for_dtgen_files(
+        repo_path_tree,
+        extension_config,
+        prune=lambda p: p == PurePath('deps'),
+    )
+
+    color = FileGroup(PurePath('color'), component)
+    removed = FileGroup(PurePath('removed'), component)
+    assert result.specs == (File(color, RoleInGroup.DTGEN_TOML),)
+    assert set(result.outputs) == {
+        File(color, RoleInGroup.GENERATED_HEADER),
+        File(removed, RoleInGroup.GENERATED_SOURCE),
+    }
+    assert result.orphans == (File(removed, RoleInGroup.GENERATED_SOURCE),)
@@ -56,6 +56,14 @@ def get_parse_repo_path_with_repo_arg(input_str: str, correct_str: str) -> None:
             RoleInGroup.GENERATED_HEADER,
         ),
     ),
+    (
+        RepoRelPath(PurePath('lib/example/include/example/thing.dtg.fwd.h')),
+        EXTENSION_CONFIG,
+        File(
+            FileGroup(PurePath('thing'), Component.library('example')),
+            RoleInGroup.GENERATED_FWD_HEADER,
+        ),
+    ),
     (
         RepoRelPath(PurePath('lib/example/src/example/thing.dtg.cc')),
         EXTENSION_CONFIG,
@@ -64,6 +72,22 @@ def get_parse_repo_path_with_repo_arg(input_str: str, correct_str: str) -> None:
             RoleInGroup.GENERATED_SOURCE,
         ),
     ),
+    (
+        RepoRelPath(PurePath('lib/example/include/example/thing.dtg.json.h')),
+        EXTENSION_CONFIG,
+        File(
+            FileGroup(PurePath('thing'), Component.library('example')),
+            RoleInGroup.GENERATED_JSON_HEADER,
+        ),
+    ),
+    (
+        RepoRelPath(PurePath('lib/example/src/example/thing.dtg.rapidcheck.cc')),
+        EXTENSION_CONFIG,
+        File(
+            FileGroup(PurePath('thing'), Component.library('example')),
+            RoleInGroup.GENERATED_RAPIDCHECK_SOURCE,
+        ),
+    ),
     (
         RepoRelPath(PurePath('lib/example/src/example/thing.cc')),
         EXTENSION_CONFIG,
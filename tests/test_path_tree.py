@@ -32,6 +32,49 @@ def test_emulated_path_tree_restrict_to_subdir():
 
     assert result == correct
 
+def test_emulated_path_tree_index_tracks_mutations():
+    path_tree = EmulatedPathTree.from_lists(
+        files=[
+            'include/example/a.dtg.toml',
+            'include/example/b.h',
+        ],
+    )
+
+    path_tree.mkdir(PurePath('src/example'), parents=True)
+    path_tree.rename(PurePath('include/example/a.dtg.toml'), PurePath('src/example/a.dtg.toml'))
+    path_tree.rm_file(PurePath('include/example/b.h'))
+
+    assert set(path_tree.ls_dir(PurePath('include/example'))) == set()
+    assert set(path_tree.ls_dir(PurePath('src'))) == {PurePath('src/example')}
+    assert set(path_tree.with_extension('.toml')) == {PurePath('src/example/a.dtg.toml')}
+    assert set(path_tree.with_extension('.h')) == set()
+
+    correct = EmulatedPathTree.from_lists(
+        files=['example/a.dtg.toml'],
+    )
+    assert path_tree.restrict_to_subdir(PurePath('src')) == correct
+
+def test_emulated_path_tree_subdir_view_shares_parent():
+    path_tree = EmulatedPathTree.from_lists(
+        files=[
+            'lib/a/include/a.h',
+            'lib/b/include/b.h',
+        ],
+    )
+
+    sub = path_tree.restrict_to_subdir(PurePath('lib/a'))
+    sub.mkdir(PurePath('src'))
+    sub.rename(PurePath('include/a.h'), PurePath('src/a.h'))
+
+    assert path_tree.has_file(PurePath('lib/a/src/a.h'))
+    assert not path_tree.has_path(PurePath('lib/a/include/a.h'))
+    assert set(sub.with_extension('.h')) == {PurePath('src/a.h')}
+    assert set(sub.ls_dir(PurePath('.'))) == {PurePath('include'), PurePath('src')}
+    assert sub == EmulatedPathTree.from_lists(
+        files=['src/a.h'],
+        dirs=['include'],
+    )
+
 # def test_relative_path_tree() -> None:
 #     with TemporaryDirectory() as _d:
 #         d = Path(_d)
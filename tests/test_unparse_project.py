@@ -51,6 +51,10 @@ EXTENSION_CONFIG = ExtensionConfig(
         File(FileGroup(PurePath('a/b'), Component.library('c')), RoleInGroup.GENERATED_HEADER),
         RepoRelPath(PurePath('lib/c/include/c/a/b.dtg.h'))
     ),
+    (
+        File(FileGroup(PurePath('a/b'), Component.library('c')), RoleInGroup.GENERATED_FWD_HEADER),
+        RepoRelPath(PurePath('lib/c/include/c/a/b.dtg.fwd.h'))
+    ),
     (
         File(FileGroup(PurePath('a/b'), Component.library('c')), RoleInGroup.GENERATED_SOURCE),
         RepoRelPath(PurePath('lib/c/src/c/a/b.dtg.cc'))
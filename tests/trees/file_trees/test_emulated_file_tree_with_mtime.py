@@ -0,0 +1,44 @@
+from proj.trees import EmulatedFileTreeWithMtime
+from pathlib import PurePath
+
+def test_emulated_file_tree_with_mtime_view_shares_clock() -> None:
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=2.0,
+        files=[
+            ('a/b.txt', 1.0, 'b'),
+        ],
+        dirs=[],
+    )
+    view = file_tree.restrict_to_subdir(PurePath('a'))
+
+    file_tree.set_curr_time(3.0)
+    assert view.get_curr_time() == 3.0
+    view.set_file_contents(PurePath('c.txt'), 'c')
+    assert file_tree.get_mtime(PurePath('a/c.txt')) == 3.0
+
+    view.set_curr_time(4.0)
+    assert file_tree.get_curr_time() == 4.0
+    file_tree.set_file_contents(PurePath('a/d.txt'), 'd')
+    assert view.get_mtime(PurePath('d.txt')) == 4.0
+
+def test_emulated_file_tree_with_mtime_view_with_extension() -> None:
+    file_tree = EmulatedFileTreeWithMtime.from_lists(
+        curr_time=2.0,
+        files=[
+            ('a/b.txt', 1.0, 'b'),
+            ('a/c/d.txt', 1.0, 'd'),
+            ('e/f.txt', 1.0, 'f'),
+        ],
+        dirs=[],
+    )
+    view = file_tree.restrict_to_subdir(PurePath('a'))
+    assert set(view.with_extension('.txt')) == {PurePath('b.txt'), PurePath('c/d.txt')}
+
+    view.set_file_contents(PurePath('c/g.txt'), 'g')
+    file_tree.rm_file(PurePath('a/b.txt'))
+    assert set(view.with_extension('.txt')) == {PurePath('c/d.txt'), PurePath('c/g.txt')}
+    assert set(file_tree.with_extension('.txt')) == {
+        PurePath('a/c/d.txt'),
+        PurePath('a/c/g.txt'),
+        PurePath('e/f.txt'),
+    }
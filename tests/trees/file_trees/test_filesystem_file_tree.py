@@ -3,6 +3,7 @@ from proj.trees import (
 )
 from proj.paths import AbsolutePath
 from pathlib import PurePath, Path
+import tempfile
 
 DIR = Path(__file__).parent
 
@@ -22,3 +23,80 @@ def test_filesystem_file_tree_ls_dir():
     sub_file_tree = file_tree.restrict_to_subdir(DIR)
     ls_result = set(sub_file_tree.ls_dir(PurePath('.')))
     assert PurePath('test_filesystem_file_tree.py') in ls_result
+
+def test_filesystem_file_tree_snapshot() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        d = Path(_d)
+        (d / 'lib/a/include/a').mkdir(parents=True)
+        (d / 'lib/a/include/a/x.dtg.toml').write_text('x')
+        (d / 'lib/a/include/a/y.h').write_text('y')
+        (d / 'build').mkdir()
+
+        plain = FilesystemFileTree(AbsolutePath(d))
+        snapshot = plain.with_snapshot()
+
+        assert set(snapshot.files()) == set(plain.files())
+        assert set(snapshot.dirs()) == set(plain.dirs())
+        assert set(snapshot.with_extension('.dtg.toml')) == {PurePath('lib/a/include/a/x.dtg.toml')}
+        assert set(snapshot.ls_dir(PurePath('lib/a/include/a'))) == set(plain.ls_dir(PurePath('lib/a/include/a')))
+
+        snapshot.set_file_contents(PurePath('lib/a/src/a/x.dtg.cc'), 'z', parents=True)
+        snapshot.rename(PurePath('lib/a/include'), PurePath('lib/a/include2'))
+        snapshot.rm_file(PurePath('lib/a/include2/a/y.h'))
+        snapshot.mkdir(PurePath('build/normal'))
+
+        assert snapshot.has_file(PurePath('lib/a/src/a/x.dtg.cc'))
+        assert not snapshot.has_path(PurePath('lib/a/include'))
+        assert snapshot.has_dir(PurePath('build/normal'))
+        assert set(snapshot.with_extension('.toml')) == {PurePath('lib/a/include2/a/x.dtg.toml')}
+        assert set(snapshot.files()) == set(plain.files())
+        assert set(snapshot.dirs()) == set(plain.dirs())
+
+        sub = snapshot.restrict_to_subdir(PurePath('lib/a'))
+        assert set(sub.with_extension('.dtg.cc')) == {PurePath('src/a/x.dtg.cc')}
+        assert set(sub.files()) == set(plain.restrict_to_subdir(PurePath('lib/a')).files())
+
+def test_filesystem_file_tree_prune() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        d = Path(_d)
+        (d / 'lib/a/include/a').mkdir(parents=True)
+        (d / 'lib/a/include/a/x.dtg.toml').write_text('x')
+        (d / 'deps/b').mkdir(parents=True)
+        (d / 'deps/b/y.dtg.toml').write_text('y')
+
+        def is_deps(p: PurePath) -> bool:
+            return p == PurePath('deps')
+
+        for tree in [FilesystemFileTree(AbsolutePath(d)), FilesystemFileTree(AbsolutePath(d)).with_snapshot()]:
+            assert set(tree.with_extension('.dtg.toml', prune=is_deps)) == {PurePath('lib/a/include/a/x.dtg.toml')}
+            assert set(tree.files(prune=is_deps)) == {PurePath('lib/a/include/a/x.dtg.toml')}
+            assert set(tree.dirs(prune=is_deps)) == {
+                PurePath('lib'),
+                PurePath('lib/a'),
+                PurePath('lib/a/include'),
+                PurePath('lib/a/include/a'),
+            }
+            sub = tree.restrict_to_subdir(PurePath('lib'))
+            assert set(sub.files(prune=lambda p: p == PurePath('a/include'))) == set()
+
+def test_filesystem_file_tree_get_many_file_contents() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        d = Path(_d)
+        paths = [PurePath(f'f{i}.txt') for i in range(100)]
+        for i, p in enumerate(paths):
+            (d / p).write_text(str(i))
+
+        file_tree = FilesystemFileTree(AbsolutePath(d))
+        assert list(file_tree.get_many_file_contents(paths)) == [
+            (p, str(i)) for i, p in enumerate(paths)
+        ]
+        assert list(file_tree.get_many_file_contents([])) == []
+
+def test_filesystem_file_tree_get_file_head() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        d = Path(_d)
+        (d / 'a.txt').write_text('abcdef')
+
+        file_tree = FilesystemFileTree(AbsolutePath(d))
+        assert file_tree.get_file_head(PurePath('a.txt'), 3) == 'abc'
+        assert file_tree.get_file_head(PurePath('a.txt'), 100) == 'abcdef'
@@ -0,0 +1,102 @@
+from proj.trees import (
+    FilesystemFileTree,
+    MoveTrace,
+    MkDirTrace,
+    RmFileTrace,
+    CreateFileTrace,
+    ModifyFileTrace,
+    replay_trace_on_file_tree,
+)
+from proj.trees.file_trees.filesystem_transaction import (
+    TRANSACTION_DIR_PREFIX,
+    FilesystemTransaction,
+    recover_interrupted_transactions,
+)
+from proj.paths import AbsolutePath
+from pathlib import PurePath, Path
+from typing import Dict
+import fcntl
+import pytest
+
+def _write_files(root: Path, files: Dict[str, str]) -> None:
+    for name, contents in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(contents)
+
+def _read_files(root: Path) -> Dict[str, str]:
+    return {
+        str(p.relative_to(root)): p.read_text()
+        for p in root.rglob('*') if p.is_file()
+    }
+
+def _trace():
+    return [
+        MkDirTrace(PurePath('d')),
+        MoveTrace(PurePath('a.h'), PurePath('d/a.h')),
+        ModifyFileTrace.from_contents(PurePath('d/a.h'), 'a0\n', 'a1\n'),
+        ModifyFileTrace.from_contents(PurePath('b.h'), 'b0\n', 'b1\n'),
+        RmFileTrace(PurePath('c.h')),
+        CreateFileTrace(PurePath('d/e.h'), 'e\n'),
+    ]
+
+def test_transactional_replay(tmp_path: Path) -> None:
+    _write_files(tmp_path, {'a.h': 'a0\n', 'b.h': 'b0\n', 'c.h': 'c0\n'})
+    file_tree = FilesystemFileTree(AbsolutePath(tmp_path)).with_snapshot()
+
+    replay_trace_on_file_tree(_trace(), file_tree, transactional=True)
+
+    assert _read_files(tmp_path) == {'d/a.h': 'a1\n', 'b.h': 'b1\n', 'd/e.h': 'e\n'}
+    assert set(file_tree.files()) == {PurePath('d/a.h'), PurePath('b.h'), PurePath('d/e.h')}
+
+def test_transactional_replay_rolls_back_on_failure(tmp_path: Path) -> None:
+    files = {'a.h': 'a0\n', 'b.h': 'b0\n', 'c.h': 'c0\n', 'd/e.h': 'existing\n'}
+    _write_files(tmp_path, files)
+    file_tree = FilesystemFileTree(AbsolutePath(tmp_path))
+
+    with pytest.raises(FileExistsError):
+        replay_trace_on_file_tree(_trace(), file_tree, transactional=True)
+
+    assert _read_files(tmp_path) == files
+
+def test_transactional_replay_checks_contents_before_writing(tmp_path: Path) -> None:
+    files = {'a.h': 'a0\n', 'b.h': 'changed\n', 'c.h': 'c0\n'}
+    _write_files(tmp_path, files)
+    file_tree = FilesystemFileTree(AbsolutePath(tmp_path))
+
+    with pytest.raises(AssertionError):
+        replay_trace_on_file_tree(_trace(), file_tree, transactional=True)
+
+    assert _read_files(tmp_path) == files
+    assert not (tmp_path / 'd').exists()
+
+def test_recover_interrupted_transaction(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    files = {'a.h': 'a0\n', 'b.h': 'b0\n', 'c.h': 'c0\n'}
+    _write_files(tmp_path, files)
+    trace = [*_trace(), MoveTrace(PurePath('b.h'), PurePath('d/a.h'))]
+
+    monkeypatch.setattr(
+        'proj.trees.file_trees.filesystem_transaction.rollback_transaction',
+        lambda root, transaction_dir: None,
+    )
+    with pytest.raises(AssertionError):
+        FilesystemTransaction(tmp_path).commit(trace)
+    monkeypatch.undo()
+
+    assert recover_interrupted_transactions(tmp_path) == 1
+    assert _read_files(tmp_path) == files
+    assert set(p.name for p in tmp_path.iterdir()) == {'a.h', 'b.h', 'c.h'}
+
+def test_recover_skips_transaction_of_running_process(tmp_path: Path) -> None:
+    transaction_dir = tmp_path / f'{TRANSACTION_DIR_PREFIX}running'
+    transaction_dir.mkdir()
+    (tmp_path / 'd').mkdir()
+    with (transaction_dir / 'journal').open('x') as journal:
+        journal.write('["mkdir", "d"]\n')
+        journal.flush()
+        fcntl.flock(journal.fileno(), fcntl.LOCK_EX)
+
+        assert recover_interrupted_transactions(tmp_path) == 0
+        assert (tmp_path / 'd').is_dir()
+
+    assert recover_interrupted_transactions(tmp_path) == 1
+    assert set(p.name for p in tmp_path.iterdir()) == set()
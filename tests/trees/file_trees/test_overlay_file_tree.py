@@ -0,0 +1,54 @@
+from proj.trees import (
+    EmulatedFileTree,
+    OverlayFileTree,
+    MutableTracedFileTreeByWrapping,
+)
+from pathlib import PurePath
+
+def _make_base() -> EmulatedFileTree:
+    return EmulatedFileTree.from_lists(
+        files=[
+            ('lib/a/include/a.h', 'a'),
+            ('lib/a/src/a.cc', '#include "a.h"'),
+            ('lib/b/src/b.cc', 'b'),
+        ],
+        dirs=[],
+    )
+
+def _mutate(tree: MutableTracedFileTreeByWrapping) -> None:
+    tree.mkdir(PurePath('lib/c/include'), parents=True)
+    tree.rename(PurePath('lib/a/include/a.h'), PurePath('lib/c/include/a.h'))
+    tree.set_file_contents(PurePath('lib/a/src/a.cc'), '#include "c.h"', exist_ok=True)
+    tree.set_file_contents(PurePath('lib/c/include/c.h'), 'c')
+    tree.rm_file(PurePath('lib/b/src/b.cc'))
+
+def test_overlay_file_tree_does_not_modify_base() -> None:
+    base = _make_base()
+    overlay = OverlayFileTree(base)
+    _mutate(MutableTracedFileTreeByWrapping(overlay))
+
+    assert base == _make_base()
+    assert overlay.get_file_contents(PurePath('lib/c/include/a.h')) == 'a'
+    assert not overlay.has_path(PurePath('lib/a/include/a.h'))
+    assert not overlay.has_path(PurePath('lib/b/src/b.cc'))
+    assert set(overlay.files()) == {
+        PurePath('lib/a/src/a.cc'),
+        PurePath('lib/c/include/a.h'),
+        PurePath('lib/c/include/c.h'),
+    }
+    assert set(overlay.ls_dir(PurePath('lib/c/include'))) == {
+        PurePath('lib/c/include/a.h'),
+        PurePath('lib/c/include/c.h'),
+    }
+    assert set(overlay.restrict_to_subdir(PurePath('lib/c')).with_extension('.h')) == {
+        PurePath('include/a.h'),
+        PurePath('include/c.h'),
+    }
+
+def test_overlay_file_tree_trace_matches_emulated() -> None:
+    overlay = MutableTracedFileTreeByWrapping(OverlayFileTree(_make_base()))
+    emulated = MutableTracedFileTreeByWrapping(_make_base())
+    _mutate(overlay)
+    _mutate(emulated)
+
+    assert overlay.get_file_trace() == emulated.get_file_trace()
@@ -0,0 +1,37 @@
+from proj.trees import (
+    EmulatedFileTreeWithMtime,
+    StatCachedFileTree,
+    StatCacheCounters,
+)
+from pathlib import PurePath
+
+def test_stat_cached_file_tree() -> None:
+    file_tree = StatCachedFileTree(
+        EmulatedFileTreeWithMtime.from_lists(
+            curr_time=2.0,
+            files=[
+                ('a/b/c.txt', 1.0, 'c'),
+            ],
+            dirs=[],
+        )
+    )
+
+    assert file_tree.has_file(PurePath('a/b/c.txt'))
+    assert file_tree.has_path(PurePath('a/b/c.txt'))
+    assert file_tree.get_mtime(PurePath('a/b/c.txt')) == 1.0
+    assert file_tree.get_mtime(PurePath('a/b/c.txt')) == 1.0
+    assert file_tree.counters == StatCacheCounters(hits=2, misses=2)
+
+    assert not file_tree.has_path(PurePath('a/b/d.txt'))
+    file_tree.rename(PurePath('a/b/c.txt'), PurePath('a/b/d.txt'))
+    assert not file_tree.has_path(PurePath('a/b/c.txt'))
+    assert file_tree.has_file(PurePath('a/b/d.txt'))
+
+    file_tree.set_file_contents(PurePath('e/f.txt'), 'f', parents=True)
+    assert file_tree.has_dir(PurePath('e'))
+    assert file_tree.has_file(PurePath('e/f.txt'))
+    assert file_tree.get_mtime(PurePath('e/f.txt')) == 2.0
+
+    file_tree.rm_file(PurePath('e/f.txt'))
+    assert not file_tree.has_path(PurePath('e/f.txt'))
+    assert file_tree.has_dir(PurePath('e'))
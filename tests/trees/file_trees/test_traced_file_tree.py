@@ -53,7 +53,7 @@ def test_mutable_traced_file_tree_by_wrapping() -> None:
     result = traced_file_tree.get_file_trace()
 
     correct = [
-        ModifyFileTrace(
+        ModifyFileTrace.from_contents(
             path=example_path, 
             old_contents=old_contents,
             new_contents=new_contents,
@@ -0,0 +1,49 @@
+from proj.trees import (
+    FilesystemFileTree,
+    WriteIfChangedFileTree,
+    WriteCounters,
+)
+from proj.paths import AbsolutePath
+from pathlib import Path, PurePath
+import os
+import tempfile
+
+def test_write_if_changed_file_tree() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        d = Path(_d)
+        (d / 'a.h').write_text('a')
+        os.chmod(d / 'a.h', 0o640)
+        os.utime(d / 'a.h', (1, 1))
+
+        file_tree = WriteIfChangedFileTree(FilesystemFileTree(AbsolutePath(d)))
+        file_tree.set_file_contents(PurePath('a.h'), 'a', exist_ok=True)
+        assert file_tree.get_mtime(PurePath('a.h')) == 1
+
+        file_tree.set_file_contents(PurePath('a.h'), 'b', exist_ok=True)
+        file_tree.set_file_contents(PurePath('b.h'), 'b')
+        assert (d / 'a.h').read_text() == 'b'
+        assert (d / 'a.h').stat().st_mode & 0o777 == 0o640
+        assert file_tree.counters == WriteCounters(written=2, skipped=1)
+        assert sorted(os.listdir(d)) == ['a.h', 'b.h']
+
+def test_filesystem_file_tree_writes_through_symlink() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        d = Path(_d)
+        (d / 'target.h').write_text('a')
+        (d / 'a.h').symlink_to('target.h')
+
+        file_tree = FilesystemFileTree(AbsolutePath(d))
+        file_tree.set_file_contents_atomically(PurePath('a.h'), 'b', exist_ok=True)
+        assert (d / 'a.h').is_symlink()
+        assert (d / 'target.h').read_text() == 'b'
+        assert sorted(os.listdir(d)) == ['a.h', 'target.h']
+
+def test_filesystem_file_tree_writes_in_place_by_default() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        d = Path(_d)
+        (d / 'a.h').write_text('a')
+        os.link(d / 'a.h', d / 'b.h')
+
+        file_tree = FilesystemFileTree(AbsolutePath(d))
+        file_tree.set_file_contents(PurePath('a.h'), 'b', exist_ok=True)
+        assert (d / 'b.h').read_text() == 'b'
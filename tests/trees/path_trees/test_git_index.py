@@ -0,0 +1,97 @@
+from proj.trees import (
+    FilesystemPathTree,
+    PathType,
+)
+from proj.trees.path_trees.git_index import list_git_worktree
+from proj.paths import AbsolutePath
+from pathlib import PurePath, Path
+from typing import Dict
+import pytest
+import shutil
+import subprocess
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='requires git')
+
+def _git(root: Path, *args: str) -> None:
+    subprocess.run(['git', *args], cwd=root, check=True, capture_output=True)
+
+def _make_repo(root: Path) -> None:
+    files: Dict[str, str] = {
+        '.gitignore': 'build/\n*.o\n*.dtg.h\n',
+        'CMakeLists.txt': '',
+        'lib/a/include/a/a.h': '',
+        'lib/a/src/a/a.cc': '',
+        'lib/a/src/a/deleted.cc': '',
+        'lib/a/src/a/' + 'x' * 200 + '.cc': '',
+    }
+    for name, contents in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(contents)
+    _git(root, 'init', '-q')
+    _git(root, 'add', '.')
+    (root / 'lib/a/src/a/deleted.cc').unlink()
+    (root / 'lib/a/src/a/untracked.cc').write_text('')
+    (root / 'lib/a/src/a/ignored.o').write_text('')
+    (root / 'build').mkdir()
+    (root / 'build/out.txt').write_text('')
+    (root / 'build/out.dtg.h').write_text('')
+    (root / 'lib/a/include/a/b.dtg.h').write_text('')
+
+@pytest.mark.parametrize('index_version', ['2', '3', '4'])
+def test_list_git_worktree(tmp_path: Path, index_version: str) -> None:
+    _make_repo(tmp_path)
+    _git(tmp_path, 'update-index', '--index-version', index_version)
+    if index_version == '3':
+        _git(tmp_path, 'update-index', '--skip-worktree', 'CMakeLists.txt')
+
+    assert list_git_worktree(tmp_path) == {
+        PurePath('.gitignore'): PathType.FILE,
+        PurePath('CMakeLists.txt'): PathType.FILE,
+        PurePath('lib/a/include/a/a.h'): PathType.FILE,
+        PurePath('lib/a/src/a/a.cc'): PathType.FILE,
+        PurePath('lib/a/src/a/' + 'x' * 200 + '.cc'): PathType.FILE,
+        PurePath('lib/a/src/a/untracked.cc'): PathType.FILE,
+    }
+
+def test_list_git_worktree_with_split_index(tmp_path: Path) -> None:
+    _make_repo(tmp_path)
+    _git(tmp_path, 'update-index', '--split-index')
+    (tmp_path / 'lib/a/src/a/new.cc').write_text('')
+    _git(tmp_path, 'add', 'lib/a/src/a/new.cc')
+
+    listing = list_git_worktree(tmp_path)
+    assert listing is not None
+    assert any(p.name.startswith('sharedindex.') for p in (tmp_path / '.git').iterdir())
+    assert listing[PurePath('lib/a/src/a/new.cc')] == PathType.FILE
+    assert listing[PurePath('lib/a/src/a/a.cc')] == PathType.FILE
+
+def test_list_git_worktree_reincludes_ignored_patterns(tmp_path: Path) -> None:
+    _make_repo(tmp_path)
+
+    listing = list_git_worktree(tmp_path, reinclude=['*.dtg.*'])
+    assert listing is not None
+    assert listing[PurePath('lib/a/include/a/b.dtg.h')] == PathType.FILE
+    assert PurePath('build/out.dtg.h') not in listing
+    assert PurePath('lib/a/src/a/ignored.o') not in listing
+
+def test_git_index_path_tree(tmp_path: Path) -> None:
+    _make_repo(tmp_path)
+    path_tree = FilesystemPathTree(AbsolutePath(tmp_path)).with_git_index()
+
+    assert set(path_tree.with_extension('.cc')) == {
+        PurePath('lib/a/src/a/a.cc'),
+        PurePath('lib/a/src/a/' + 'x' * 200 + '.cc'),
+        PurePath('lib/a/src/a/untracked.cc'),
+    }
+    assert set(path_tree.ls_dir(PurePath('lib/a'))) == {PurePath('lib/a/include'), PurePath('lib/a/src')}
+    assert path_tree.has_dir(PurePath('lib/a/src'))
+    assert not path_tree.has_path(PurePath('build'))
+    assert not path_tree.has_path(PurePath('lib/a/src/a/deleted.cc'))
+
+    path_tree.mkdir(PurePath('lib/b'))
+    assert path_tree.has_dir(PurePath('lib/b'))
+
+def test_git_index_path_tree_falls_back_without_git(tmp_path: Path) -> None:
+    (tmp_path / 'a.cc').write_text('')
+    path_tree = FilesystemPathTree(AbsolutePath(tmp_path)).with_git_index()
+    assert set(path_tree.files()) == {PurePath('a.cc')}
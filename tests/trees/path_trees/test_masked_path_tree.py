@@ -3,6 +3,7 @@ from proj.trees import (
     PathType,
     MaskedPathTree,
     IgnoreMask,
+    AllowMask,
 )
 from pathlib import PurePath
 
@@ -67,3 +68,49 @@ def test_masked_path_tree_subdir_restriction() -> None:
         PurePath('.'),
     ])
     assert set(sub_masked_path_tree2.files()) == set()
+
+def test_masked_path_tree_prune_pushdown() -> None:
+    path_tree = EmulatedPathTree.from_lists(
+        files=[
+            'include/example/a.h',
+            'include/example2/b.h',
+            'src/c.cc',
+        ],
+        dirs=[],
+    )
+
+    visited = set()
+    def record(p: PurePath) -> bool:
+        visited.add(p)
+        return False
+
+    masked_path_tree = MaskedPathTree(
+        path_tree,
+        AllowMask.from_iter(['include/example2']),
+    )
+    assert set(masked_path_tree.files(prune=record)) == {PurePath('include/example2/b.h')}
+    assert PurePath('src') not in visited
+    assert PurePath('include/example') not in visited
+
+    assert set(masked_path_tree.with_extension('.h', prune=lambda p: p == PurePath('include/example2'))) == set()
+
+def test_mask_prefix_matching() -> None:
+    allow = AllowMask.from_iter(['include/example', 'src'])
+    assert allow.is_allowed(PurePath('include/example/a.h'))
+    assert allow.is_allowed(PurePath('src'))
+    assert not allow.is_allowed(PurePath('include'))
+    assert not allow.is_allowed(PurePath('include/example2/a.h'))
+    assert not allow.can_prune(PurePath('.'))
+    assert not allow.can_prune(PurePath('include'))
+    assert not allow.can_prune(PurePath('src/a'))
+    assert allow.can_prune(PurePath('include/example2'))
+    assert allow.can_prune(PurePath('lib'))
+    assert AllowMask.from_iter([]).can_prune(PurePath('.'))
+
+    ignore = IgnoreMask.from_iter(['.', 'lib'])
+    assert not ignore.is_allowed(PurePath('a.h'))
+    ignore = IgnoreMask.from_iter(['lib'])
+    assert ignore.is_allowed(PurePath('.'))
+    assert ignore.is_allowed(PurePath('library/a.h'))
+    assert not ignore.is_allowed(PurePath('lib/a.h'))
+    assert ignore.can_prune(PurePath('lib'))
@@ -0,0 +1,70 @@
+from proj.trees.path_trees.filesystem_path_tree import FilesystemPathTree
+from proj.trees.path_trees.tree_index import TreeIndex
+from proj.trees.filesystem import (
+    get_tree_index,
+    load_filesystem_for_repo,
+)
+from proj.paths import AbsolutePath, Repo
+from pathlib import Path, PurePath
+from typing import (
+    Callable,
+    List,
+)
+import os
+import pytest
+import tempfile
+
+def _age(d: Path) -> None:
+    for dirpath, _, _ in os.walk(d):
+        os.utime(dirpath, ns=(0, 10**18))
+
+def test_tree_index_reuses_unchanged_dirs() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        d = Path(_d) / 'repo'
+        (d / 'lib/a/include').mkdir(parents=True)
+        (d / 'lib/a/include/x.dtg.toml').write_text('x')
+        (d / 'lib/b').mkdir(parents=True)
+        index_path = Path(_d) / 'tree-index'
+        _age(d)
+
+        index = TreeIndex.load(index_path)
+        tree = FilesystemPathTree(AbsolutePath(d)).with_snapshot(index)
+        assert set(tree.with_extension('.toml')) == {PurePath('lib/a/include/x.dtg.toml')}
+        index.save()
+        assert index_path.exists()
+
+        # adding a file without changing the directory mtime is invisible
+        # to the index, which shows that the listing was not rescanned
+        (d / 'lib/a/include/y.dtg.toml').write_text('y')
+        _age(d)
+        tree = FilesystemPathTree(AbsolutePath(d)).with_snapshot(TreeIndex.load(index_path))
+        assert set(tree.with_extension('.toml')) == {PurePath('lib/a/include/x.dtg.toml')}
+
+        os.utime(d / 'lib/a/include', ns=(0, 10**18 + 1))
+        tree = FilesystemPathTree(AbsolutePath(d)).with_snapshot(TreeIndex.load(index_path))
+        assert set(tree.with_extension('.toml')) == {
+            PurePath('lib/a/include/x.dtg.toml'),
+            PurePath('lib/a/include/y.dtg.toml'),
+        }
+        assert set(tree.dirs()) == set(FilesystemPathTree(AbsolutePath(d)).dirs())
+
+def test_tree_index_ignores_corrupt_file() -> None:
+    with tempfile.TemporaryDirectory() as _d:
+        index_path = Path(_d) / 'tree-index'
+        index_path.write_text('{not json')
+        d = Path(_d) / 'repo'
+        (d / 'a').mkdir(parents=True)
+
+        index = TreeIndex.load(index_path)
+        tree = FilesystemPathTree(AbsolutePath(d)).with_snapshot(index)
+        assert set(tree.dirs()) == {PurePath('a')}
+
+def test_load_filesystem_for_repo_shares_tree_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    registered: List[Callable[[], None]] = []
+    monkeypatch.setattr('proj.trees.filesystem.atexit.register', registered.append)
+    with tempfile.TemporaryDirectory() as _d:
+        repo = Repo(PurePath(_d))
+        load_filesystem_for_repo(repo)
+        load_filesystem_for_repo(repo)
+        assert len(registered) == 1
+        assert get_tree_index(repo) is get_tree_index(repo)